@@ -1,5 +1,11 @@
-from ._widget import (
-    GroupLayerWidget,
-)
-
 __all__ = ("GroupLayerWidget",)
+
+
+def __getattr__(name: str):
+    # Qt (through the widget) is only imported when the widget is requested,
+    # so that the GroupLayer tree model can be used without a Qt binding.
+    if name == "GroupLayerWidget":
+        from ._widget import GroupLayerWidget
+
+        return GroupLayerWidget
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
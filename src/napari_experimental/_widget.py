@@ -1,68 +1,188 @@
 """
 """
 
-from typing import TYPE_CHECKING
+from __future__ import annotations
 
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from napari._qt.containers._base_item_model import ItemRole
 from napari.components import LayerList
+from napari.qt.threading import FunctionWorker, create_worker
 from napari.utils.events import Event
-from qtpy.QtWidgets import QPushButton, QVBoxLayout, QWidget
+from qtpy.QtCore import QModelIndex, QTimer, Signal
+from qtpy.QtWidgets import (
+    QLineEdit,
+    QProgressBar,
+    QPushButton,
+    QVBoxLayout,
+    QWidget,
+)
 
 from napari_experimental.group_layer import GroupLayer
 from napari_experimental.group_layer_controls import (
     QtGroupLayerControlsContainer,
 )
+from napari_experimental.group_layer_extent import fit_camera
+from napari_experimental.group_layer_flatten import (
+    FlattenedGroup,
+    flatten_group,
+)
+from napari_experimental.group_layer_hierarchy import (
+    HierarchyEntry,
+    HierarchyMirror,
+)
+from napari_experimental.group_layer_histogram import (
+    group_joint_histogram,
+    share_contrast_limits,
+)
+from napari_experimental.group_layer_loading import (
+    GroupLayerLoader,
+    ReadResult,
+    Source,
+)
+from napari_experimental.group_layer_merge import (
+    merge_group_labels,
+    merge_group_points,
+    split_group_points,
+)
+from napari_experimental.group_layer_node import GroupLayerNode
+from napari_experimental.group_layer_prefetch import DimsPrefetcher
 from napari_experimental.group_layer_qt import (
     QtGroupLayerView,
 )
+from napari_experimental.group_layer_spill import GroupLayerSpiller
+from napari_experimental.group_layer_statistics_qt import (
+    QtGroupStatisticsPanel,
+)
+from napari_experimental.group_layer_sync import GroupLayerReconciler
 
 if TYPE_CHECKING:
     import napari
+    from napari.utils.events.containers._nested_list import NestedIndex
+
+# Number of layers (from the viewer) that are added to the widget in each
+# tick of the event loop. At startup, the first chunk is added before the
+# widget is shown. Each layer added builds its napari layer controls, which
+# takes milliseconds, so chunks are kept small.
+POPULATION_CHUNK_SIZE = 16
+# Interval (ms) at which layers that have been loaded in the background are
+# swapped in for their placeholders.
+LOADING_POLL_INTERVAL = 50
+# Interval (ms) at which the spill policies of hidden groups are checked.
+SPILL_CHECK_INTERVAL = 5_000
+# Interval (ms) at which composites of flattened groups that have been
+# recomputed in the background are applied.
+FLATTEN_POLL_INTERVAL = 50
+# Interval (ms) over which cursor moves in the canvas are coalesced before
+# the item under the cursor is looked up.
+HOVER_INTERVAL = 50
 
 
 class GroupLayerWidget(QWidget):
     """
     Main plugin widget for interacting with GroupLayers.
 
+    The layers already in the viewer are not all added to the GroupLayer
+    when the widget is created. Instead, the view and controls are created
+    empty, and the layers are added in chunks (see ``POPULATION_CHUNK_SIZE``)
+    whenever the event loop is idle, so that opening the widget on a large
+    session does not freeze the UI. A progress bar is shown whilst layers
+    are waiting to be added, and ``populated`` is emitted once they all
+    have been.
+
     Parameters
     ----------
     viewer : napari.viewer.Viewer
         Main viewer instance containing (in particular) the LayerList.
+    chunk_size : int, default = POPULATION_CHUNK_SIZE
+        Number of layers to add to the GroupLayer in each step.
     """
 
+    populated = Signal()
+    # Emitted with the item under the cursor in the canvas (or None) when it
+    # changes
+    item_hovered = Signal(object)
+
     @property
     def global_layers(self) -> LayerList:
         return self.viewer.layers
 
-    def __init__(self, viewer: "napari.viewer.Viewer"):
+    @property
+    def is_populated(self) -> bool:
+        """
+        True if there are no layers in the viewer that are waiting to be
+        added to the GroupLayer.
+        """
+        return self.reconciler.n_pending_insertions == 0
+
+    def __init__(
+        self,
+        viewer: napari.viewer.Viewer,
+        chunk_size: int = POPULATION_CHUNK_SIZE,
+    ):
         super().__init__()
 
         self.viewer = viewer
+        self._chunk_size = max(1, chunk_size)
+        # Number of layers added to the GroupLayer since the progress bar
+        # was last hidden
+        self._n_populated = 0
 
-        self.group_layers = GroupLayer(*self.global_layers.__reversed__())
+        self.group_layers = GroupLayer()
         self.group_layers_view = QtGroupLayerView(
-            self.group_layers, parent=self
+            self.group_layers, parent=self, viewer=self.viewer
         )
         self.group_layers_controls = QtGroupLayerControlsContainer(
             self.viewer, self.group_layers
         )
 
-        # Consistency when adding / removing layers from main viewer,
-        # changes are reflected in the GroupLayer view too
-        self.global_layers.events.inserted.connect(
-            self._new_layer_in_main_viewer
-        )
-        self.global_layers.events.removed.connect(
-            self._removed_layer_in_main_viewer
+        # Consistency when adding / removing / moving layers in either the
+        # main viewer or the GroupLayer. Changes are collected, and applied
+        # once control returns to the event loop.
+        self._reconcile_timer = QTimer(self)
+        self._reconcile_timer.setSingleShot(True)
+        self._reconcile_timer.setInterval(0)
+        self._reconcile_timer.timeout.connect(self._reconcile)
+        self.reconciler = GroupLayerReconciler(
+            self.global_layers,
+            self.group_layers,
+            schedule=self._reconcile_timer.start,
         )
-        self.group_layers.events.removed.connect(
-            self._removed_layer_in_group_layers
-        )
-        # Impose layer order whenever layers get moved
-        self.group_layers.events.moved.connect(self._on_layer_moved)
+        # Queue the existing layers top-first, so that the view fills
+        # from the top
+        self.reconciler.queue_insertions(self.global_layers.__reversed__())
+
+        # The components that are not needed to show the tree (see
+        # _set_up_components) are set up once the event loop is idle, after
+        # the widget has first been painted.
+        self._components_set_up = False
+        self._set_up_timer = QTimer(self)
+        self._set_up_timer.setSingleShot(True)
+        self._set_up_timer.setInterval(0)
+        self._set_up_timer.timeout.connect(self._set_up_components)
+        self.flattened_groups: List[FlattenedGroup] = []
+        self.hovered_item: Optional[GroupLayerNode] = None
 
         self.add_group_button = QPushButton("Add empty layer group")
         self.add_group_button.clicked.connect(self._new_layer_group)
 
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search, e.g. 'cells type:points'")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.textChanged.connect(
+            self.group_layers_view.set_filter_text
+        )
+
         self.enter_debugger = QPushButton("ENTER DEBUGGER")
         self.enter_debugger.clicked.connect(self._enter_debug)
 
@@ -70,108 +190,457 @@ class GroupLayerWidget(QWidget):
         self.layout().addWidget(self.group_layers_controls)
         self.layout().addWidget(self.enter_debugger)
         self.layout().addWidget(self.add_group_button)
+        self.layout().addWidget(self.search_box)
         self.layout().addWidget(self.group_layers_view)
 
-    def _new_layer_group(self) -> None:
+        self.population_progress = QProgressBar()
+        self.population_progress.setFormat("Adding layers: %v / %m")
+        self.layout().addWidget(self.population_progress)
+
+        # Add the first chunk of layers before the widget is shown
+        self._reconcile()
+        self._set_up_timer.start()
+
+    def _set_up_components(self) -> None:
         """
-        Action taken when creating a new, empty layer group in the widget.
+        Set up the components of the widget that are not needed to show the
+        tree: background loading, mirroring of on-disk hierarchies,
+        spilling, prefetching, flattening, statistics, and picking in the
+        canvas. Does nothing if they are already set up.
+
+        This is called once the event loop is first idle, so that it does
+        not delay the widget being shown, or sooner by the methods that
+        need the components.
         """
-        self.group_layers.add_new_group()
+        if self._components_set_up:
+            return
+        self._components_set_up = True
+        self._set_up_timer.stop()
 
-    # BEGIN FUNCTIONS TO ENSURE CONSISTENCY BETWEEN
-    # MAIN VIEWER AND GROUP LAYERS VIEWER.
-    # Functions in this block are un-necessary if the
-    # group layers widget later replaces the main layer viewer.
+        # Layers loaded in the background are swapped in for their
+        # placeholders (and added to the viewer) on the main thread, by
+        # polling the loader whilst it has reads outstanding.
+        self.loader = GroupLayerLoader(
+            self.group_layers, on_loaded=self.reconciler.adopt
+        )
+        self._loading_timer = QTimer(self)
+        self._loading_timer.setInterval(LOADING_POLL_INTERVAL)
+        self._loading_timer.timeout.connect(self._swap_loaded_layers)
+
+        # On-disk hierarchies are mirrored as groups that are only filled
+        # in when they are expanded in the view (or made visible).
+        self.hierarchy_mirror = HierarchyMirror(
+            self.group_layers, on_realised=self.reconciler.adopt
+        )
+        self.group_layers_view.expanded.connect(self._on_view_expanded)
+
+        # Groups with a spill_policy have the data of their layers spilled
+        # to disk whilst they are hidden. Policies are only checked whilst
+        # some group has one.
+        self.spiller = GroupLayerSpiller(self.group_layers)
+        self._spill_timer = QTimer(self)
+        self._spill_timer.setInterval(SPILL_CHECK_INTERVAL)
+        self._spill_timer.timeout.connect(self.spiller.check)
+        for emitter in (
+            self.group_layers.events.spill_policy,
+            self.group_layers.events.inserted,
+            self.group_layers.events.removed,
+        ):
+            emitter.connect(self._update_spill_timer)
+        self._update_spill_timer()
+
+        # Upcoming slices of the layers in visible, expanded groups with a
+        # slice cache are prefetched as the dims are stepped through.
+        self.prefetcher = DimsPrefetcher(
+            self.group_layers,
+            self.viewer.dims,
+            is_active=self.group_layers_view.is_item_expanded,
+        )
+        self.group_layers_view.collapsed.connect(self._on_view_collapsed)
+
+        # Flattened groups recompute their composites in the background,
+        # which are applied on the main thread by polling.
+        self._flatten_timer = QTimer(self)
+        self._flatten_timer.setInterval(FLATTEN_POLL_INTERVAL)
+        self._flatten_timer.timeout.connect(self._apply_composites)
+
+        # Clicking in the canvas selects the deepest item under the cursor,
+        # looked up in the spatial index of the tree. Hovering looks up the
+        # item under the last position the cursor moved to, at most once
+        # per HOVER_INTERVAL.
+        self._hover_position: Optional[Tuple[float, ...]] = None
+        self._hover_timer = QTimer(self)
+        self._hover_timer.setSingleShot(True)
+        self._hover_timer.setInterval(HOVER_INTERVAL)
+        self._hover_timer.timeout.connect(self._update_hovered_item)
+        self.viewer.mouse_drag_callbacks.append(self._on_canvas_click)
+        self.viewer.mouse_move_callbacks.append(self._on_canvas_hover)
+
+        # Statistics of each layer and group, computed in the background
+        # when the panel is refreshed
+        self.statistics_panel = QtGroupStatisticsPanel(
+            self.group_layers, parent=self
+        )
+        self.layout().insertWidget(
+            self.layout().indexOf(self.population_progress),
+            self.statistics_panel,
+        )
+
+    def _reconcile(self) -> None:
+        """
+        Apply the changes collected by the reconciler, adding at most one
+        chunk of layers to the GroupLayer, and update the progress bar.
+        """
+        self._reconcile_timer.stop()
+        self._n_populated += self.reconciler.reconcile(
+            max_insertions=self._chunk_size
+        )
+        self._update_population_progress()
+
+    def _update_population_progress(self) -> None:
+        """
+        Reflect the number of layers still to be added in the progress bar,
+        hiding it (and emitting ``populated``) once there are none left.
+        """
+        if self.is_populated:
+            self._n_populated = 0
+            if not self.population_progress.isHidden():
+                self.population_progress.hide()
+                self.populated.emit()
+            return
+        self.population_progress.setRange(
+            0, self._n_populated + self.reconciler.n_pending_insertions
+        )
+        self.population_progress.setValue(self._n_populated)
+        self.population_progress.show()
 
-    def _new_layer_in_main_viewer(self, event: Event) -> None:
+    def apply_pending_changes(self) -> None:
         """
-        When a new layer is added via the global_layers controls,
-        the GroupLayers instance needs to update to include it.
+        Immediately apply any changes that are waiting to be reconciled
+        (adding all the layers that are waiting to be added to the
+        GroupLayer), and set up the components that are waiting for the
+        event loop to be idle, rather than waiting for the event loop.
+        """
+        self._set_up_components()
+        self._reconcile_timer.stop()
+        self.reconciler.reconcile()
+        self._update_population_progress()
 
-        The new layer is inserted into the appropriate position in
-        the Tree.
+    def build_in_background(
+        self,
+        build: Callable[[], GroupLayer],
+        location: Optional[NestedIndex | int] = None,
+    ) -> FunctionWorker:
+        """
+        Build a GroupLayer in a worker thread, and graft it into the tree
+        (adding its layers to the viewer) once it is ready.
 
         Parameters
         ----------
-        event : Event
-            With attributes
-            - index (in the LayerList the Layer was inserted),
-            - value (layer that was inserted).
-        """
-        # New layers in the main viewer can come in either at the top,
-        # or next to another layer (from duplications, etc).
-        # As such, we need to take the index that the layer was inserted
-        # at in the LayerList, and insert the new layer into our GroupLayer
-        # structure in the correct position.
-        old_order = self.group_layers.flat_index_order()
-        # Due to LayerList and Tree structures having reversed indices
-        insert_at_flat_index = len(old_order) - event.index
-        # Potentially could have been added to the end of the tree, in which
-        # case a new index would have to be created at the end of the tree
-        # and there would be no nested index to lookup
-        insert_at_nested_index = (
-            old_order[insert_at_flat_index]
-            if insert_at_flat_index < len(old_order)
-            else len(self.group_layers)
+        build : Callable[[], GroupLayer]
+            Function returning a detached GroupLayer, run in the worker
+            thread. See ``GroupLayer.from_hierarchy``.
+        location : NestedIndex | int, optional
+            Location in the tree at which to insert the new GroupLayer.
+            By default, it is added to the end of the top level of the tree.
+
+        Returns
+        -------
+        FunctionWorker
+            The (started) worker. The GroupLayer is grafted into the tree
+            on the main thread, when the worker emits ``returned``.
+        """
+        return create_worker(
+            build,
+            _connect={
+                "returned": lambda subtree: self.reconciler.graft(
+                    subtree, location=location
+                )
+            },
         )
-        self.group_layers.add_new_layer(
-            layer_ptr=event.value, location=insert_at_nested_index
+
+    def load_group(
+        self,
+        sources: Iterable[Source],
+        read: Callable[[Source], ReadResult],
+        name: Optional[str] = None,
+        location: Optional[NestedIndex | int] = None,
+    ) -> GroupLayer:
+        """
+        Add a group with a placeholder for each of ``sources`` to the tree
+        straight away, and read the sources in the background (see
+        ``GroupLayerLoader.load_group`` for a description of the arguments).
+
+        Placeholders are shown as loading in the view, and are replaced by
+        the layers that are read (which are also added to the viewer) as
+        each read completes.
+
+        Returns
+        -------
+        GroupLayer
+            The GroupLayer that was added to the tree.
+        """
+        self._set_up_components()
+        group = self.loader.load_group(
+            sources, read, name=name, location=location
         )
+        self._loading_timer.start()
+        return group
 
-    def _on_layer_moved(self, event: Event) -> None:
+    def _swap_loaded_layers(self) -> None:
         """
-        Actions taken when Nodes with the GroupLayer object are reordered:
-        - Impose layer order on the main viewer after an update.
+        Swap in the layers that have finished loading, and stop polling
+        once there are none left to load.
+        """
+        self.loader.swap_completed()
+        if self.loader.n_pending == 0:
+            self._loading_timer.stop()
 
-        Parameters
-        ----------
-        event : Event
-            Unused, but contains the old and new indices of the moved item.
-        """
-        new_order = self.group_layers.flat_index_order()
-        # Since the LayerList viewer indexes in the reverse to our Tree model,
-        # we must reverse the order provided.
-        new_order.reverse()
-
-        for new_position, layer in enumerate(
-            [
-                self.group_layers[nested_index].layer
-                for nested_index in new_order
-            ]
-        ):
-            currently_at = self.global_layers.index(layer)
-            self.global_layers.move(currently_at, dest_index=new_position)
+    def open_hierarchy(
+        self,
+        path: str | Path | HierarchyEntry,
+        name: Optional[str] = None,
+        location: Optional[NestedIndex | int] = None,
+    ) -> GroupLayer:
+        """
+        Mirror the on-disk hierarchy (Zarr store, HDF5 file, or directory
+        tree) at ``path`` as a group, without reading any array data. See
+        ``HierarchyMirror.mirror`` for a description of the arguments.
 
-    def _removed_layer_in_main_viewer(self, event: Event) -> None:
+        The group, and each of its sub-groups, is only filled in when it is
+        expanded in the view, or made visible.
+
+        Returns
+        -------
+        GroupLayer
+            The GroupLayer that was added to the tree.
         """
-        Action taken when a layer is removed using the main LayerList
-        viewer.
+        self._set_up_components()
+        return self.hierarchy_mirror.mirror(path, name=name, location=location)
 
-        Parameters
-        ----------
-        event : Event
-            Emitted event with attributes
-            - index (of removed layer in LayerList),
-            - value (the layer that was removed).
+    def _update_spill_timer(self, event: Optional[Event] = None) -> None:
+        """Check the spill policies only whilst some group has one."""
+        if event is not None and not event.value.is_group():
+            # Only groups have policies
+            return
+        if not self.spiller.has_policies:
+            self._spill_timer.stop()
+        elif not self._spill_timer.isActive():
+            self._spill_timer.start()
+
+    def _on_view_expanded(self, index: QModelIndex) -> None:
+        """Realise mirrored groups when they are expanded in the view."""
+        item = index.data(ItemRole)
+        if item is not None and item.is_group():
+            self.hierarchy_mirror.realise(item)
+
+    def _on_view_collapsed(self, index: QModelIndex) -> None:
+        """Cancel prefetching for groups when they are collapsed."""
+        item = index.data(ItemRole)
+        if item is not None and item.is_group():
+            self.prefetcher.cancel(item)
+
+    def flatten_group(self, group: GroupLayer) -> FlattenedGroup:
         """
-        self.group_layers.remove_layer_item(layer_ptr=event.value)
+        Replace ``group`` in the tree with a single layer compositing its
+        image layers (see ``group_layer_flatten.flatten_group``), which is
+        added to the viewer in place of the layers in the group.
 
-    def _removed_layer_in_group_layers(self, event: Event) -> None:
+        Returns
+        -------
+        FlattenedGroup
+            The Node that replaced ``group`` in the tree.
         """
-        Action taken when a layer is removed using the GroupLayers view.
+        self._set_up_components()
+        flattened = flatten_group(group)
+        self.reconciler.adopt(flattened)
+        self.flattened_groups.append(flattened)
+        self._flatten_timer.start()
+        return flattened
 
-        Parameters
-        ----------
-        event : Event
-            Emitted event with attributes
-            - index (of the layer that was removed),
-            - value (the layer that was removed).
+    def unflatten_group(self, flattened: FlattenedGroup) -> GroupLayer:
+        """
+        Put a flattened group back into the tree (adding its layers back to
+        the viewer), and remove its composite layer.
+
+        Returns
+        -------
+        GroupLayer
+            The group that was put back.
+        """
+        group = flattened.unflatten()
+        self.reconciler.adopt(group)
+        self.flattened_groups.remove(flattened)
+        if not self.flattened_groups:
+            self._flatten_timer.stop()
+        return group
+
+    def merge_points(self, group: GroupLayer) -> GroupLayerNode:
+        """
+        Merge the points layers directly inside ``group`` into one (see
+        ``group_layer_merge.merge_group_points``), replacing them in the
+        viewer with the merged layer.
+
+        Returns
+        -------
+        GroupLayerNode
+            The Node tracking the merged layer.
+        """
+        node = merge_group_points(group)
+        self.reconciler.adopt(node)
+        return node
+
+    def merge_labels(
+        self, group: GroupLayer, out: Optional[Any] = None
+    ) -> GroupLayerNode:
+        """
+        Merge the labels layers directly inside ``group`` into one (see
+        ``group_layer_merge.merge_group_labels``), replacing them in the
+        viewer with the merged layer.
+
+        Returns
+        -------
+        GroupLayerNode
+            The Node tracking the merged layer.
+        """
+        node = merge_group_labels(group, out=out)
+        self.reconciler.adopt(node)
+        return node
+
+    def split_points(self, node: GroupLayerNode) -> List[GroupLayerNode]:
+        """
+        Split a merged points layer back into the layers it was merged from
+        (see ``group_layer_merge.split_group_points``), replacing it in the
+        viewer with them.
+
+        Returns
+        -------
+        List[GroupLayerNode]
+            The Nodes tracking the rebuilt layers.
+        """
+        nodes = split_group_points(node.parent, node)
+        for item in nodes:
+            self.reconciler.adopt(item)
+        return nodes
+
+    def share_contrast_limits(
+        self,
+        group: GroupLayer,
+        percentiles: Tuple[float, float] = (0, 100),
+    ) -> FunctionWorker:
+        """
+        Compute the joint histogram of the image layers in ``group`` in a
+        worker thread, then give them all the same contrast limits (see
+        ``group_layer_histogram.share_contrast_limits``) on the main thread.
+
+        Returns
+        -------
+        FunctionWorker
+            The (started) worker.
+        """
+        return create_worker(
+            group_joint_histogram,
+            group,
+            _connect={
+                "returned": lambda histogram: share_contrast_limits(
+                    group, percentiles, histogram=histogram
+                )
+            },
+        )
+
+    def zoom_to_group(self, item: GroupLayerNode) -> None:
+        """
+        Fit the camera of the viewer to the extent of ``item`` (a GroupLayer,
+        or a Node tracking a Layer). Does nothing if it has no extent, e.g.
+        an empty group.
+        """
+        extent = item.extent
+        if extent is not None:
+            fit_camera(self.viewer, extent)
+
+    def _is_picking(self) -> bool:
+        """
+        Whether clicks in the canvas should pick items, i.e. the active
+        layer is not in an interactive mode (e.g. painting).
+        """
+        active = self.viewer.layers.selection.active
+        return active is None or str(active.mode) == "pan_zoom"
+
+    def _on_canvas_click(
+        self, viewer: napari.viewer.Viewer, event
+    ) -> Iterator[None]:
         """
-        layer_to_remove = event.value.layer
-        if layer_to_remove in self.global_layers:
-            self.global_layers.remove(layer_to_remove)
+        Select the item under the cursor when the canvas is clicked (but not
+        dragged).
+        """
+        if not self._is_picking():
+            return
+        position = event.position
+        yield
+        if event.type == "mouse_move":
+            # Panning, not clicking
+            return
+        item = self.group_layers.item_at(position)
+        if item is not None:
+            self.group_layers_view.select_item(item)
+
+    def _on_canvas_hover(self, viewer: napari.viewer.Viewer, event) -> None:
+        """
+        Note where the cursor moved to, and look up the item under it once
+        the moves have settled for ``HOVER_INTERVAL`` (see
+        ``_update_hovered_item``).
+        """
+        self._hover_position = event.position
+        if not self._hover_timer.isActive():
+            self._hover_timer.start()
+
+    def _update_hovered_item(self) -> None:
+        """Emit ``item_hovered`` if the item under the cursor has changed."""
+        if self._hover_position is None:
+            return
+        item = self.group_layers.item_at(self._hover_position)
+        if item is not self.hovered_item:
+            self.hovered_item = item
+            self.item_hovered.emit(item)
+
+    def _disconnect_canvas(self) -> None:
+        """Stop picking items in the canvas of the viewer."""
+        self._hover_timer.stop()
+        for callbacks, callback in (
+            (self.viewer.mouse_drag_callbacks, self._on_canvas_click),
+            (self.viewer.mouse_move_callbacks, self._on_canvas_hover),
+        ):
+            if callback in callbacks:
+                callbacks.remove(callback)
 
-    # END FUNCTION BLOCK
+    def closeEvent(self, event) -> None:
+        self._reconcile_timer.stop()
+        self._set_up_timer.stop()
+        if self._components_set_up:
+            self._disconnect_canvas()
+            for timer in (
+                self._loading_timer,
+                self._spill_timer,
+                self._flatten_timer,
+            ):
+                timer.stop()
+            self.loader.shutdown()
+            self.hierarchy_mirror.close()
+            self.spiller.close()
+            self.prefetcher.shutdown()
+            self.statistics_panel.close()
+        super().closeEvent(event)
+
+    def _apply_composites(self) -> None:
+        """Apply the composites recomputed in the background."""
+        for flattened in self.flattened_groups:
+            flattened.apply_completed()
+
+    def _new_layer_group(self) -> None:
+        """
+        Action taken when creating a new, empty layer group in the widget.
+        """
+        self.group_layers.add_new_group()
 
     def _enter_debug(self) -> None:
         """
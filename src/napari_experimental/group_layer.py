@@ -2,10 +2,26 @@ from __future__ import annotations
 
 import random
 import string
+import threading
 from collections import defaultdict
-from typing import Dict, Iterable, List, Literal, Optional
+from contextlib import contextmanager
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
-from napari.layers import Layer
+import numpy as np
 from napari.utils.events import Event
 from napari.utils.events.containers._nested_list import (
     NestedIndex,
@@ -14,7 +30,31 @@ from napari.utils.events.containers._nested_list import (
 from napari.utils.translations import trans
 from napari.utils.tree import Group
 
-from napari_experimental.group_layer_node import GroupLayerNode
+from napari_experimental.group_layer_extent import combine_extents
+from napari_experimental.group_layer_freeze import freeze_layer, thaw_layer
+from napari_experimental.group_layer_memory import MemoryFootprint
+from napari_experimental.group_layer_node import GroupLayerNode, is_layer
+from napari_experimental.group_layer_search import GroupLayerSearchIndex
+from napari_experimental.group_layer_snapshot import GroupLayerSnapshot
+from napari_experimental.group_layer_spatial import GroupLayerSpatialIndex
+from napari_experimental.group_layer_spill import SpillPolicy
+from napari_experimental.group_layer_transform import (
+    apply_group_transforms,
+    as_affine_matrix,
+    compose_affines,
+)
+
+if TYPE_CHECKING:
+    from napari.layers import Layer
+
+LayerTypeFilter = Union[
+    str, Type["Layer"], Iterable[Union[str, Type["Layer"]]]
+]
+# Nested mapping of group names to either further groups, or to the items
+# (Layers, GroupLayerNodes or GroupLayers) that a group contains.
+Hierarchy = Mapping[
+    str, Union["Hierarchy", Iterable[Union["Layer", GroupLayerNode]]]
+]
 
 
 def random_string(str_length: int = 5) -> str:
@@ -56,7 +96,17 @@ class GroupLayer(Group[GroupLayerNode], GroupLayerNode):
     """
 
     __next_uid: int = -1
+    __uid_lock = threading.Lock()
     _uid: int
+    _search_index: Optional[GroupLayerSearchIndex]
+    _spatial_index: Optional[GroupLayerSpatialIndex]
+    _snapshot: Optional[GroupLayerSnapshot]
+    _affine: Optional[np.ndarray]
+    # Cached composition of the affines of this GroupLayer and those above
+    # it, see ``composed_affine``
+    _composed_affine: Optional[np.ndarray]
+    _composed_affine_cached: bool
+    _spill_policy: Optional[SpillPolicy]
 
     @property
     def name(self) -> str:
@@ -67,7 +117,10 @@ class GroupLayer(Group[GroupLayerNode], GroupLayerNode):
 
     @name.setter
     def name(self, value: str) -> None:
+        if value == self._name:
+            return
         self._name = value
+        self.events.name(value=self)
 
     @property
     def visible(self):
@@ -78,9 +131,161 @@ class GroupLayer(Group[GroupLayerNode], GroupLayerNode):
         for item in self.traverse():
             if item.is_group():
                 item._visible = value
-            else:
+            elif item.is_tracking:
                 item.layer.visible = value
         self._visible = value
+        self.events.visible(value=self)
+
+    @property
+    def spill_policy(self) -> Optional[SpillPolicy]:
+        """
+        Opt-in policy for spilling the data of the Layers in this GroupLayer
+        to disk whilst it is hidden, applied by a ``GroupLayerSpiller``.
+        """
+        return self._spill_policy
+
+    @spill_policy.setter
+    def spill_policy(self, value: Optional[SpillPolicy]) -> None:
+        self._spill_policy = value
+        self.events.spill_policy(value=self)
+
+    @property
+    def affine(self) -> Optional[np.ndarray]:
+        """
+        Affine transform of this GroupLayer, as an ``(n + 1, n + 1)``
+        homogeneous matrix, or None for the identity.
+
+        The transform applies to every Layer inside this GroupLayer (at any
+        depth), on top of the transforms of the GroupLayers inside it and
+        the Layer's own affine, and is composed with the transforms of the
+        GroupLayers above it (see ``composed_affine``). Setting it (to a
+        matrix, or a napari ``Affine``) updates the affines of all those
+        Layers in one batch, each Layer being refreshed once. Matrices with
+        fewer dimensions than a Layer act on its last dimensions.
+        """
+        return self._affine
+
+    @affine.setter
+    def affine(self, value: Any) -> None:
+        self._affine = as_affine_matrix(value)
+        self._invalidate_composed_affine()
+        self._apply_transforms(self)
+        self.events.affine(value=self)
+
+    @property
+    def composed_affine(self) -> Optional[np.ndarray]:
+        """
+        Composition of the affines of this GroupLayer and all the
+        GroupLayers above it, which is applied to the Layers directly inside
+        this GroupLayer, or None if none of them have an affine.
+
+        The composed affine is cached, and discarded for the GroupLayers
+        inside a GroupLayer whose affine is set, or which is inserted,
+        removed or moved, rather than being recomputed from the root each
+        time.
+        """
+        if not self._composed_affine_cached:
+            outer = (
+                None if self.parent is None else self.parent.composed_affine
+            )
+            self._composed_affine = compose_affines(outer, self._affine)
+            self._composed_affine_cached = True
+        return self._composed_affine
+
+    @property
+    def frozen(self) -> bool:
+        """
+        Whether the Layers in this GroupLayer (at any depth) are frozen.
+
+        Frozen Layers are not refreshed or re-sliced, so changing their
+        properties or stepping through the dims (including during dims
+        playback) does no rendering work for them. Instead, the changes are
+        buffered, and each Layer is refreshed once when it is unfrozen.
+        Layers added to a frozen GroupLayer are frozen, and Layers removed
+        from it are unfrozen. See also ``freeze``.
+
+        Visible Layers are still re-sliced as the dims change if napari's
+        asynchronous slicing is enabled, see ``freeze_layer``.
+        """
+        return self._frozen
+
+    @frozen.setter
+    def frozen(self, value: bool) -> None:
+        if value == self._frozen:
+            return
+        self._frozen = value
+        # Only frozen GroupLayers listen for the items inserted into (and
+        # removed from) them
+        for emitter in (self.events.inserted, self.events.removed):
+            if value:
+                emitter.connect(self._update_frozen_items)
+            else:
+                emitter.disconnect(self._update_frozen_items)
+        for node, _, _ in self.iter_layers():
+            if node.is_tracking:
+                (freeze_layer if value else thaw_layer)(node.layer)
+
+    @property
+    def footprint(self) -> MemoryFootprint:
+        """
+        Footprint of the data of all the Layers inside this GroupLayer,
+        split into in-memory, memory-mapped and lazy bytes (see ``nbytes``
+        for the total). Layers tracked by several Nodes are counted once per
+        Node.
+
+        The footprint is cached, and adjusted as items are inserted and
+        removed anywhere inside the tree, and as the data of the Layers is
+        replaced, rather than recomputed by walking the Layers each time.
+        """
+        if self._footprint is None:
+            footprint = MemoryFootprint()
+            for item in self:
+                footprint += item.footprint
+            self._footprint = footprint
+        return self._footprint
+
+    @property
+    def extent(self) -> Optional[np.ndarray]:
+        """
+        World extent spanning all the Layers inside this GroupLayer, as a
+        ``(2, ndim)`` array of the minima and maxima along each axis, or
+        None if there are no Layers. Layers with fewer dimensions are
+        aligned to the last dimensions (see ``combine_extents``).
+
+        The extent is cached, combined from the cached extents of the items
+        in this GroupLayer, and discarded as items are inserted, removed or
+        moved anywhere inside the tree, or as the data or transform of a
+        Layer inside it changes. Recomputing it after a change therefore
+        only revisits the GroupLayers above the item that changed.
+        """
+        if not self._extent_cached:
+            extents = [item.extent for item in self]
+            self._extent = combine_extents(
+                [extent for extent in extents if extent is not None]
+            )
+            self._extent_cached = True
+        return self._extent
+
+    @property
+    def search_index(self) -> GroupLayerSearchIndex:
+        """
+        Index of the names and layer types of the items in this tree.
+        Built on first access, and kept up to date incrementally thereafter.
+        """
+        if self._search_index is None:
+            self._search_index = GroupLayerSearchIndex(self)
+        return self._search_index
+
+    @property
+    def spatial_index(self) -> GroupLayerSpatialIndex:
+        """
+        Index of the world extents of the items in this tree, used to find
+        the items under a point. Built on first access, and kept up to date
+        incrementally thereafter.
+        """
+        if self._spatial_index is None:
+            self._spatial_index = GroupLayerSpatialIndex(self)
+        return self._spatial_index
 
     @property
     def uid(self) -> int:
@@ -121,7 +326,7 @@ class GroupLayer(Group[GroupLayerNode], GroupLayerNode):
         )
 
         items_after_casting_layers = [
-            GroupLayerNode(item) if isinstance(item, Layer) else item
+            GroupLayerNode(item) if is_layer(item) else item
             for item in items_to_include
         ]
         assert all(
@@ -137,6 +342,18 @@ class GroupLayer(Group[GroupLayerNode], GroupLayerNode):
             name=random_string(),
             basetype=GroupLayerNode,
         )
+        # Renaming a GroupLayer emits an event (with the renamed GroupLayer
+        # as the value), which bubbles up the tree like the other events.
+        self.events.add(name=Event)
+        # Likewise when its visibility is set
+        self.events.add(visible=Event)
+        # And once for each batch of edits to the properties of its Layers
+        # (see ``group_layer_edits.set_layer_property``)
+        self.events.add(layer_properties=Event)
+        # And when its affine is set
+        self.events.add(affine=Event)
+        # And when its spill policy is set
+        self.events.add(spill_policy=Event)
 
         # If selection changes on this node, propagate changes to any children
         self.selection.events.changed.connect(self.propagate_selection)
@@ -144,14 +361,56 @@ class GroupLayer(Group[GroupLayerNode], GroupLayerNode):
         # Default to group being visible
         self._visible = True
 
+        self._spill_policy = None
+
+        self._search_index = None
+        self._spatial_index = None
+
+        # Structural changes anywhere in the tree bubble up to this
+        # GroupLayer, and invalidate its cached snapshot.
+        self._snapshot = None
+        for emitter in (
+            self.events.inserted,
+            self.events.removed,
+            self.events.moved,
+            self.events.changed,
+        ):
+            emitter.connect(self._invalidate_snapshot)
+        # Items inserted into / removed from sub-groups are included, since
+        # their events bubble up too.
+        self.events.inserted.connect(self._adjust_footprint)
+        self.events.removed.connect(self._adjust_footprint)
+        for emitter in (
+            self.events.inserted,
+            self.events.removed,
+            self.events.moved,
+        ):
+            emitter.connect(self._invalidate_extent)
+
+        self._frozen = False
+
+        self._affine = None
+        self._composed_affine = None
+        self._composed_affine_cached = False
+        for emitter in (
+            self.events.inserted,
+            self.events.removed,
+            self.events.moved,
+        ):
+            emitter.connect(self._update_transformed_items)
+
     @classmethod
     def _next_uid(cls) -> int:
         """
         Return the next free unique ID that can be assigned to an instance of
         this class, then increment the counter to the next available index.
+
+        GroupLayers may be created on worker threads (see ``from_hierarchy``),
+        so the counter is only accessed whilst holding a lock.
         """
-        cls.__next_uid += 1
-        return cls.__next_uid
+        with GroupLayer.__uid_lock:
+            cls.__next_uid += 1
+            return cls.__next_uid
 
     @staticmethod
     def _revise_indices_based_on_previous_moves(
@@ -244,20 +503,7 @@ class GroupLayer(Group[GroupLayerNode], GroupLayerNode):
                 f"Unknown item type to insert into Tree: {item_type} "
                 "(expected 'Node' or 'Group')"
             )
-        if location is None:
-            location = ()
-        insert_to_group, insertion_index = split_nested_index(location)
-
-        insertion_group = (
-            self if not insert_to_group else self[insert_to_group]
-        )
-        if not insertion_group.is_group():
-            raise ValueError(
-                f"Item at {insert_to_group} is not a Group, "
-                "so cannot have an item inserted!"
-            )
-        if insertion_index == -1:
-            insertion_index = len(insertion_group)
+        insertion_group, insertion_index = self._resolve_location(location)
 
         if item_type == "Node":
             if layer_ptr is None:
@@ -277,6 +523,107 @@ class GroupLayer(Group[GroupLayerNode], GroupLayerNode):
                 group_items = ()
             insertion_group.insert(insertion_index, GroupLayer(*group_items))
 
+    def _resolve_location(
+        self, location: Optional[NestedIndex | int]
+    ) -> Tuple[GroupLayer, int]:
+        """
+        Return the GroupLayer, and the index within it, that ``location``
+        refers to as a position to insert an item at. Items are inserted at
+        the end of the top level of the tree by default.
+        """
+        if location is None:
+            location = ()
+        insert_to_group, insertion_index = split_nested_index(location)
+
+        insertion_group = (
+            self if not insert_to_group else self[insert_to_group]
+        )
+        if not insertion_group.is_group():
+            raise ValueError(
+                f"Item at {insert_to_group} is not a Group, "
+                "so cannot have an item inserted!"
+            )
+        if insertion_index == -1:
+            insertion_index = len(insertion_group)
+        return insertion_group, insertion_index
+
+    def _iter_tree(
+        self,
+        include_groups: bool,
+        include_layers: bool,
+        layer_type: Optional[LayerTypeFilter] = None,
+        visible: Optional[bool] = None,
+        max_depth: Optional[int] = None,
+        under: Optional[NestedIndex | int | GroupLayer] = None,
+    ) -> Iterator[Tuple[GroupLayerNode, NestedIndex, int]]:
+        """
+        Abstract generator handling the (filtered) traversal of the tree.
+        See also `iter_layers` and `iter_groups`.
+
+        Items are yielded in flat index order, along with their NestedIndex
+        (relative to this GroupLayer) and their depth. Nothing is computed
+        ahead of the item being yielded, and subtrees that cannot contain
+        items passing the filters are never entered.
+        """
+        if under is None:
+            start, start_index = self, ()
+        elif isinstance(under, GroupLayer):
+            start, indices = under, []
+            while start is not self:
+                if start.parent is None:
+                    raise ValueError(f"{under} is not inside {self}.")
+                indices.append(start.index_in_parent())
+                start = start.parent
+            start, start_index = under, tuple(reversed(indices))
+        else:
+            start_index = (under,) if isinstance(under, int) else tuple(under)
+            start = self[start_index] if start_index else self
+        if not start.is_group():
+            raise ValueError(f"Item at {under} is not a Group.")
+
+        type_strings, type_classes = set(), ()
+        if layer_type is not None:
+            if isinstance(layer_type, (str, type)):
+                layer_type = (layer_type,)
+            type_strings = {
+                t.lower() for t in layer_type if isinstance(t, str)
+            }
+            type_classes = tuple(t for t in layer_type if isinstance(t, type))
+
+        def layer_passes(node: GroupLayerNode) -> bool:
+            if layer_type is None and visible is None:
+                return True
+            if not node.is_tracking:
+                return False
+            if layer_type is not None and not (
+                node.layer._type_string in type_strings
+                or isinstance(node.layer, type_classes)
+            ):
+                return False
+            return visible is None or node.layer.visible == visible
+
+        # Stack of (NestedIndex of a group, iterator over its children).
+        # Its size is bounded by the depth of the tree.
+        stack = [(start_index, iter(enumerate(start)))]
+        while stack:
+            group_index, children = stack[-1]
+            for position, item in children:
+                item_index = (*group_index, position)
+                depth = len(item_index)
+                if item.is_group():
+                    if visible and not item.visible:
+                        continue
+                    if include_groups:
+                        yield item, item_index, depth
+                    if max_depth is None or depth < max_depth:
+                        # Descend, resuming this group once exhausted
+                        stack.append((item_index, iter(enumerate(item))))
+                        break
+                elif include_layers and layer_passes(item):
+                    yield item, item_index, depth
+            else:
+                stack.pop()
+
     def _move_plan(
         self, sources: Iterable[NestedIndex], dest_index: NestedIndex
     ):
@@ -330,8 +677,9 @@ class GroupLayer(Group[GroupLayerNode], GroupLayerNode):
 
         # (Relative) flat index order must be preserved when moving multiple
         # items, so sort the order of the sources here to ensure consistency.
-        flat_order = self.flat_index_order(include_groups=True)
-        to_move = sorted(to_move, key=lambda x: flat_order.index(x))
+        # NestedIndex-es sort lexicographically in flat index order (with
+        # groups), so there is no need to compute the flat order itself.
+        to_move = sorted(to_move)
 
         dest_group_ind, dest_ind = split_nested_index(dest_index)
         dest_group = self[dest_group_ind]
@@ -362,6 +710,126 @@ class GroupLayer(Group[GroupLayerNode], GroupLayerNode):
             # we have done so far.
             previous_moves[src[:-1]].append(src[-1])
 
+    @classmethod
+    def from_hierarchy(
+        cls, hierarchy: Hierarchy, name: Optional[str] = None
+    ) -> GroupLayer:
+        """
+        Build a detached tree from a nested mapping of group names.
+
+        Each value of ``hierarchy`` is either a further mapping, which
+        becomes a sub-GroupLayer, or an iterable of Layers (or
+        GroupLayerNodes / GroupLayers), which becomes a GroupLayer holding
+        those items. For example, a plate could be given as
+        ``{"A1": {"field_0": [dapi, gfp]}, "A2": {...}}``.
+
+        No events are emitted whilst the tree is built, and no Qt objects
+        are created, so this can be called from a worker thread. The
+        result should then be added to the live tree (on the main thread)
+        using ``graft``.
+
+        Parameters
+        ----------
+        hierarchy : Mapping
+            The structure of the tree to build.
+        name : str, optional
+            Name to give the root of the new tree.
+        """
+        group = cls()
+        with group.events.blocker_all():
+            if name is not None:
+                group.name = name
+            for key, value in hierarchy.items():
+                if isinstance(value, Mapping):
+                    child = cls.from_hierarchy(value, name=key)
+                else:
+                    child = cls()
+                    with child.events.blocker_all():
+                        child.name = key
+                        child.extend(
+                            (GroupLayerNode(item) if is_layer(item) else item)
+                            for item in value
+                        )
+                group.append(child)
+        return group
+
+    def _adjust_footprint(self, event: Event) -> None:
+        """
+        Adjust the cached footprint (if there is one) for an item that has
+        been inserted or removed.
+        """
+        if self._footprint is None:
+            return
+        if event.type == "inserted":
+            self._footprint += event.value.footprint
+        else:
+            self._footprint -= event.value.footprint
+
+    def _update_frozen_items(self, event: Event) -> None:
+        """
+        Freeze the Layers inserted into a frozen GroupLayer, and unfreeze
+        those removed from it. Only connected whilst the GroupLayer is
+        frozen.
+        """
+        item = event.value
+        nodes = (
+            (node for node, _, _ in item.iter_layers())
+            if item.is_group()
+            else (item,)
+        )
+        change = freeze_layer if event.type == "inserted" else thaw_layer
+        for node in nodes:
+            if node.is_tracking:
+                change(node.layer)
+
+    def _invalidate_composed_affine(self) -> None:
+        """
+        Discard the cached composed affines of this GroupLayer and of the
+        GroupLayers inside it.
+        """
+        self._composed_affine_cached = False
+        for group, _, _ in self.iter_groups():
+            group._composed_affine_cached = False
+
+    @staticmethod
+    def _apply_transforms(item: GroupLayerNode) -> None:
+        """
+        Give the Layers in ``item`` (or tracked by it) the composed affine
+        of the GroupLayer they are directly inside, in one batch.
+        """
+        nodes = (
+            (node for node, _, _ in item.iter_layers())
+            if item.is_group()
+            else (item,)
+        )
+        updates = []
+        for node in nodes:
+            if not node.is_tracking:
+                continue
+            group = node.parent
+            composed = None if group is None else group.composed_affine
+            updates.append((node.layer, composed))
+        apply_group_transforms(updates)
+
+    def _update_transformed_items(self, event: Event) -> None:
+        """
+        Update the transforms of the Layers in an item that has been
+        inserted, removed or moved, since the GroupLayers above it (if any)
+        have changed. Items removed from the tree keep only the transforms
+        of the GroupLayers they take with them.
+        """
+        if self.parent is not None:
+            # The event bubbles up, so is handled once, by the root
+            return
+        item = event.value
+        if item.is_group():
+            item._invalidate_composed_affine()
+        self._apply_transforms(item)
+
+    def _invalidate_snapshot(self, event: Optional[Event] = None) -> None:
+        """Discard the cached snapshot of the tree, see ``tree_snapshot``."""
+        self._snapshot = None
+
     def _node_name(self) -> str:
         """Will be used when rendering node tree as string."""
         return f"GL-{self.name}"
@@ -429,6 +897,95 @@ class GroupLayer(Group[GroupLayerNode], GroupLayerNode):
                     return True
         return False
 
+    def find(self, path: str) -> GroupLayerNode:
+        """
+        Return the item at the given ``path`` in the tree.
+
+        Paths are the names of the GroupLayers leading to the item, followed
+        by the name of the item itself, separated by "/" (for example,
+        ``"GroupA/GroupAA/cells"``). Paths are relative to this GroupLayer,
+        so do not include its name. Lookups use ``search_index``, so take
+        time proportional to the length of the path, regardless of the size
+        of the tree.
+
+        Parameters
+        ----------
+        path : str
+            Path to the item to return.
+
+        Raises
+        ------
+        KeyError
+            If there is no item at the given path.
+        ValueError
+            If more than one item matches the given path.
+        """
+        index = self.search_index
+        candidates: List[GroupLayerNode] = [self]
+        for name in path.strip("/").split("/"):
+            candidates = [
+                child
+                for group in candidates
+                if group.is_group()
+                for child in index.children_named(group, name)
+            ]
+            if not candidates:
+                raise KeyError(f"No item found at {path} in {self}")
+        if len(candidates) > 1:
+            raise ValueError(
+                f"{len(candidates)} items match the path {path} in {self}"
+            )
+        return candidates[0]
+
+    def graft(
+        self,
+        subtree: GroupLayer,
+        location: Optional[NestedIndex | int] = None,
+    ) -> None:
+        """
+        Insert a detached tree (for example, one built by
+        ``from_hierarchy``) into this tree.
+
+        The whole subtree is inserted at once, so a single ``inserted``
+        event is emitted (with the subtree as its value), however many
+        items the subtree contains. This should be called from the main
+        thread.
+
+        Parameters
+        ----------
+        subtree : GroupLayer
+            The tree to insert. It must not already be inside another tree.
+        location : NestedIndex | int, optional
+            Location at which to insert the subtree. Subtrees are added at
+            the end of the top level of the tree by default.
+        """
+        if subtree.parent is not None:
+            raise ValueError(
+                f"{subtree} is already inside {subtree.parent}, "
+                "so cannot be grafted."
+            )
+        insertion_group, insertion_index = self._resolve_location(location)
+        insertion_group.insert(insertion_index, subtree)
+
+    @contextmanager
+    def freeze(self) -> Iterator[GroupLayer]:
+        """
+        Context manager freezing this GroupLayer (see ``frozen``) for the
+        duration of the block, for example whilst editing many Layers::
+
+            with group.freeze():
+                for node, _, _ in group.iter_layers():
+                    node.layer.opacity = 0.5
+
+        The GroupLayer is returned to its previous state on exit.
+        """
+        was_frozen = self.frozen
+        self.frozen = True
+        try:
+            yield self
+        finally:
+            self.frozen = was_frozen
+
     def flat_index_order(
         self, include_groups: bool = False
     ) -> List[NestedIndex]:
@@ -474,20 +1031,13 @@ class GroupLayer(Group[GroupLayerNode], GroupLayerNode):
             Whether to assign groups their own place in the order,
             or to skip over them.
         """
-        order: List[NestedIndex] = []
-        for item in self:
-            if item.is_group():
-                # This is a group, descend into it and append
-                # its ordering to our current ordering
-                item: GroupLayer
-                if include_groups:
-                    order.append(item.index_from_root())
-                order += item.flat_index_order(include_groups=include_groups)
-            else:
-                # This is just a node, and it is the next one in
-                # the order
-                order.append(item.index_from_root())
-        return order
+        root_index = self.index_from_root()
+        return [
+            (*root_index, *nested_index)
+            for _, nested_index, _ in self._iter_tree(
+                include_groups=include_groups, include_layers=True
+            )
+        ]
 
     def is_group(self) -> bool:
         """
@@ -500,6 +1050,104 @@ class GroupLayer(Group[GroupLayerNode], GroupLayerNode):
         """
         return True  # A GroupLayer is ALWAYS a branch.
 
+    def iter_groups(
+        self,
+        visible: Optional[bool] = None,
+        max_depth: Optional[int] = None,
+        under: Optional[NestedIndex | int | GroupLayer] = None,
+    ) -> Iterator[Tuple[GroupLayer, NestedIndex, int]]:
+        """
+        Lazily iterate over the GroupLayers inside this tree, in flat index
+        order. See ``iter_layers`` for a description of the arguments and
+        the values that are yielded.
+        """
+        yield from self._iter_tree(
+            include_groups=True,
+            include_layers=False,
+            visible=visible,
+            max_depth=max_depth,
+            under=under,
+        )
+
+    def iter_layers(
+        self,
+        layer_type: Optional[LayerTypeFilter] = None,
+        visible: Optional[bool] = None,
+        max_depth: Optional[int] = None,
+        under: Optional[NestedIndex | int | GroupLayer] = None,
+    ) -> Iterator[Tuple[GroupLayerNode, NestedIndex, int]]:
+        """
+        Lazily iterate over the (Nodes tracking) Layers in this tree, in flat
+        index order, yielding ``(node, nested_index, depth)`` tuples.
+
+        The NestedIndex and depth are relative to this GroupLayer, so items
+        at the top level of the tree have depth 1. No intermediate lists are
+        built, so the memory used is independent of the size of the tree,
+        and breaking out of the loop stops the traversal. Subtrees that are
+        ruled out by ``visible``, ``max_depth`` or ``under`` are not entered.
+
+        Parameters
+        ----------
+        layer_type : str | type[Layer] | Iterable[str | type[Layer]], optional
+            Only yield Layers of this type (or of one of these types).
+            Types can be given as Layer classes (e.g. ``Image``), or as type
+            strings (e.g. ``"image"``).
+        visible : bool, optional
+            If True, only yield visible Layers, and skip hidden GroupLayers
+            entirely. If False, only yield hidden Layers.
+        max_depth : int, optional
+            Do not yield items deeper than this in the tree.
+        under : NestedIndex | int | GroupLayer, optional
+            Only iterate over the subtree of this GroupLayer (given by its
+            position in the tree, or the GroupLayer itself).
+        """
+        yield from self._iter_tree(
+            include_groups=False,
+            include_layers=True,
+            layer_type=layer_type,
+            visible=visible,
+            max_depth=max_depth,
+            under=under,
+        )
+
+    def nodes_named(self, name: str) -> List[GroupLayerNode]:
+        """
+        Return all the items in the tree called ``name``, in flat index order.
+
+        Lookups use ``search_index``, so the time taken depends on the
+        number of items returned, rather than the size of the tree.
+
+        Parameters
+        ----------
+        name : str
+            Name (case-sensitive) of the items to return.
+        """
+        items = self.search_index.nodes_named(name)
+        if len(items) < 2:
+            return list(items)
+        return sorted(items, key=lambda item: item.index_from_root())
+
+    def item_at(
+        self, position: Sequence[float], visible: bool = True
+    ) -> Optional[GroupLayerNode]:
+        """
+        The deepest item in this tree whose world extent contains
+        ``position`` (e.g. the position of the cursor in the canvas), or
+        None if there is none. Items at the same depth are resolved to the
+        one drawn on top.
+
+        Lookups use ``spatial_index``, so only the items near ``position``
+        are examined, rather than every item in the tree.
+
+        Parameters
+        ----------
+        position : Sequence[float]
+            World position, aligned with the last dimensions of the Layers.
+        visible : bool, default = True
+            Only consider items that are visible, and in visible groups.
+        """
+        return self.spatial_index.item_at(position, visible=visible)
+
     def remove_layer_item(self, layer_ptr: Layer, prune: bool = True) -> None:
         """
         Removes (all instances of) GroupLayerNodes tracking the given
@@ -531,6 +1179,20 @@ class GroupLayer(Group[GroupLayerNode], GroupLayerNode):
             elif node.layer is layer_ptr:
                 self.remove(node)
 
+    def tree_snapshot(self) -> GroupLayerSnapshot:
+        """
+        Return a structure-of-arrays snapshot of this tree, with the items
+        in Euler-tour order (this GroupLayer first). See
+        ``GroupLayerSnapshot`` for details of the arrays that are provided.
+
+        The snapshot is cached, and is only rebuilt when it is requested
+        after items have been inserted, removed or moved in the tree.
+        The snapshot should be treated as read-only.
+        """
+        if self._snapshot is None:
+            self._snapshot = GroupLayerSnapshot(self)
+        return self._snapshot
+
     def propagate_selection(
         self,
         event: Optional[Event] = None,
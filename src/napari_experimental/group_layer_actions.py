@@ -1,14 +1,16 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, List, Optional
 
 from app_model.types import Action
 from qtpy.QtCore import QPoint
 from qtpy.QtWidgets import QAction, QMenu
 
 from napari_experimental.group_layer import GroupLayer
+from napari_experimental.group_layer_extent import combine_extents, fit_camera
 
 if TYPE_CHECKING:
+    import napari
     from qtpy.QtWidgets import QWidget
 
 
@@ -21,10 +23,18 @@ class GroupLayerActions:
     ----------
     group_layers: GroupLayer
         Group layers to apply actions to
+    viewer: napari.viewer.Viewer, optional
+        Viewer whose camera is moved by the zoom_to_selection action, which
+        is only available if a viewer is given
     """
 
-    def __init__(self, group_layers: GroupLayer) -> None:
+    def __init__(
+        self,
+        group_layers: GroupLayer,
+        viewer: Optional[napari.viewer.Viewer] = None,
+    ) -> None:
         self.group_layers = group_layers
+        self.viewer = viewer
 
         self.actions: List[Action] = [
             Action(
@@ -33,6 +43,14 @@ class GroupLayerActions:
                 callback=self._toggle_visibility,
             )
         ]
+        if viewer is not None:
+            self.actions.append(
+                Action(
+                    id="napari:grouplayer:zoom_to_selection",
+                    title="zoom_to_selection",
+                    callback=self._zoom_to_selection,
+                )
+            )
 
     def _toggle_visibility(self):
         """Toggle the visibility of all selected groups and layers. If some
@@ -56,11 +74,21 @@ class GroupLayerActions:
 
         # Toggle the visibility of the relevant selection
         for item in items_to_toggle:
-            if not item.is_group():
+            if item.is_group():
+                item.visible = not item.visible
+            elif item.is_tracking:
                 visibility = item.layer.visible
                 item.layer.visible = not visibility
-            else:
-                item.visible = not item.visible
+
+    def _zoom_to_selection(self):
+        """Fit the camera to the extent of the selected groups and layers
+        (see GroupLayer.extent)."""
+        extents = [item.extent for item in self.group_layers.selection]
+        extent = combine_extents(
+            [extent for extent in extents if extent is not None]
+        )
+        if extent is not None:
+            fit_camera(self.viewer, extent)
 
 
 class ContextMenu(QMenu):
@@ -21,11 +21,13 @@ class QtGroupLayerControls(QFrame):
     """Group layer controls - for now, this just displays a message to the
     user"""
 
-    def __init__(self) -> None:
+    def __init__(
+        self, message: str = "Select individual layer to view layer controls"
+    ) -> None:
         super().__init__()
         self.setLayout(QHBoxLayout())
 
-        label = QLabel("Select individual layer to view layer controls")
+        label = QLabel(message)
         label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         icon = QLabel()
         icon.setObjectName("info_icon")
@@ -94,6 +96,10 @@ class QtGroupLayerControlsContainer(QtLayerControlsContainer):
             Event with the target item at `event.value`.
         """
         item = event.value
+        # Groups may be inserted with items already inside them, e.g. when
+        # a subtree is grafted into the tree
+        if item.is_group():
+            self._initialise_controls(item)
         self._add_item(item)
 
     def _add_item(self, item: GroupLayer | GroupLayerNode) -> None:
@@ -104,8 +110,12 @@ class QtGroupLayerControlsContainer(QtLayerControlsContainer):
         item : GroupLayer or GroupLayerNode
             Item to add control widget for.
         """
+        if item in self.widgets:
+            return
         if item.is_group():
             controls = QtGroupLayerControls()
+        elif not item.is_tracking:
+            controls = QtGroupLayerControls("Layer is loading")
         else:
             layer = item.layer
             controls = create_qt_layer_controls(layer)
@@ -147,10 +157,11 @@ class QtGroupLayerControlsContainer(QtLayerControlsContainer):
         event : Event
             Event with the target item at `event.value`.
         """
-        item = event.value
-        controls = self.widgets[item]
-        self.removeWidget(controls)
-        controls.hide()
-        controls.deleteLater()
-        controls = None
-        del self.widgets[item]
+        # The items inside a removed group are removed along with it
+        for item in event.value.traverse():
+            controls = self.widgets.pop(item, None)
+            if controls is None:
+                continue
+            self.removeWidget(controls)
+            controls.hide()
+            controls.deleteLater()
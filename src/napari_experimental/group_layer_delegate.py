@@ -7,8 +7,9 @@ from napari._qt.containers._base_item_model import ItemRole
 from napari._qt.containers._layer_delegate import LayerDelegate
 from napari._qt.containers.qt_layer_model import ThumbnailRole
 from napari._qt.qt_resources import QColoredSVGIcon
-from qtpy.QtCore import QPoint, QSize, Qt
+from qtpy.QtCore import QPoint, QSize, QSortFilterProxyModel, Qt
 from qtpy.QtGui import QMouseEvent, QPainter, QPixmap
+from qtpy.QtWidgets import QStyle
 
 from napari_experimental.group_layer_actions import (
     ContextMenu,
@@ -20,6 +21,7 @@ if TYPE_CHECKING:
     from qtpy.QtWidgets import QStyleOptionViewItem
 
     from napari_experimental.group_layer_qt import (
+        QtGroupLayerFilterProxyModel,
         QtGroupLayerModel,
         QtGroupLayerView,
     )
@@ -44,6 +46,16 @@ class GroupLayerDelegate(LayerDelegate):
                 Path(__file__).parent / "resources" / f"{icon_name}.svg"
             )
             icon = QColoredSVGIcon(str(icon_path))
+        elif not item.is_tracking:
+            if not item.is_loading:
+                return
+            # Placeholder for a layer that is still loading: dim the name,
+            # and show an hourglass in place of the layer type icon.
+            option.text = f"{option.text} (loading...)"
+            option.state &= ~QStyle.StateFlag.State_Enabled
+            icon = QColoredSVGIcon(
+                str(Path(__file__).parent / "resources" / "hourglass.svg")
+            )
         else:
             icon_name = f"new_{item.layer._type_string}"
             try:
@@ -102,15 +114,20 @@ class GroupLayerDelegate(LayerDelegate):
     def show_context_menu(
         self,
         index: QtCore.QModelIndex,
-        model: QtGroupLayerModel,
+        model: QtGroupLayerModel | QtGroupLayerFilterProxyModel,
         pos: QPoint,
         parent: QtGroupLayerView,
     ):
         """Show the group layer context menu.
         To add a new item to the menu, update the GroupLayerActions.
         """
+        if isinstance(model, QSortFilterProxyModel):
+            # The view is displaying search results
+            model = model.sourceModel()
         if not hasattr(self, "_context_menu"):
-            self._group_layer_actions = GroupLayerActions(model._root)
+            self._group_layer_actions = GroupLayerActions(
+                model._root, viewer=parent.viewer
+            )
             self._context_menu = ContextMenu(
                 self._group_layer_actions, parent=parent
             )
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import copy
+from collections import deque
+from typing import TYPE_CHECKING, Any, Deque, Iterable, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from napari_experimental.group_layer_freeze import freeze_layer, thaw_layer
+
+if TYPE_CHECKING:
+    from napari.layers import Layer
+
+    from napari_experimental.group_layer import GroupLayer, LayerTypeFilter
+
+# Number of batches of property edits that can be undone, per GroupLayer
+PROPERTY_EDIT_HISTORY = 32
+
+
+class LayerPropertyEdit:
+    """
+    An edit of one property (e.g. ``"opacity"``) of many Layers, which is
+    applied, and undone, as a single batch.
+
+    Whilst the edit is applied (or undone), the Layers are frozen (see
+    ``freeze_layer``), so each Layer is refreshed once at the end rather
+    than once per change. If setting the property fails for one of the
+    Layers, the Layers that were already changed are returned to their
+    previous values, and the error is raised.
+
+    Parameters
+    ----------
+    name : str
+        Name of the property to set.
+    value : Any
+        Value to set the property to, on every Layer.
+    layers : Iterable[Layer]
+        Layers to set the property of.
+    """
+
+    def __init__(self, name: str, value: Any, layers: Iterable[Layer]) -> None:
+        self.name = name
+        self.value = value
+        self.layers: List[Layer] = list(layers)
+        # Values of the property before the edit, once it has been applied
+        self._previous: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self.layers)
+
+    def _set(self, values: List[Tuple[Layer, Any]]) -> None:
+        """Set the property of each Layer, frozen, as one batch."""
+        for layer, _ in values:
+            freeze_layer(layer)
+        changed: List[Tuple[Layer, Any]] = []
+        try:
+            for layer, value in values:
+                previous = copy.copy(getattr(layer, self.name))
+                setattr(layer, self.name, value)
+                changed.append((layer, previous))
+        except Exception:
+            for layer, previous in reversed(changed):
+                setattr(layer, self.name, previous)
+            raise
+        finally:
+            for layer, _ in values:
+                thaw_layer(layer)
+
+    def apply(self) -> None:
+        """Set the property of all the Layers to ``value``."""
+        self._previous = [
+            copy.copy(getattr(layer, self.name)) for layer in self.layers
+        ]
+        self._set([(layer, self.value) for layer in self.layers])
+
+    def undo(self) -> None:
+        """Return the property of all the Layers to their previous values."""
+        self._set(list(zip(self.layers, self._previous)))  # noqa: B905
+
+
+# GroupLayer -> batches of property edits that can be undone, oldest first.
+# Only GroupLayers whose properties have been edited have an entry.
+_HISTORIES: WeakKeyDictionary[GroupLayer, Deque[LayerPropertyEdit]] = (
+    WeakKeyDictionary()
+)
+
+
+def set_layer_property(
+    group: GroupLayer,
+    name: str,
+    value: Any,
+    layer_type: Optional[LayerTypeFilter] = None,
+) -> LayerPropertyEdit:
+    """
+    Set a property (e.g. ``"opacity"``, ``"colormap"``,
+    ``"contrast_limits"`` or ``"blending"``) of all the Layers in ``group``
+    (at any depth) as a single batch::
+
+        set_layer_property(group, "opacity", 0.5, layer_type="image")
+
+    Layers that do not have the property are skipped. Whilst the property
+    is set, the Layers are frozen, so that each is refreshed once at the
+    end, and a single ``layer_properties`` event is emitted by the
+    GroupLayer for the whole batch. If setting the property fails for any
+    Layer, none of the Layers are changed. The batch is undone as a whole
+    by ``undo_layer_property``.
+
+    Parameters
+    ----------
+    group : GroupLayer
+        GroupLayer to set the property of the Layers of.
+    name : str
+        Name of the property to set.
+    value : Any
+        Value to set the property to.
+    layer_type : str | type[Layer] | Iterable[str | type[Layer]], optional
+        Only set the property of Layers of this type (or types), see
+        ``GroupLayer.iter_layers``.
+
+    Returns
+    -------
+    LayerPropertyEdit
+        The batch of edits that was applied.
+    """
+    layers = {
+        node.layer: None
+        for node, _, _ in group.iter_layers(layer_type=layer_type)
+        if node.is_tracking and hasattr(node.layer, name)
+    }
+    edit = LayerPropertyEdit(name, value, layers)
+    edit.apply()
+    history = _HISTORIES.get(group)
+    if history is None:
+        history = _HISTORIES[group] = deque(maxlen=PROPERTY_EDIT_HISTORY)
+    history.append(edit)
+    group.events.layer_properties(value=group, edit=edit)
+    return edit
+
+
+def undo_layer_property(group: GroupLayer) -> Optional[LayerPropertyEdit]:
+    """
+    Undo the last batch of property edits made to ``group`` by
+    ``set_layer_property`` (up to ``PROPERTY_EDIT_HISTORY`` batches can be
+    undone), and return it. Returns None if there is nothing to undo.
+    """
+    history = _HISTORIES.get(group)
+    if not history:
+        return None
+    edit = history.pop()
+    edit.undo()
+    group.events.layer_properties(value=group, edit=edit)
+    return edit
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import warnings
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from napari.components import ViewerModel
+
+# Fraction of the canvas left empty around an extent the camera is fit to
+FIT_MARGIN = 0.05
+
+
+def combine_extents(extents: List[np.ndarray]) -> Optional[np.ndarray]:
+    """
+    The world extent, as a ``(2, ndim)`` array of minima and maxima,
+    spanning all of ``extents`` (or None if there are none). Extents with
+    fewer dimensions are aligned to the last dimensions, as napari does
+    when displaying Layers.
+    """
+    if not extents:
+        return None
+    ndim = max(extent.shape[1] for extent in extents)
+    padded = np.full((len(extents), 2, ndim), np.nan)
+    for index, extent in enumerate(extents):
+        padded[index, :, ndim - extent.shape[1] :] = extent
+    return np.stack(
+        [np.nanmin(padded[:, 0], axis=0), np.nanmax(padded[:, 1], axis=0)]
+    )
+
+
+def canvas_size(viewer: ViewerModel) -> Tuple[int, int]:
+    """
+    The size (height, width) of the canvas of ``viewer``, in screen pixels.
+
+    napari made this public as ``viewer.canvas.size`` in 0.6. Earlier
+    versions only have the private ``viewer._canvas_size``, whose access
+    from a plugin warns there (since it is removed in 0.6).
+    """
+    canvas = getattr(viewer, "canvas", None)
+    if canvas is not None:
+        return tuple(canvas.size)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        return tuple(viewer._canvas_size)
+
+
+def fit_camera(
+    viewer: ViewerModel,
+    extent: np.ndarray,
+    size: Optional[Tuple[int, int]] = None,
+    margin: float = FIT_MARGIN,
+) -> None:
+    """
+    Centre the camera of ``viewer`` on the displayed dimensions of the world
+    ``extent``, and zoom so that it fills a canvas of ``size`` (height,
+    width) pixels, less ``margin``. ``size`` defaults to the size of the
+    viewer's canvas (see ``canvas_size``). The extent is aligned to the last
+    dimensions of the viewer.
+    """
+    ndim = viewer.dims.ndim
+    aligned = np.zeros((2, max(ndim, extent.shape[1])))
+    aligned[:, aligned.shape[1] - extent.shape[1] :] = extent
+    displayed = aligned[:, -ndim:][:, list(viewer.dims.displayed)]
+
+    center = displayed.mean(axis=0)
+    viewer.camera.center = (0,) * (3 - len(center)) + tuple(center)
+
+    extent_size = displayed[1, -2:] - displayed[0, -2:]
+    # Points, or layers that are flat along an axis, do not constrain the
+    # zoom along it
+    extent_size[np.isclose(extent_size, 0)] = 1
+    if size is None:
+        size = canvas_size(viewer)
+    viewer.camera.zoom = (1 - margin) * np.min(np.asarray(size) / extent_size)
@@ -0,0 +1,523 @@
+from __future__ import annotations
+
+import threading
+import warnings
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Any, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from napari_experimental.group_layer_node import GroupLayerNode
+
+if TYPE_CHECKING:
+    from napari.layers import Layer
+    from napari.utils.events import Event
+
+    from napari_experimental.group_layer import GroupLayer
+
+# Types of Layer that are composited when a GroupLayer is flattened
+FLATTENED_LAYER_TYPES = ("image",)
+# Events of the members of a flattened GroupLayer that change the composite
+_MEMBER_EVENTS = (
+    "data",
+    "visible",
+    "opacity",
+    "blending",
+    "scale",
+    "translate",
+    "rotate",
+    "shear",
+    "affine",
+    "colormap",
+    "contrast_limits",
+    "gamma",
+)
+
+
+class Composite(NamedTuple):
+    """
+    An RGBA image composited from several Image Layers, along with the
+    scale and translate that place it in world coordinates. The image is a
+    (lazy) dask array if it has more than two dimensions, see
+    ``composite_images``.
+    """
+
+    data: Any
+    scale: np.ndarray
+    translate: np.ndarray
+
+
+def _scale_translate(layer: Layer) -> Tuple[np.ndarray, np.ndarray]:
+    transform = layer._data_to_world
+    linear = np.asarray(transform.linear_matrix)
+    if not np.allclose(linear, np.diag(np.diag(linear))):
+        raise ValueError(
+            f"Cannot composite {layer.name!r}: only scale and translate "
+            "transforms are supported, not rotations or shears."
+        )
+    return np.asarray(transform.scale), np.asarray(transform.translate)
+
+
+def _full_resolution(layer: Layer) -> Any:
+    return layer.data[0] if layer.multiscale else layer.data
+
+
+def _normalise(values: np.ndarray, layer: Layer) -> np.ndarray:
+    """Apply the contrast limits and gamma of ``layer`` to ``values``."""
+    low, high = layer.contrast_limits
+    values = values.astype(np.float32) - low
+    if high != low:
+        values /= high - low
+    np.clip(values, 0, 1, out=values)
+    if layer.gamma != 1:
+        values **= layer.gamma
+    return values
+
+
+def _to_rgba(block: np.ndarray, layer: Layer) -> np.ndarray:
+    """The colours of the pixels in ``block`` (of ``layer``) as RGBA."""
+    values = _normalise(block, layer)
+    if layer.rgb:
+        rgba = np.ones(values.shape[:-1] + (4,), dtype=np.float32)
+        rgba[..., : values.shape[-1]] = values
+        return rgba
+    rgba = layer.colormap.map(values.ravel())
+    return rgba.reshape(values.shape + (4,)).astype(np.float32, copy=False)
+
+
+def _sample_indices(
+    grid_translate: float,
+    grid_scale: float,
+    grid_size: int,
+    translate: float,
+    scale: float,
+    size: int,
+) -> Tuple[slice, np.ndarray]:
+    """
+    Along one axis, the region of the grid that a Layer covers, and the
+    (nearest) index into the Layer's data of each pixel in that region.
+    """
+    centres = grid_translate + np.arange(grid_size) * grid_scale
+    indices = np.floor((centres - translate) / scale + 0.5).astype(np.intp)
+    inside = np.flatnonzero((indices >= 0) & (indices < size))
+    if inside.size == 0:
+        return slice(0, 0), indices[:0]
+    return slice(inside[0], inside[-1] + 1), indices[inside]
+
+
+def _blend(target: np.ndarray, rgba: np.ndarray, layer: Layer) -> None:
+    """
+    Blend ``rgba`` (of ``layer``) onto ``target``, which holds colours
+    premultiplied by their alpha, in-place.
+    """
+    alpha = rgba[..., 3] * layer.opacity
+    colour = rgba[..., :3] * alpha[..., np.newaxis]
+    if layer.blending == "additive":
+        target[..., :3] += colour
+        target[..., 3] = np.minimum(1, target[..., 3] + alpha)
+    elif layer.blending == "opaque":
+        target[..., :3] = rgba[..., :3]
+        target[..., 3] = 1
+    else:
+        # Translucent blending, also used for the other blending modes
+        target *= (1 - alpha)[..., np.newaxis]
+        target[..., :3] += colour
+        target[..., 3] += alpha
+
+
+def _composite_region(
+    placements: List[Tuple[Layer, np.ndarray, np.ndarray, np.ndarray]],
+    grid_translate: np.ndarray,
+    grid_scale: np.ndarray,
+    region: Tuple[slice, ...],
+) -> np.ndarray:
+    """
+    Composite the ``(layer, scale, translate, shape)`` placements onto the
+    ``region`` of the grid, as RGBA values that are not premultiplied by
+    alpha.
+    """
+    starts = np.array([axis.start for axis in region])
+    sizes = [axis.stop - axis.start for axis in region]
+    translate_of_region = grid_translate + starts * grid_scale
+
+    composite = np.zeros((*sizes, 4), dtype=np.float32)
+    for layer, scale, translate, shape in placements:
+        if not layer.visible or layer.opacity == 0:
+            continue
+        covered, indices = zip(  # noqa: B905
+            *(
+                _sample_indices(*axis)
+                for axis in zip(  # noqa: B905
+                    translate_of_region,
+                    grid_scale,
+                    sizes,
+                    translate,
+                    scale,
+                    shape,
+                )
+            )
+        )
+        if any(index.size == 0 for index in indices):
+            continue
+        # Read only the block of data that is needed, then resample it
+        block = np.asarray(
+            _full_resolution(layer)[
+                tuple(slice(index[0], index[-1] + 1) for index in indices)
+            ]
+        )
+        block = block[np.ix_(*(index - index[0] for index in indices))]
+        _blend(composite[covered], _to_rgba(block, layer), layer)
+
+    alpha = composite[..., 3]
+    covered = alpha > 0
+    colour = composite[..., :3]
+    colour[covered] /= alpha[covered][:, np.newaxis]
+    np.clip(composite, 0, 1, out=composite)
+    return composite
+
+
+def composite_images(layers: List[Layer]) -> Composite:
+    """
+    Composite Image Layers into a single RGBA image, in world coordinates.
+
+    The image covers the world extents of all of ``layers``, at the finest
+    scale of any of them along each axis. Each Layer is resampled onto
+    this grid (taking the nearest pixel), coloured by its colormap (or
+    channels, for RGB Layers), contrast limits and gamma, and blended onto
+    the Layers below it using its opacity and blending mode. Hidden Layers
+    are skipped, but still count towards the extent of the image.
+
+    The composite takes 16 bytes per pixel of the grid, so for Layers with
+    more than two dimensions (e.g. time-lapses, or 3D tiles) it is not
+    computed up front. It is returned as a dask array instead, with one
+    chunk per plane of the last two axes, which is composited when it is
+    read (e.g. when napari slices the Layer at the current dims point).
+
+    Parameters
+    ----------
+    layers : List[Layer]
+        Image Layers to composite, bottom-most first. They must all have
+        the same number of dimensions, and only scale and translate
+        transforms. Multiscale Layers are composited at full resolution.
+
+    Returns
+    -------
+    Composite
+        The RGBA image (as float32 values in [0, 1], with colours that are
+        not premultiplied by alpha), and its scale and translate.
+    """
+    if not layers:
+        raise ValueError("There are no image layers to composite.")
+    ndims = {layer.ndim for layer in layers}
+    if len(ndims) > 1:
+        raise ValueError(
+            "Cannot composite image layers with different numbers of "
+            f"dimensions ({sorted(ndims)})."
+        )
+
+    placements = []
+    for layer in layers:
+        scale, translate = _scale_translate(layer)
+        shape = np.asarray(_full_resolution(layer).shape[: layer.ndim])
+        placements.append((layer, scale, translate, shape))
+    # Pixels are centred on their coordinates, so extend half a pixel out
+    grid_scale = np.min([scale for _, scale, _, _ in placements], axis=0)
+    low = np.min([t - s / 2 for _, s, t, _ in placements], axis=0)
+    high = np.max([t + (n - 0.5) * s for _, s, t, n in placements], axis=0)
+    grid_shape = tuple(
+        int(size)
+        for size in np.maximum(
+            1, np.ceil((high - low) / grid_scale - 1e-6).astype(int)
+        )
+    )
+    grid_translate = low + grid_scale / 2
+
+    if len(grid_shape) <= 2:
+        data = _composite_region(
+            placements,
+            grid_translate,
+            grid_scale,
+            tuple(slice(0, size) for size in grid_shape),
+        )
+        return Composite(data, grid_scale, grid_translate)
+
+    import dask.array as da
+
+    def composite_plane(block_info=None) -> np.ndarray:
+        location = block_info[None]["array-location"][:-1]
+        return _composite_region(
+            placements,
+            grid_translate,
+            grid_scale,
+            tuple(slice(start, stop) for start, stop in location),
+        )
+
+    n_leading = len(grid_shape) - 2
+    data = da.map_blocks(
+        composite_plane,
+        chunks=(
+            *((1,) * size for size in grid_shape[:n_leading]),
+            *((size,) for size in grid_shape[n_leading:]),
+            (4,),
+        ),
+        dtype=np.float32,
+        meta=np.empty((0,) * (len(grid_shape) + 1), dtype=np.float32),
+    )
+    return Composite(data, grid_scale, grid_translate)
+
+
+class FlattenedGroup(GroupLayerNode):
+    """
+    A Node that stands in for a GroupLayer in the tree, tracking a single
+    (RGB) Image Layer that composites the Image Layers in the GroupLayer,
+    see ``flatten_group``.
+
+    Whilst the GroupLayer is flattened, it is detached from the tree, so
+    its Layers are not drawn (or sliced) individually. Changes to its
+    Layers (their data, transforms, opacity, visibility, colormaps, ...)
+    and to its structure are still tracked, and mark the composite as out
+    of date. The composite is then recomputed in the background, and the
+    result is applied to the Layer by ``apply_completed``, which should be
+    called on the main thread (e.g. by polling whilst ``is_pending``).
+    Several changes made whilst the composite is being recomputed lead to
+    a single further recomputation.
+
+    Parameters
+    ----------
+    group : GroupLayer
+        GroupLayer to flatten. It must contain at least one Image Layer.
+    executor : concurrent.futures.Executor, optional
+        Executor to recompute the composite in. By default, a single
+        worker thread is used.
+    """
+
+    @property
+    def group(self) -> GroupLayer:
+        """The GroupLayer that is flattened."""
+        return self._group
+
+    @property
+    def is_pending(self) -> bool:
+        """
+        True if the composite is out of date, and is being recomputed (or
+        has been, but not yet applied).
+        """
+        with self._lock:
+            return (
+                self._future is not None
+                or self._submitted != self._generation
+                or self._completed is not None
+            )
+
+    def __init__(
+        self, group: GroupLayer, executor: Optional[Executor] = None
+    ) -> None:
+        # Imported here, so that importing GroupLayer does not import
+        # napari.layers (and Qt)
+        from napari.layers import Image
+
+        self._group = group
+        self._owns_executor = executor is None
+        self._executor = executor
+        self._lock = threading.Lock()
+        # Bumped whenever the composite goes out of date. Recomputations
+        # are tagged with the generation they were submitted for, and
+        # their results are dropped if it has moved on since.
+        self._generation = 0
+        self._submitted = 0
+        self._future: Optional[Future] = None
+        self._completed: Optional[Future] = None
+        self._members: List[Layer] = []
+
+        data, scale, translate = composite_images(self._images())
+        layer = Image(
+            data,
+            rgb=True,
+            contrast_limits=(0, 1),
+            scale=scale,
+            translate=translate,
+            name=group.name,
+            visible=group.visible,
+        )
+        super().__init__(layer)
+
+        self._connect_members()
+        for emitter in (
+            group.events.inserted,
+            group.events.removed,
+            group.events.moved,
+        ):
+            emitter.connect(self._on_structure_changed)
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="FlattenedGroup"
+            )
+        return self._executor
+
+    def _images(self) -> List[Layer]:
+        # The top of the tree is drawn last, so composite from the bottom
+        nodes = self._group.iter_layers(layer_type=FLATTENED_LAYER_TYPES)
+        layers = [node.layer for node, _, _ in nodes if node.is_tracking]
+        return layers[::-1]
+
+    def _connect_members(self) -> None:
+        self._members = self._images()
+        for layer in self._members:
+            for name in _MEMBER_EVENTS:
+                if hasattr(layer.events, name):
+                    getattr(layer.events, name).connect(self._on_changed)
+
+    def _disconnect_members(self) -> None:
+        for layer in self._members:
+            for name in _MEMBER_EVENTS:
+                if hasattr(layer.events, name):
+                    getattr(layer.events, name).disconnect(self._on_changed)
+        self._members = []
+
+    def _on_structure_changed(self, event: Optional[Event] = None) -> None:
+        self._disconnect_members()
+        self._connect_members()
+        self._on_changed()
+
+    def _on_changed(self, event: Optional[Event] = None) -> None:
+        """Mark the composite as out of date, and recompute it."""
+        with self._lock:
+            self._generation += 1
+        self._submit()
+
+    def _submit(self) -> None:
+        """
+        Recompute the composite in the background if it is out of date,
+        unless a recomputation is already running (in which case this is
+        called again once it finishes).
+        """
+        with self._lock:
+            if self._future is not None or self._submitted == self._generation:
+                return
+            generation = self._submitted = self._generation
+            future = self._future = self.executor.submit(
+                composite_images, list(self._members)
+            )
+        future.add_done_callback(partial(self._on_done, generation))
+
+    def _on_done(self, generation: int, future: Future) -> None:
+        with self._lock:
+            self._future = None
+            if generation == self._generation and not future.cancelled():
+                self._completed = future
+        self._submit()
+
+    def apply_completed(self) -> bool:
+        """
+        Apply the latest recomputed composite (if any) to the Layer, and
+        return True if it was updated. Call this on the main thread.
+        """
+        with self._lock:
+            completed, self._completed = self._completed, None
+        if completed is None:
+            return False
+        if completed.exception() is not None:
+            warnings.warn(
+                f"Could not flatten {self._group.name}: "
+                f"{completed.exception()}",
+                stacklevel=2,
+            )
+            return False
+        self._apply(completed.result())
+        return True
+
+    def _apply(self, composite: Composite) -> None:
+        self.layer.scale = composite.scale
+        self.layer.translate = composite.translate
+        self.layer.data = composite.data
+
+    def update(self) -> None:
+        """
+        Recompute the composite now, on the calling thread, superseding any
+        recomputation in the background.
+        """
+        with self._lock:
+            self._generation += 1
+            self._submitted = self._generation
+            self._completed = None
+        self._apply(composite_images(list(self._members)))
+
+    def unflatten(self) -> GroupLayer:
+        """
+        Put the GroupLayer back into the tree in place of this Node, and
+        stop tracking its Layers. Returns the GroupLayer.
+        """
+        self.close()
+        parent = self.parent
+        if parent is not None:
+            index = parent.index(self)
+            del parent[index]
+            parent.insert(index, self._group)
+        return self._group
+
+    def close(self) -> None:
+        """Stop tracking the Layers of the GroupLayer."""
+        self._disconnect_members()
+        for emitter in (
+            self._group.events.inserted,
+            self._group.events.removed,
+            self._group.events.moved,
+        ):
+            emitter.disconnect(self._on_structure_changed)
+        with self._lock:
+            # Drop the result of any recomputation that is still running
+            self._generation += 1
+            self._submitted = self._generation
+            self._completed = None
+            if self._future is not None:
+                self._future.cancel()
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def flatten_group(
+    group: GroupLayer, executor: Optional[Executor] = None
+) -> FlattenedGroup:
+    """
+    Replace ``group`` in the tree with a single Node, tracking an RGB Image
+    Layer that composites the Image Layers inside it (at any depth), so
+    that they are drawn (and sliced) as one Layer.
+
+    The Image Layers are composited in world coordinates, respecting their
+    scale and translate, opacity, blending, visibility and colormaps (see
+    ``composite_images``). Other types of Layer are not drawn whilst the
+    GroupLayer is flattened.
+
+    The composite is cached in the Layer, and only recomputed (in the
+    background) when one of the Image Layers, or the structure of the
+    GroupLayer, changes. See ``FlattenedGroup`` for details, and
+    ``FlattenedGroup.unflatten`` to put the GroupLayer back.
+
+    Parameters
+    ----------
+    group : GroupLayer
+        GroupLayer to flatten, which must be inside a tree.
+    executor : concurrent.futures.Executor, optional
+        Executor to recompute the composite in. By default, a single worker
+        thread is used.
+
+    Returns
+    -------
+    FlattenedGroup
+        The Node that replaced ``group`` in the tree.
+    """
+    parent = group.parent
+    if parent is None:
+        raise ValueError(
+            f"{group} is not inside a tree, so cannot be flattened."
+        )
+    flattened = FlattenedGroup(group, executor=executor)
+    index = parent.index(group)
+    del parent[index]
+    parent.insert(index, flattened)
+    return flattened
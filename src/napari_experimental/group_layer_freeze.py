@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import warnings
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+if TYPE_CHECKING:
+    from napari.layers import Layer
+
+
+class _FrozenLayerState:
+    """
+    Stands in for the ``refresh`` and ``_slice_dims`` methods of a frozen
+    Layer, recording the calls so that they can be replayed (once) when the
+    Layer is thawed.
+    """
+
+    def __init__(self) -> None:
+        # Number of frozen GroupLayers the Layer is in
+        self.count = 0
+        self.refresh_pending = False
+        # Arguments of the last call to _slice_dims
+        self.slice_call: Optional[Tuple[Tuple[Any, ...], Dict[str, Any]]] = (
+            None
+        )
+
+    def refresh(self, *args: Any, **kwargs: Any) -> None:
+        self.refresh_pending = True
+
+    def slice_dims(self, *args: Any, **kwargs: Any) -> None:
+        self.slice_call = (args, kwargs)
+
+
+# Methods of Layer that are replaced whilst it is frozen. _slice_dims is
+# private to napari, so may be renamed or removed in another version.
+FROZEN_METHODS = ("refresh", "_slice_dims")
+
+_FROZEN_LAYERS: WeakKeyDictionary[Layer, _FrozenLayerState] = (
+    WeakKeyDictionary()
+)
+
+
+def missing_frozen_methods(layer: Layer) -> List[str]:
+    """
+    The ``FROZEN_METHODS`` that ``layer`` does not have, which must all be
+    present for it to be frozen.
+    """
+    return [
+        name
+        for name in FROZEN_METHODS
+        if not callable(getattr(type(layer), name, None))
+    ]
+
+
+def is_layer_frozen(layer: Layer) -> bool:
+    """True if ``layer`` is in (at least) one frozen GroupLayer."""
+    return layer in _FROZEN_LAYERS
+
+
+def freeze_layer(layer: Layer) -> None:
+    """
+    Stop ``layer`` from being refreshed or re-sliced, until it is thawed as
+    many times as it has been frozen (see ``thaw_layer``).
+
+    Calls to the Layer's ``refresh`` (which property changes make) and
+    ``_slice_dims`` (which the viewer makes whenever the dims change, e.g.
+    during playback) are recorded rather than carried out.
+
+    With napari's (experimental) asynchronous slicing enabled, the viewer
+    slices visible Layers through their ``_make_slice_request`` instead,
+    which is not intercepted: those Layers are still re-sliced as the dims
+    change whilst frozen, and only their refreshes are deferred.
+
+    If the Layer does not have the methods that are replaced (e.g. with a
+    version of napari that renamed them), a warning is issued and the Layer
+    is not frozen: it is refreshed and sliced as usual.
+    """
+    state = _FROZEN_LAYERS.get(layer)
+    if state is None:
+        missing = missing_frozen_methods(layer)
+        if missing:
+            warnings.warn(
+                f"Cannot freeze {type(layer).__name__} layers, which have "
+                f"no {', '.join(missing)} with this version of napari",
+                stacklevel=2,
+            )
+            return
+        state = _FROZEN_LAYERS[layer] = _FrozenLayerState()
+        # Instance attributes take precedence over the methods of the class
+        layer.refresh = state.refresh
+        layer._slice_dims = state.slice_dims
+    state.count += 1
+
+
+def thaw_layer(layer: Layer) -> None:
+    """
+    Undo one call to ``freeze_layer``. Once ``layer`` is no longer frozen,
+    the calls that were recorded whilst it was frozen are replayed: the
+    Layer is sliced for the latest dims if the dims changed (which also
+    refreshes it), or otherwise refreshed if it needs to be.
+    """
+    state = _FROZEN_LAYERS.get(layer)
+    if state is None:
+        return
+    state.count -= 1
+    if state.count > 0:
+        return
+    del _FROZEN_LAYERS[layer]
+    del layer.refresh
+    del layer._slice_dims
+    if state.slice_call is not None:
+        args, kwargs = state.slice_call
+        layer._slice_dims(*args, **kwargs)
+    elif state.refresh_pending:
+        layer.refresh()
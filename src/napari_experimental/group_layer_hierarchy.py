@@ -0,0 +1,406 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+
+from napari_experimental.group_layer import GroupLayer
+from napari_experimental.group_layer_node import GroupLayerNode
+
+if TYPE_CHECKING:
+    from napari.layers import Layer
+    from napari.utils.events import Event
+    from napari.utils.events.containers._nested_list import NestedIndex
+
+ZARR_SUFFIXES = (".zarr",)
+HDF5_SUFFIXES = (".h5", ".hdf5", ".he5")
+# Name of the Node that stands in for the contents of a GroupLayer that has
+# not been realised yet, so that the view shows it as expandable.
+UNREALISED_NAME = "..."
+
+
+class HierarchyEntry(ABC):
+    """
+    A group, or an array, in an on-disk hierarchy.
+
+    Subclasses list the children of groups and open arrays without reading
+    any array data, so that the hierarchy can be browsed cheaply. Entries
+    that hold files open release them in ``close``.
+
+    Parameters
+    ----------
+    name : str
+        Name of the entry, used as the name of its GroupLayer or Layer.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    @property
+    @abstractmethod
+    def is_group(self) -> bool:
+        """True if the entry contains further entries."""
+
+    @property
+    def layer_type(self) -> str:
+        """Type of Layer (``"image"`` or ``"labels"``) to create."""
+        return "image"
+
+    @abstractmethod
+    def children(self) -> Iterator[HierarchyEntry]:
+        """Iterate over the entries inside this (group) entry."""
+
+    @abstractmethod
+    def open(self) -> Any | List[Any]:
+        """
+        Return the (lazy or memory-mapped) data of this (array) entry, or a
+        list of arrays for multiscale data.
+        """
+
+    def close(self) -> None:  # noqa: B027
+        """
+        Release any files held open by this entry (and the entries inside
+        it). Data opened from the entries can no longer be read afterwards.
+        """
+
+
+class DirectoryEntry(HierarchyEntry):
+    """
+    A directory tree. Sub-directories are groups, ``.npy`` files are
+    memory-mapped arrays, and Zarr stores and HDF5 files inside the tree
+    are mirrored too. Other files are ignored.
+    """
+
+    def __init__(self, path: Path) -> None:
+        super().__init__(path.name if path.is_dir() else path.stem)
+        self.path = path
+        # Hierarchies inside the tree that have been opened, and so may
+        # hold files open
+        self._opened: List[HierarchyEntry] = []
+
+    @property
+    def is_group(self) -> bool:
+        return self.path.is_dir()
+
+    def children(self) -> Iterator[HierarchyEntry]:
+        for path in sorted(self.path.iterdir()):
+            if _is_zarr(path) or path.suffix in HDF5_SUFFIXES:
+                entry = open_hierarchy(path)
+                self._opened.append(entry)
+                yield entry
+            elif path.is_dir() or path.suffix == ".npy":
+                entry = DirectoryEntry(path)
+                self._opened.append(entry)
+                yield entry
+
+    def open(self) -> np.memmap:
+        return np.load(self.path, mmap_mode="r")
+
+    def close(self) -> None:
+        for entry in self._opened:
+            entry.close()
+        self._opened.clear()
+
+
+class ZarrEntry(HierarchyEntry):
+    """
+    A Zarr group or array. Groups with OME-NGFF ``multiscales`` metadata are
+    treated as (multiscale) arrays, and are opened as the list of their
+    resolution levels.
+    """
+
+    def __init__(self, name: str, node: Any) -> None:
+        super().__init__(name)
+        self.node = node
+
+    @property
+    def _is_multiscale(self) -> bool:
+        return "multiscales" in self.node.attrs
+
+    @property
+    def is_group(self) -> bool:
+        import zarr
+
+        return isinstance(self.node, zarr.Group) and not self._is_multiscale
+
+    @property
+    def layer_type(self) -> str:
+        return "labels" if "image-label" in self.node.attrs else "image"
+
+    def children(self) -> Iterator[HierarchyEntry]:
+        for name in sorted(self.node.group_keys()):
+            yield ZarrEntry(name, self.node[name])
+        for name in sorted(self.node.array_keys()):
+            yield ZarrEntry(name, self.node[name])
+
+    def open(self) -> Any | List[Any]:
+        if self._is_multiscale:
+            datasets = self.node.attrs["multiscales"][0]["datasets"]
+            return [self.node[dataset["path"]] for dataset in datasets]
+        return self.node
+
+
+class HDF5Entry(HierarchyEntry):
+    """
+    An HDF5 group or dataset. Datasets are read lazily by h5py, only
+    reading the slices that are displayed.
+
+    The root entry of a file owns the open ``h5py.File``, and closes it in
+    ``close``.
+    """
+
+    def __init__(self, name: str, node: Any, owns_file: bool = False) -> None:
+        super().__init__(name)
+        self.node = node
+        self._owns_file = owns_file
+
+    @property
+    def is_group(self) -> bool:
+        import h5py
+
+        return isinstance(self.node, h5py.Group)
+
+    def children(self) -> Iterator[HierarchyEntry]:
+        for name in sorted(self.node.keys()):
+            yield HDF5Entry(name, self.node[name])
+
+    def open(self) -> Any:
+        return self.node
+
+    def close(self) -> None:
+        if self._owns_file:
+            self.node.file.close()
+
+
+def _is_zarr(path: Path) -> bool:
+    return path.suffix in ZARR_SUFFIXES or (
+        path.is_dir()
+        and any(
+            (path / marker).exists()
+            for marker in (".zgroup", ".zarray", "zarr.json")
+        )
+    )
+
+
+def open_hierarchy(path: str | Path) -> HierarchyEntry:
+    """
+    Return the root entry of the hierarchy at ``path``: a Zarr store, an
+    HDF5 file, or a directory tree. Opening the hierarchy only reads its
+    metadata.
+
+    Zarr and HDF5 support require ``zarr`` and ``h5py`` respectively.
+    """
+    path = Path(path)
+    if _is_zarr(path):
+        try:
+            import zarr
+        except ImportError as error:
+            raise ImportError(
+                f"zarr is required to open {path}, "
+                "install it with 'pip install zarr'."
+            ) from error
+        return ZarrEntry(path.stem, zarr.open(str(path), mode="r"))
+    if path.suffix in HDF5_SUFFIXES:
+        try:
+            import h5py
+        except ImportError as error:
+            raise ImportError(
+                f"h5py is required to open {path}, "
+                "install it with 'pip install h5py'."
+            ) from error
+        return HDF5Entry(path.stem, h5py.File(path, mode="r"), owns_file=True)
+    if not path.is_dir():
+        raise ValueError(f"{path} is not a directory, Zarr or HDF5 file.")
+    return DirectoryEntry(path)
+
+
+def _contrast_limits(data: Any | List[Any]) -> Tuple[float, float]:
+    """
+    Contrast limits from the dtype of ``data``, so that napari does not
+    read the data to compute them when the Layer is created.
+    """
+    dtype = np.dtype((data[0] if isinstance(data, list) else data).dtype)
+    if np.issubdtype(dtype, np.integer):
+        info = np.iinfo(dtype)
+        return float(info.min), float(info.max)
+    return 0.0, 1.0
+
+
+def create_layer(entry: HierarchyEntry, visible: bool = True) -> Layer:
+    """
+    Create a Layer viewing the (lazy) data of an array entry.
+    """
+    # napari.layers imports Qt, so is only imported once a Layer is created
+    from napari.layers import Image, Labels
+
+    data = entry.open()
+    multiscale = isinstance(data, list)
+    if entry.layer_type == "labels":
+        return Labels(
+            data, name=entry.name, multiscale=multiscale, visible=visible
+        )
+    return Image(
+        data,
+        name=entry.name,
+        multiscale=multiscale,
+        contrast_limits=_contrast_limits(data),
+        visible=visible,
+    )
+
+
+class HierarchyMirror:
+    """
+    Mirrors on-disk hierarchies (see ``open_hierarchy``) as nested
+    GroupLayers, which are realised lazily.
+
+    A mirrored group starts out containing a single placeholder Node (so
+    that it can be expanded in the view), and is hidden. It is only
+    realised - replacing the placeholder with a GroupLayer for each
+    sub-group and a Layer for each array - when ``realise`` is called (the
+    widget does so when the group is expanded), or when it is made visible.
+    Layers are created with lazy (or memory-mapped) data, so no array data
+    is read until it is displayed. Mirroring a plate with thousands of
+    fields therefore only creates the GroupLayers along the path the user
+    expands.
+
+    Parameters
+    ----------
+    group_layers : GroupLayer
+        Tree to add the mirrored hierarchies to.
+    on_realised : Callable[[GroupLayer], None], optional
+        Called with each GroupLayer once it has been realised, for example
+        to add the Layers it now contains to the viewer.
+    """
+
+    def __init__(
+        self,
+        group_layers: GroupLayer,
+        on_realised: Optional[Callable[[GroupLayer], None]] = None,
+    ) -> None:
+        self.group_layers = group_layers
+        self._on_realised = on_realised
+        # GroupLayers that have not been realised -> the entries they mirror,
+        # and the placeholders they contain
+        self._unrealised: Dict[
+            GroupLayer, Tuple[HierarchyEntry, GroupLayerNode]
+        ] = {}
+        # Mirrored GroupLayers -> the hierarchies that were opened for them,
+        # which are closed when the GroupLayers are removed
+        self._opened: Dict[GroupLayer, HierarchyEntry] = {}
+
+        group_layers.events.visible.connect(self._on_visible)
+        group_layers.events.removed.connect(self._on_removed)
+
+    def is_realised(self, group: GroupLayer) -> bool:
+        """False if ``group`` mirrors a group that is yet to be realised."""
+        return group not in self._unrealised
+
+    def _unrealised_group(
+        self, entry: HierarchyEntry, visible: bool = False
+    ) -> GroupLayer:
+        """A GroupLayer standing in for ``entry`` until it is realised."""
+        placeholder = GroupLayerNode(name=UNREALISED_NAME)
+        group = GroupLayer(placeholder)
+        with group.events.blocker_all():
+            group.name = entry.name
+            group._visible = visible
+        self._unrealised[group] = (entry, placeholder)
+        return group
+
+    def _on_visible(self, event: Event) -> None:
+        """Realise the whole subtree of a GroupLayer made visible."""
+        if not event.value.visible:
+            return
+        groups = [event.value]
+        while groups:
+            group = groups.pop()
+            self.realise(group)
+            groups.extend(item for item in group if item.is_group())
+
+    def _on_removed(self, event: Event) -> None:
+        for item in event.value.traverse():
+            self._unrealised.pop(item, None)
+            entry = self._opened.pop(item, None)
+            if entry is not None:
+                entry.close()
+
+    def mirror(
+        self,
+        path: str | Path | HierarchyEntry,
+        name: Optional[str] = None,
+        location: Optional[NestedIndex | int] = None,
+    ) -> GroupLayer:
+        """
+        Add an (unrealised) GroupLayer mirroring the hierarchy at ``path``
+        to the tree.
+
+        Parameters
+        ----------
+        path : str | Path | HierarchyEntry
+            Location of the hierarchy, or its root entry. Hierarchies opened
+            from a location are closed when the GroupLayer is removed from
+            the tree (or the mirror is closed), whereas entries that are
+            passed in are left to the caller to close.
+        name : str, optional
+            Name to give the GroupLayer, by default the name of the root of
+            the hierarchy.
+        location : NestedIndex | int, optional
+            Location in the tree at which to insert the GroupLayer.
+            By default, it is added to the end of the top level of the tree.
+        """
+        opened = not isinstance(path, HierarchyEntry)
+        entry = open_hierarchy(path) if opened else path
+        if not entry.is_group:
+            if opened:
+                entry.close()
+            raise ValueError(f"{entry.name} is not a group.")
+        group = self._unrealised_group(entry)
+        if opened:
+            self._opened[group] = entry
+        if name is not None:
+            group.name = name
+        self.group_layers.graft(group, location=location)
+        return group
+
+    def realise(self, group: GroupLayerNode) -> None:
+        """
+        Replace the placeholder inside a mirrored GroupLayer with its
+        contents. Sub-groups are added unrealised. Does nothing if
+        ``group`` has already been realised (or is not a mirrored group).
+        """
+        if group not in self._unrealised:
+            return
+        entry, placeholder = self._unrealised.pop(group)
+        items = [
+            (
+                self._unrealised_group(child, visible=group.visible)
+                if child.is_group
+                else GroupLayerNode(create_layer(child, group.visible))
+            )
+            for child in entry.children()
+        ]
+        if placeholder.parent is group:
+            group.remove(placeholder)
+        group.extend(items)
+        if self._on_realised is not None:
+            self._on_realised(group)
+
+    def close(self) -> None:
+        """
+        Close the hierarchies that were opened by ``mirror``. Layers viewing
+        their data can no longer read it afterwards.
+        """
+        for entry in self._opened.values():
+            entry.close()
+        self._opened.clear()
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+
+from napari_experimental.group_layer_edits import set_layer_property
+
+if TYPE_CHECKING:
+    from napari.layers import Layer
+
+    from napari_experimental.group_layer import GroupLayer
+    from napari_experimental.group_layer_edits import LayerPropertyEdit
+
+# Number of bins of joint histograms by default
+HISTOGRAM_BINS = 1024
+# Approximate number of bytes of data read by each task
+HISTOGRAM_CHUNK_BYTES = 32 * 2**20
+# Number of threads reading chunks by default
+HISTOGRAM_WORKERS = 4
+
+
+class Histogram(NamedTuple):
+    """
+    Histogram of the values of the data of several Layers.
+
+    Parameters
+    ----------
+    counts : np.ndarray
+        Number of values in each bin.
+    edges : np.ndarray
+        Edges of the bins, one more than there are bins. The first and last
+        edges are the minimum and maximum of the values.
+    """
+
+    counts: np.ndarray
+    edges: np.ndarray
+
+    def percentile(self, q: float) -> float:
+        """
+        Estimate the ``q``-th percentile (0 to 100) of the values,
+        interpolating linearly within the bin it falls in.
+        """
+        total = self.counts.sum()
+        if total == 0:
+            return float(self.edges[0])
+        cumulative = np.concatenate([[0], np.cumsum(self.counts)]) / total
+        return float(np.interp(q / 100, cumulative, self.edges))
+
+    def contrast_limits(
+        self, percentiles: Tuple[float, float] = (0, 100)
+    ) -> Tuple[float, float]:
+        """Contrast limits spanning the given percentiles of the values."""
+        low, high = (self.percentile(q) for q in percentiles)
+        if high <= low:
+            # A single value, which the limits must still span
+            high = low + 1
+        return low, high
+
+
+def _lowest_resolution(layer: Layer) -> Any:
+    return layer.data[-1] if layer.multiscale else layer.data
+
+
+def _chunk_step(array: Any, chunk_bytes: int) -> int:
+    """
+    Number of planes (along the first axis) of ``array`` to read at once,
+    rounded to whole chunks of the array if it is chunked (dask, Zarr).
+    """
+    plane_bytes = (
+        int(np.prod(array.shape[1:], dtype=np.int64))
+        * np.dtype(array.dtype).itemsize
+    )
+    step = max(1, chunk_bytes // max(1, plane_bytes))
+    chunks = getattr(array, "chunks", None)
+    if chunks:
+        # Dask gives the size of each chunk along each axis, Zarr the size
+        # of all chunks along each axis
+        native = chunks[0][0] if isinstance(chunks[0], tuple) else chunks[0]
+        if native:
+            step = max(1, step // native) * native
+    return step
+
+
+def iter_blocks(
+    array: Any, chunk_bytes: int = HISTOGRAM_CHUNK_BYTES
+) -> Iterator[np.ndarray]:
+    """
+    Read ``array`` (which may be lazy or memory-mapped) a block of about
+    ``chunk_bytes`` at a time, along its first axis. Blocks are aligned to
+    the chunks of dask and Zarr arrays.
+    """
+    step = _chunk_step(array, chunk_bytes)
+    for start in range(0, array.shape[0], step):
+        yield np.asarray(array[start : start + step])
+
+
+def _blocks(
+    layers: List[Layer], chunk_bytes: int
+) -> Iterator[Callable[[], np.ndarray]]:
+    """
+    Functions reading each block of the data of ``layers`` in turn, so that
+    the blocks are only read when the functions are called.
+    """
+    for layer in layers:
+        array = _lowest_resolution(layer)
+        step = _chunk_step(array, chunk_bytes)
+        for start in range(0, array.shape[0], step):
+            yield lambda array=array, start=start, step=step: np.asarray(
+                array[start : start + step]
+            )
+
+
+def _bounded_map(
+    executor: Executor,
+    function: Callable[[Any], Any],
+    items: Iterator[Any],
+    max_pending: int,
+) -> Iterator[Any]:
+    """
+    Like ``executor.map``, but only submits up to ``max_pending`` items at
+    a time, rather than all of them up front.
+    """
+    pending: Deque[Future] = deque()
+    for item in items:
+        pending.append(executor.submit(function, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _range(read: Callable[[], np.ndarray]) -> Tuple[float, float]:
+    block = read()
+    if block.dtype.kind == "f":
+        block = block[np.isfinite(block)]
+    if block.size == 0:
+        return np.inf, -np.inf
+    return float(block.min()), float(block.max())
+
+
+def _counts(read: Callable[[], np.ndarray], edges: np.ndarray) -> np.ndarray:
+    counts, _ = np.histogram(read(), bins=edges)
+    return counts
+
+
+def joint_histogram(
+    layers: List[Layer],
+    bins: int = HISTOGRAM_BINS,
+    executor: Optional[Executor] = None,
+    chunk_bytes: int = HISTOGRAM_CHUNK_BYTES,
+) -> Histogram:
+    """
+    Compute the histogram of the data of all of ``layers`` together.
+
+    The data is streamed a block (of about ``chunk_bytes``) at a time, in a
+    pool of threads, in two passes: one finding the range of the values,
+    and one counting them into ``bins`` equal bins over that range. Blocks
+    are aligned to the chunks of dask and Zarr arrays, and are read only by
+    the thread processing them, so no more than one block per thread is
+    in memory at once and data larger than memory can be processed.
+    Multiscale Layers use their lowest resolution. Non-finite values are
+    ignored.
+
+    Parameters
+    ----------
+    layers : List[Layer]
+        Layers whose data to include (typically Image Layers).
+    bins : int, default = HISTOGRAM_BINS
+        Number of bins.
+    executor : concurrent.futures.Executor, optional
+        Executor to process the blocks in. By default, a pool of
+        ``HISTOGRAM_WORKERS`` threads is used.
+    chunk_bytes : int, default = HISTOGRAM_CHUNK_BYTES
+        Approximate number of bytes to read at once.
+
+    Returns
+    -------
+    Histogram
+        The joint histogram, with ``bins`` bins.
+    """
+    if executor is None:
+        with ThreadPoolExecutor(
+            max_workers=HISTOGRAM_WORKERS, thread_name_prefix="Histogram"
+        ) as pool:
+            return joint_histogram(layers, bins, pool, chunk_bytes)
+
+    max_pending = 2 * getattr(executor, "_max_workers", HISTOGRAM_WORKERS)
+    low, high = np.inf, -np.inf
+    for block_low, block_high in _bounded_map(
+        executor, _range, _blocks(layers, chunk_bytes), max_pending
+    ):
+        low, high = min(low, block_low), max(high, block_high)
+    counts = np.zeros(bins, dtype=np.int64)
+    if low > high:
+        # No (finite) values at all
+        return Histogram(counts, np.linspace(0, 1, bins + 1))
+
+    edges = np.linspace(low, high, bins + 1)
+    for block_counts in _bounded_map(
+        executor,
+        partial(_counts, edges=edges),
+        _blocks(layers, chunk_bytes),
+        max_pending,
+    ):
+        counts += block_counts
+    return Histogram(counts, edges)
+
+
+def group_joint_histogram(
+    group: GroupLayer,
+    bins: int = HISTOGRAM_BINS,
+    executor: Optional[Executor] = None,
+) -> Histogram:
+    """
+    Histogram of the data of all the Image Layers in ``group`` (at any
+    depth) together, streamed a chunk at a time in a pool of threads, so
+    that groups with more data than fits in memory can be processed. See
+    ``joint_histogram``.
+    """
+    layers = {
+        node.layer: None
+        for node, _, _ in group.iter_layers(layer_type="image")
+        if node.is_tracking
+    }
+    return joint_histogram(list(layers), bins=bins, executor=executor)
+
+
+def share_contrast_limits(
+    group: GroupLayer,
+    percentiles: Tuple[float, float] = (0, 100),
+    histogram: Optional[Histogram] = None,
+) -> LayerPropertyEdit:
+    """
+    Give all the Image Layers in ``group`` (at any depth) the same contrast
+    limits, spanning the given percentiles of their joint histogram (see
+    ``group_joint_histogram``), so they are displayed consistently.
+
+    The contrast limits are set as a single batch (see
+    ``set_layer_property``), which can be undone with
+    ``undo_layer_property``.
+
+    Parameters
+    ----------
+    group : GroupLayer
+        GroupLayer to share the contrast limits of the Image Layers of.
+    percentiles : Tuple[float, float], default = (0, 100)
+        Percentiles (0 to 100) of the values of the Layers to use as the
+        lower and upper contrast limits. The default spans the full range
+        of the values.
+    histogram : Histogram, optional
+        Joint histogram of the Layers, if it has already been computed
+        (e.g. in the background). Computed if not given.
+
+    Returns
+    -------
+    LayerPropertyEdit
+        The batch of edits that was applied.
+    """
+    if histogram is None:
+        histogram = group_joint_histogram(group)
+    return set_layer_property(
+        group,
+        "contrast_limits",
+        histogram.contrast_limits(percentiles),
+        layer_type="image",
+    )
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import threading
+import warnings
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from pathlib import Path
+from queue import Empty, SimpleQueue
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from napari_experimental.group_layer import GroupLayer
+from napari_experimental.group_layer_node import GroupLayerNode
+
+if TYPE_CHECKING:
+    from napari.layers import Layer
+    from napari.utils.events.containers._nested_list import NestedIndex
+
+# Maximum number of sources that are read at once by default. Reads are
+# usually I/O bound, so a handful in flight keeps the disk busy without
+# thrashing it.
+MAX_CONCURRENT_READS = 4
+
+Source = Union[str, Path, Any]
+# A reader returns napari LayerData tuples ``(data, meta, layer_type)``, as
+# returned by reader plugins, rather than Layers, since Layers cannot safely
+# be created on the threads that the reads run on.
+ReadResult = Union[Tuple, List[Tuple]]
+
+
+def _as_layers(result: ReadResult) -> List[Layer]:
+    """
+    Convert what a reader returned into Layers. This creates Layer (and
+    possibly VisPy) objects, so must happen on the main thread.
+    """
+    # napari.layers imports Qt, so is only imported once a Layer is created
+    from napari.layers import Layer
+
+    if isinstance(result, tuple):
+        result = [result]
+    return [Layer.create(*item) for item in result]
+
+
+def _source_name(source: Source) -> Optional[str]:
+    """Name of the placeholder for a source: the file name, for paths."""
+    if isinstance(source, (str, Path)):
+        return Path(source).name
+    return None
+
+
+class GroupLayerLoader:
+    """
+    Loads the data for the items of a GroupLayer in the background.
+
+    ``load_group`` immediately adds a GroupLayer to the tree, containing a
+    placeholder Node (see ``GroupLayerNode.is_loading``) for each source to
+    read. The sources are then read by an executor, with at most
+    ``max_concurrent_reads`` in flight at once, so that a group of hundreds
+    of files appears in full straight away, and then fills in as each file
+    is read, rather than blocking until every file has been read.
+
+    Reads complete on the executor's threads, but Layers can only be added
+    to the tree (and the viewer) on the main thread. Completed reads are
+    therefore queued, and their placeholders are only replaced when
+    ``swap_completed`` is called (by the widget, on a timer).
+
+    Parameters
+    ----------
+    group_layers : GroupLayer
+        Tree to add the loading GroupLayers to.
+    max_concurrent_reads : int, default = MAX_CONCURRENT_READS
+        Maximum number of sources to be read at once.
+    executor : concurrent.futures.Executor, optional
+        Executor to run the reads on. A ThreadPoolExecutor with
+        ``max_concurrent_reads`` workers is created (and owned by the loader)
+        if not provided. A ProcessPoolExecutor can be given instead, provided
+        the reader and sources can be pickled.
+    on_loaded : Callable[[GroupLayerNode], None], optional
+        Called (from ``swap_completed``) with each Node that replaces a
+        placeholder, for example to add its Layer to the viewer.
+    """
+
+    def __init__(
+        self,
+        group_layers: GroupLayer,
+        max_concurrent_reads: int = MAX_CONCURRENT_READS,
+        executor: Optional[Executor] = None,
+        on_loaded: Optional[Callable[[GroupLayerNode], None]] = None,
+    ) -> None:
+        self.group_layers = group_layers
+        self.max_concurrent_reads = max(1, max_concurrent_reads)
+        self._owns_executor = executor is None
+        self._executor = executor
+        self._on_loaded = on_loaded
+
+        # Guards the bookkeeping below, which is updated from the threads
+        # that complete the reads.
+        self._lock = threading.RLock()
+        # Reads that are yet to be submitted to the executor
+        self._waiting: Deque[
+            Tuple[GroupLayerNode, Callable[[Source], ReadResult], Source]
+        ] = deque()
+        self._in_flight: Dict[Future, GroupLayerNode] = {}
+        # (placeholder, result, exception) of finished reads, waiting to be
+        # swapped in on the main thread
+        self._completed: SimpleQueue = SimpleQueue()
+        self._n_pending = 0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrent_reads,
+                thread_name_prefix="GroupLayerLoader",
+            )
+        return self._executor
+
+    @property
+    def n_pending(self) -> int:
+        """
+        Number of placeholders that are yet to be swapped for Layers
+        (either because they are still being read, or because
+        ``swap_completed`` has not been called since they were read).
+        """
+        return self._n_pending
+
+    def _submit_waiting(self) -> None:
+        """Submit waiting reads, up to the concurrency limit."""
+        with self._lock:
+            while (
+                self._waiting
+                and len(self._in_flight) < self.max_concurrent_reads
+            ):
+                placeholder, read, source = self._waiting.popleft()
+                future = self.executor.submit(read, source)
+                self._in_flight[future] = placeholder
+                # Registered after the future is recorded, since the
+                # callback runs immediately if the read has already finished
+                future.add_done_callback(self._on_read_done)
+
+    def _on_read_done(self, future: Future) -> None:
+        """Queue the result of a read, and start the next one."""
+        with self._lock:
+            placeholder = self._in_flight.pop(future)
+        if future.cancelled():
+            self._completed.put((placeholder, None, None))
+        else:
+            exception = future.exception()
+            result = None if exception is not None else future.result()
+            self._completed.put((placeholder, result, exception))
+        self._submit_waiting()
+
+    def load_group(
+        self,
+        sources: Iterable[Source],
+        read: Callable[[Source], ReadResult],
+        name: Optional[str] = None,
+        location: Optional[NestedIndex | int] = None,
+    ) -> GroupLayer:
+        """
+        Add a GroupLayer of placeholders to the tree, one for each of
+        ``sources``, and start reading the sources in the background.
+
+        Parameters
+        ----------
+        sources : Iterable
+            The sources (typically file paths) to read. The placeholder for
+            each source is named after it (the file name, for paths).
+        read : Callable
+            Function that reads a single source, returning napari LayerData
+            tuple(s). It is called on the executor, so should only read the
+            data: the Layers are created from the tuples on the main thread.
+            Sources that return several tuples are replaced by all of their
+            layers.
+        name : str, optional
+            Name to give the new GroupLayer.
+        location : NestedIndex | int, optional
+            Location in the tree at which to insert the new GroupLayer.
+            By default, it is added to the end of the top level of the tree.
+
+        Returns
+        -------
+        GroupLayer
+            The GroupLayer that was added to the tree.
+        """
+        sources = list(sources)
+        placeholders = [
+            GroupLayerNode(name=_source_name(source), loading=True)
+            for source in sources
+        ]
+        group = GroupLayer(*placeholders)
+        if name is not None:
+            group.name = name
+        self.group_layers.graft(group, location=location)
+
+        with self._lock:
+            self._n_pending += len(placeholders)
+            self._waiting.extend(
+                (placeholder, read, source)
+                for placeholder, source in zip(  # noqa: B905
+                    placeholders, sources
+                )
+            )
+        self._submit_waiting()
+        return group
+
+    def _swap(
+        self,
+        placeholder: GroupLayerNode,
+        result: Optional[ReadResult],
+        exception: Optional[BaseException],
+    ) -> None:
+        """
+        Replace ``placeholder`` with Nodes tracking the Layers that were
+        read for it. Placeholders whose read failed (or that have been
+        removed from the tree in the meantime) are removed.
+        """
+        group = placeholder.parent
+        if not self._in_tree(placeholder):
+            # Removed from the tree (on its own, or with a GroupLayer it is
+            # in) whilst it was loading
+            return
+
+        layers: List[Layer] = []
+        if exception is not None:
+            warnings.warn(
+                f"Could not load {placeholder.name}: {exception}",
+                stacklevel=2,
+            )
+        elif result is not None:
+            try:
+                layers = _as_layers(result)
+            except Exception as error:
+                warnings.warn(
+                    f"Could not create layers for {placeholder.name}: "
+                    f"{error}",
+                    stacklevel=2,
+                )
+
+        index = group._list.index(placeholder)
+        del group[index]
+        for offset, layer in enumerate(layers):
+            node = GroupLayerNode(layer_ptr=layer)
+            group.insert(index + offset, node)
+            if self._on_loaded is not None:
+                self._on_loaded(node)
+
+    def _in_tree(self, item: GroupLayerNode | GroupLayer) -> bool:
+        """Whether ``item`` is (at any depth) in the loader's tree."""
+        while item.parent is not None:
+            item = item.parent
+        return item is self.group_layers
+
+    def swap_completed(self, max_swaps: Optional[int] = None) -> int:
+        """
+        Replace the placeholders whose sources have been read with Nodes
+        tracking the Layers that were read, and return the number of
+        placeholders that were replaced. This must be called on the main
+        thread.
+
+        Parameters
+        ----------
+        max_swaps : int, optional
+            Only replace this many placeholders, leaving the remainder to
+            later calls.
+        """
+        n_swapped = 0
+        while max_swaps is None or n_swapped < max_swaps:
+            try:
+                placeholder, result, exception = self._completed.get_nowait()
+            except Empty:
+                break
+            with self._lock:
+                self._n_pending -= 1
+            self._swap(placeholder, result, exception)
+            n_swapped += 1
+        return n_swapped
+
+    def shutdown(self, wait: bool = False) -> None:
+        """
+        Cancel the reads that have not started, and shut down the executor
+        if the loader created it. Placeholders whose reads were cancelled
+        are removed at the next ``swap_completed``.
+        """
+        with self._lock:
+            cancelled = list(self._waiting)
+            self._waiting.clear()
+        for placeholder, _, _ in cancelled:
+            self._completed.put((placeholder, None, None))
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
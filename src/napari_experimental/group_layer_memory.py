@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from napari.layers import Layer
+
+_UNITS = ("B", "KiB", "MiB", "GiB", "TiB")
+
+
+class MemoryFootprint(NamedTuple):
+    """
+    Number of bytes of (Layer) data, split by where the data lives.
+
+    Parameters
+    ----------
+    in_memory : int
+        Bytes held in (NumPy) arrays in memory.
+    mapped : int
+        Bytes of memory-mapped arrays (``np.memmap``), which the operating
+        system can page out of memory.
+    lazy : int
+        Nominal bytes of lazy arrays (dask, Zarr, HDF5, ...), which are only
+        read as they are needed.
+    """
+
+    in_memory: int = 0
+    mapped: int = 0
+    lazy: int = 0
+
+    @property
+    def total(self) -> int:
+        """Total number of bytes, wherever they live."""
+        return self.in_memory + self.mapped + self.lazy
+
+    def __add__(self, other: MemoryFootprint) -> MemoryFootprint:
+        return MemoryFootprint(
+            self.in_memory + other.in_memory,
+            self.mapped + other.mapped,
+            self.lazy + other.lazy,
+        )
+
+    def __sub__(self, other: MemoryFootprint) -> MemoryFootprint:
+        return MemoryFootprint(
+            self.in_memory - other.in_memory,
+            self.mapped - other.mapped,
+            self.lazy - other.lazy,
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"{format_nbytes(self.in_memory)} in memory, "
+            f"{format_nbytes(self.mapped)} mapped, "
+            f"{format_nbytes(self.lazy)} lazy"
+        )
+
+
+def format_nbytes(nbytes: int) -> str:
+    """Format a number of bytes for display, e.g. ``"1.5 GiB"``."""
+    size = float(nbytes)
+    for unit in _UNITS[:-1]:
+        if abs(size) < 1024:
+            precision = 0 if unit == "B" else 1
+            return f"{size:.{precision}f} {unit}"
+        size /= 1024
+    return f"{size:.1f} {_UNITS[-1]}"
+
+
+def _array_footprint(array: Any) -> MemoryFootprint:
+    if isinstance(array, np.memmap):
+        return MemoryFootprint(mapped=array.nbytes)
+    if isinstance(array, np.ndarray):
+        return MemoryFootprint(in_memory=array.nbytes)
+    if isinstance(array, Sequence) and not isinstance(array, str):
+        # Multiscale data (napari's MultiScaleData, or a list of levels),
+        # Shapes data, Surface (vertices, faces, ...)
+        footprint = MemoryFootprint()
+        for item in array:
+            footprint += _array_footprint(item)
+        return footprint
+    shape = getattr(array, "shape", None)
+    dtype = getattr(array, "dtype", None)
+    if shape is None or dtype is None:
+        return MemoryFootprint()
+    return MemoryFootprint(
+        lazy=int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize
+    )
+
+
+def layer_footprint(layer: Layer) -> MemoryFootprint:
+    """
+    Return the footprint of the data of ``layer``. Only the data itself is
+    counted, not thumbnails, features, or other per-Layer overhead.
+    """
+    return _array_footprint(layer.data)
@@ -0,0 +1,515 @@
+from __future__ import annotations
+
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+
+from napari_experimental.group_layer_node import GroupLayerNode
+from napari_experimental.group_layer_transform import base_affine
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from napari.layers import Labels, Layer, Points
+
+    from napari_experimental.group_layer import GroupLayer
+
+# napari.layers (which imports Qt) and pandas are imported by the functions
+# that create Layers, so that importing GroupLayer does not import them.
+
+# Feature of a merged Points layer holding the index of the layer that
+# each point came from
+SOURCE_LAYER_FEATURE = "source_layer"
+# Feature holding whether each point of a hidden source layer is shown
+_SHOWN_FEATURE = "_source_shown"
+# Key of the metadata of a merged layer recording its source layers
+MERGED_SOURCES_KEY = "merged_sources"
+# Key of the metadata of a merged Labels layer holding the offsets that
+# were added to the labels of each source layer
+LABEL_OFFSETS_KEY = "merged_label_offsets"
+# Approximate number of bytes of each Labels layer to read at once
+LABELS_CHUNK_BYTES = 64 * 2**20
+# Per-point attributes of Points layers, which are concatenated
+_POINTS_PER_POINT = (
+    "data",
+    "face_color",
+    "border_color",
+    "size",
+    "symbol",
+    "border_width",
+    "shown",
+)
+# Arguments of the state of a Labels layer that are not kept in the record
+# of a merged layer: the data, and per-label attributes
+_LABELS_DERIVED = ("data", "features", "properties", "colormap", "color")
+# Arguments of the state of a Points layer that are derived from the
+# features, or are deprecated aliases
+_POINTS_DERIVED = (
+    "features",
+    "properties",
+    "property_choices",
+    "n_dimensional",
+)
+
+
+class SourceLayer(NamedTuple):
+    """
+    Record of a layer that was merged into another, from which it can be
+    rebuilt.
+
+    Parameters
+    ----------
+    state : Dict[str, Any]
+        State of the layer (see ``Layer._get_state``), without the
+        per-item data that is held by the merged layer.
+    feature_dtypes : pd.Series
+        Data types of the features of the layer.
+    """
+
+    state: Dict[str, Any]
+    feature_dtypes: pd.Series
+
+
+def _source_layer(layer: Layer, per_item: Tuple[str, ...]) -> SourceLayer:
+    state = layer._get_state()
+    for key in per_item:
+        state.pop(key, None)
+    # Excluding the transforms of the groups the layer is in, which are
+    # applied again wherever it is restored
+    state["affine"] = base_affine(layer)
+    return SourceLayer(state, layer.features.dtypes)
+
+
+def _check_transforms_match(layers: List[Layer]) -> None:
+    matrix = layers[0]._data_to_world.affine_matrix
+    for layer in layers[1:]:
+        if layer.ndim != layers[0].ndim or not np.array_equal(
+            layer._data_to_world.affine_matrix, matrix
+        ):
+            raise ValueError(
+                f"Cannot merge {layer.name!r} with {layers[0].name!r}: "
+                "layers must have the same dimensions and transforms."
+            )
+
+
+def sources_of(layer: Layer) -> List[SourceLayer]:
+    """
+    The layers that were merged into ``layer``, in the order they were
+    merged, or an empty list if ``layer`` is not a merged layer.
+    """
+    return layer.metadata.get(MERGED_SOURCES_KEY, [])
+
+
+def merge_points(layers: List[Points], name: str | None = None) -> Points:
+    """
+    Merge Points layers into a single Points layer, by concatenating the
+    points (and their features, colours, sizes, symbols, ...) of each.
+
+    The index of the layer that each point came from is held in the
+    ``SOURCE_LAYER_FEATURE`` feature, and the rest of the state of each
+    layer (name, visibility, opacity, ...) is recorded in the metadata of
+    the merged layer (see ``sources_of``), so that the layers can be
+    rebuilt exactly by ``split_points``. Points of hidden layers are not
+    shown, see ``set_source_visible``. The merged layer takes its other
+    properties (transforms, opacity, ...) from the first layer.
+
+    Parameters
+    ----------
+    layers : List[Points]
+        Layers to merge. They must have the same number of dimensions and
+        the same transforms, and no ``SOURCE_LAYER_FEATURE`` feature.
+    name : str, optional
+        Name of the merged layer. Defaults to the name of the first layer.
+
+    Returns
+    -------
+    Points
+        The merged layer.
+    """
+    import pandas as pd
+    from napari.layers import Points
+
+    if not layers:
+        raise ValueError("There are no points layers to merge.")
+    _check_transforms_match(layers)
+    for layer in layers:
+        if {SOURCE_LAYER_FEATURE, _SHOWN_FEATURE} & set(layer.features):
+            raise ValueError(
+                f"{layer.name!r} has already been merged, so cannot be "
+                "merged again."
+            )
+
+    sources = [
+        _source_layer(layer, _POINTS_PER_POINT + _POINTS_DERIVED)
+        for layer in layers
+    ]
+
+    counts = [len(layer.data) for layer in layers]
+    per_point = {
+        key: np.concatenate(
+            [np.asarray(getattr(layer, key)) for layer in layers]
+        )
+        for key in _POINTS_PER_POINT
+    }
+    features = pd.concat(
+        [layer.features for layer in layers], ignore_index=True
+    )
+    codes = np.repeat(np.arange(len(layers)), counts)
+    features[SOURCE_LAYER_FEATURE] = codes
+    features[_SHOWN_FEATURE] = per_point["shown"]
+    visible = np.array([layer.visible for layer in layers])
+    per_point["shown"] = per_point["shown"] & visible[codes]
+
+    state = {**sources[0].state, **per_point}
+    # The feature defaults of the first layer lack the features added
+    # above, so the defaults are derived from the merged features instead
+    state.pop("feature_defaults", None)
+    state["name"] = name if name is not None else layers[0].name
+    state["visible"] = True
+    state["features"] = features
+    state["metadata"] = {MERGED_SOURCES_KEY: sources}
+    return Points(**state)
+
+
+def set_source_visible(merged: Layer, source: int, visible: bool) -> None:
+    """
+    Show or hide the items of a merged layer that came from one of its
+    source layers (given by its index, see ``sources_of``), by updating
+    the ``shown`` mask of the merged layer. Whether each item is shown is
+    kept whilst its source is hidden, and restored when it is shown again.
+    """
+    record = sources_of(merged)[source]
+    if record.state["visible"] == visible:
+        return
+    record.state["visible"] = visible
+    features = merged.features
+    mask = features[SOURCE_LAYER_FEATURE].to_numpy() == source
+    shown = np.array(merged.shown, copy=True)
+    if visible:
+        shown[mask] = features.loc[mask, _SHOWN_FEATURE].to_numpy(bool)
+    else:
+        features.loc[mask, _SHOWN_FEATURE] = shown[mask]
+        shown[mask] = False
+    merged.shown = shown
+
+
+def split_points(merged: Points) -> List[Points]:
+    """
+    Rebuild the Points layers that were merged into ``merged`` (see
+    ``merge_points``), including any changes made to their points since.
+    Layers whose points have all been deleted are rebuilt empty.
+    """
+    from napari.layers import Points
+
+    sources = sources_of(merged)
+    if not sources:
+        raise ValueError(f"{merged.name!r} is not a merged points layer.")
+    features = merged.features
+    # Group the points by source once, rather than masking each array for
+    # every source
+    codes = features[SOURCE_LAYER_FEATURE].to_numpy()
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(sources) + 1))
+    per_point = {
+        key: np.asarray(getattr(merged, key))[order]
+        for key in _POINTS_PER_POINT
+    }
+    features = features.iloc[order].reset_index(drop=True)
+
+    layers = []
+    for index, source in enumerate(sources):
+        rows = slice(bounds[index], bounds[index + 1])
+        state = dict(source.state)
+        for key, values in per_point.items():
+            state[key] = values[rows]
+        if not state["visible"]:
+            state["shown"] = features[_SHOWN_FEATURE].to_numpy(bool)[rows]
+        state["features"] = (
+            features.iloc[rows][list(source.feature_dtypes.index)]
+            .reset_index(drop=True)
+            .astype(source.feature_dtypes.to_dict())
+        )
+        layers.append(Points(**state))
+    return layers
+
+
+def _replace_with_merged(
+    group: GroupLayer,
+    layer_type: str,
+    merge: Callable[[List[Layer]], Layer],
+) -> GroupLayerNode:
+    """
+    Merge the Layers of ``layer_type`` directly inside ``group`` (in tree
+    order) into one with ``merge``, and replace their Nodes with a Node
+    tracking it, inserted where the first of them was. Layers that are
+    themselves merged Layers are left as they are.
+    """
+    indices = [
+        i
+        for i, item in enumerate(group)
+        if not item.is_group()
+        and item.is_tracking
+        and item.layer._type_string == layer_type
+        and not sources_of(item.layer)
+    ]
+    if not indices:
+        raise ValueError(f"{group} has no {layer_type} layers to merge.")
+    merged = merge([group[i].layer for i in indices])
+    for index in reversed(indices):
+        del group[index]
+    node = GroupLayerNode(merged)
+    group.insert(indices[0], node)
+    return node
+
+
+def merge_group_points(
+    group: GroupLayer, name: Optional[str] = None
+) -> GroupLayerNode:
+    """
+    Replace the (Nodes tracking) Points Layers directly inside ``group``
+    with a single Node, tracking one Points Layer that holds all of their
+    points (see ``merge_points``), so that they are drawn and sliced as
+    one. The original Layers can be rebuilt with ``split_group_points``.
+    Merged Layers are not merged again.
+
+    Parameters
+    ----------
+    group : GroupLayer
+        GroupLayer to merge the Points Layers of.
+    name : str, optional
+        Name of the merged Layer. Defaults to the name of the first of the
+        Points Layers.
+
+    Returns
+    -------
+    GroupLayerNode
+        The Node tracking the merged Layer, which is inserted where the
+        first of the Points Layers was.
+    """
+    return _replace_with_merged(
+        group, "points", partial(merge_points, name=name)
+    )
+
+
+def split_group_points(
+    group: GroupLayer, node: GroupLayerNode
+) -> List[GroupLayerNode]:
+    """
+    Replace a Node directly inside ``group`` that tracks a merged Points
+    Layer (see ``merge_group_points``) with Nodes tracking the Layers that
+    were merged into it, rebuilt with any changes made since (see
+    ``split_points``).
+
+    Returns
+    -------
+    List[GroupLayerNode]
+        The Nodes tracking the rebuilt Layers, in their original order.
+    """
+    layers = split_points(node.layer)
+    index = group.index(node)
+    del group[index]
+    nodes = [GroupLayerNode(layer) for layer in layers]
+    for offset, item in enumerate(nodes):
+        group.insert(index + offset, item)
+    return nodes
+
+
+def _chunks(shape: Tuple[int, ...], itemsize: int) -> Iterator[slice]:
+    """
+    Slices along the first axis of an array of ``shape``, each covering
+    about ``LABELS_CHUNK_BYTES`` of (``itemsize``-byte) items.
+    """
+    plane_bytes = int(np.prod(shape[1:], dtype=np.int64)) * itemsize
+    step = max(1, LABELS_CHUNK_BYTES // max(1, plane_bytes))
+    for start in range(0, shape[0], step):
+        yield slice(start, min(start + step, shape[0]))
+
+
+def merge_labels(
+    layers: List[Labels], name: str | None = None, out: Any = None
+) -> Labels:
+    """
+    Merge Labels layers into a single Labels layer.
+
+    The labels of each layer are offset by the largest label of the layers
+    before it, so that labels from different layers do not collide. Where
+    the labels of several layers overlap, the label of the earliest layer
+    is kept. The offsets are recorded in the metadata of the merged layer
+    (along with the state of each layer, see ``sources_of``), and map the
+    merged labels back to the layer and label they came from, see
+    ``label_sources``.
+
+    The layers are read and relabelled a chunk (see ``LABELS_CHUNK_BYTES``)
+    at a time, so lazy (e.g. dask or Zarr) or memory-mapped volumes are
+    never read into memory all at once. To keep the merged volume out of
+    memory too, pass an on-disk array as ``out``.
+
+    Parameters
+    ----------
+    layers : List[Labels]
+        Layers to merge, in order of priority (e.g. top of the tree first).
+        They must have the same shape and transforms, and not be
+        multiscale.
+    name : str, optional
+        Name of the merged layer. Defaults to the name of the first layer.
+    out : array-like, optional
+        Array to write the merged labels to, e.g. an ``np.memmap`` or a
+        Zarr array, of the same shape as the layers, and an unsigned
+        integer type large enough for the merged labels. By default, an
+        array of the smallest such type is allocated in memory.
+
+    Returns
+    -------
+    Labels
+        The merged layer, which takes its transforms, opacity and blending
+        from the first layer.
+    """
+    from napari.layers import Labels
+
+    if not layers:
+        raise ValueError("There are no labels layers to merge.")
+    _check_transforms_match(layers)
+    shape = layers[0].data.shape
+    for layer in layers:
+        if layer.multiscale or layer.data.shape != shape:
+            raise ValueError(
+                f"Cannot merge {layer.name!r}: labels layers must have the "
+                "same shape, and not be multiscale."
+            )
+
+    # Highest label of each layer, found a chunk at a time
+    maxima = np.zeros(len(layers), dtype=np.int64)
+    for index, layer in enumerate(layers):
+        for chunk in _chunks(shape, layer.data.dtype.itemsize):
+            block = np.asarray(layer.data[chunk])
+            if block.size == 0:
+                continue
+            if block.min() < 0:
+                raise ValueError(
+                    f"Cannot merge {layer.name!r}: it has negative labels."
+                )
+            maxima[index] = max(maxima[index], block.max())
+    offsets = np.concatenate([[0], np.cumsum(maxima)])
+
+    dtype = np.min_scalar_type(int(offsets[-1]))
+    if out is None:
+        out = np.zeros(shape, dtype=dtype)
+    elif out.shape != shape or np.dtype(out.dtype).kind != "u":
+        raise ValueError(
+            f"out must be an array of unsigned integers of shape {shape}."
+        )
+    out_dtype = np.dtype(out.dtype)
+    if np.iinfo(out_dtype).max < offsets[-1]:
+        raise ValueError(
+            f"out ({out_dtype}) cannot hold labels up to {offsets[-1]}."
+        )
+
+    for chunk in _chunks(shape, out_dtype.itemsize):
+        merged = np.zeros(
+            (chunk.stop - chunk.start, *shape[1:]), dtype=out_dtype
+        )
+        for layer, offset in zip(layers, offsets[:-1]):  # noqa: B905
+            block = np.asarray(layer.data[chunk])
+            # Earlier layers take priority, so only fill the background
+            mask = (block != 0) & (merged == 0)
+            merged[mask] = block[mask].astype(out_dtype) + out_dtype.type(
+                offset
+            )
+        out[chunk] = merged
+
+    first = layers[0]
+    return Labels(
+        out,
+        name=name if name is not None else first.name,
+        scale=first.scale,
+        translate=first.translate,
+        rotate=first.rotate,
+        shear=first.shear,
+        affine=base_affine(first),
+        opacity=first.opacity,
+        blending=first.blending,
+        metadata={
+            MERGED_SOURCES_KEY: [
+                _source_layer(layer, _LABELS_DERIVED) for layer in layers
+            ],
+            LABEL_OFFSETS_KEY: offsets,
+        },
+    )
+
+
+def label_sources(
+    merged: Labels, labels: Any
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Map labels of a merged Labels layer (see ``merge_labels``) back to the
+    layers and labels they came from.
+
+    Parameters
+    ----------
+    merged : Labels
+        The merged layer.
+    labels : array-like of int
+        Labels of the merged layer, of any shape.
+
+    Returns
+    -------
+    source : np.ndarray
+        Index of the layer (see ``sources_of``) that each label came from,
+        or -1 for the background (and labels added since the merge).
+    original : np.ndarray
+        The label that each label had in its layer (0 for the background).
+    """
+    offsets = merged.metadata.get(LABEL_OFFSETS_KEY)
+    if offsets is None:
+        raise ValueError(f"{merged.name!r} is not a merged labels layer.")
+    labels = np.asarray(labels, dtype=np.int64)
+    source = np.searchsorted(offsets, labels, side="left") - 1
+    # The background, and labels added since the layers were merged
+    unknown = (source < 0) | (source >= len(offsets) - 1)
+    source[unknown] = -1
+    original = labels - offsets[np.maximum(source, 0)]
+    original[unknown] = 0
+    return source, original
+
+
+def merge_group_labels(
+    group: GroupLayer, name: Optional[str] = None, out: Any = None
+) -> GroupLayerNode:
+    """
+    Replace the (Nodes tracking) Labels Layers directly inside ``group``
+    with a single Node, tracking one Labels Layer that combines all of
+    their labels (see ``merge_labels``). Where Layers overlap, the Layer
+    highest in the tree wins, and ``label_sources`` maps the merged labels
+    back to the Layer and label they came from. Merged Layers are not
+    merged again.
+
+    Parameters
+    ----------
+    group : GroupLayer
+        GroupLayer to merge the Labels Layers of.
+    name : str, optional
+        Name of the merged Layer. Defaults to the name of the first of the
+        Labels Layers.
+    out : array-like, optional
+        Array to write the merged labels to, e.g. an ``np.memmap`` or a
+        Zarr array. By default, an array is allocated in memory.
+
+    Returns
+    -------
+    GroupLayerNode
+        The Node tracking the merged Layer, which is inserted where the
+        first of the Labels Layers was.
+    """
+    return _replace_with_merged(
+        group, "labels", partial(merge_labels, name=name, out=out)
+    )
@@ -1,10 +1,42 @@
 from __future__ import annotations
 
-from typing import Optional
+import sys
+from typing import TYPE_CHECKING, Any, Optional
 
-from napari.layers import Layer
+import numpy as np
 from napari.utils.tree import Node
 
+from napari_experimental.group_layer_memory import (
+    MemoryFootprint,
+    layer_footprint,
+)
+
+if TYPE_CHECKING:
+    from napari.layers import Layer
+    from napari.utils.events import Event
+
+# Events of a Layer that (may) change its world extent
+EXTENT_EVENTS = (
+    "extent",
+    "data",
+    "scale",
+    "translate",
+    "rotate",
+    "shear",
+    "affine",
+)
+
+
+def is_layer(obj: Any) -> bool:
+    """
+    Whether ``obj`` is a napari Layer.
+
+    napari.layers imports Qt, so it is not imported to check. No Layer can
+    exist unless it has already been imported.
+    """
+    layers = sys.modules.get("napari.layers")
+    return layers is not None and isinstance(obj, layers.Layer)
+
 
 class GroupLayerNode(Node):
     """
@@ -18,17 +50,82 @@ class GroupLayerNode(Node):
     of subclassing or mixing-in the Node class (which would require widespread
     changes to the core napari codebase).
 
+    Nodes that do not (yet) track a Layer can be used as placeholders for
+    Layers that are still being loaded, see ``is_loading``.
+
     Parameters
     ----------
     layer_ptr : Layer, optional
         The Layer object that this Node should initially track.
     name: str, optional
         Name to be given to the Node upon creation. The Layer retains its name.
+    loading: bool, default = False
+        Whether the Node is a placeholder for a Layer that is being loaded.
     """
 
     __default_name: str = "Node[None]"
 
     _tracking_layer: Layer | None
+    _loading: bool
+    # Cached footprint of the data of the tracked Layer, see ``footprint``
+    _footprint: MemoryFootprint | None
+    # Cached world extent of the tracked Layer, see ``extent``
+    _extent: np.ndarray | None
+    _extent_cached: bool
+
+    @property
+    def extent(self) -> np.ndarray | None:
+        """
+        World extent of the tracked Layer, as a ``(2, ndim)`` array of the
+        minima and maxima along each axis, or None if the Node is not
+        tracking a Layer.
+
+        The extent is cached, and discarded (along with the cached extents
+        of the GroupLayers containing this Node) whenever the data or the
+        transform of the Layer changes.
+        """
+        if not self._extent_cached:
+            if self.is_tracking:
+                self._extent = np.asarray(self.layer.extent.world)
+                for name in EXTENT_EVENTS:
+                    getattr(self.layer.events, name).connect(
+                        self._invalidate_extent
+                    )
+            else:
+                self._extent = None
+            self._extent_cached = True
+        return self._extent
+
+    @property
+    def footprint(self) -> MemoryFootprint:
+        """
+        Footprint of the data of the tracked Layer, split into in-memory,
+        memory-mapped and lazy bytes.
+
+        The footprint is cached, and kept up to date (along with the cached
+        footprints of the GroupLayers containing this Node) whenever the
+        data of the Layer is replaced.
+        """
+        if self._footprint is None:
+            if self.is_tracking:
+                self._footprint = layer_footprint(self.layer)
+                self.layer.events.data.connect(self._on_layer_data)
+            else:
+                self._footprint = MemoryFootprint()
+        return self._footprint
+
+    @property
+    def nbytes(self) -> int:
+        """Total number of bytes in ``footprint``."""
+        return self.footprint.total
+
+    @property
+    def is_loading(self) -> bool:
+        """
+        Returns True if the Node is a placeholder for a Layer that is still
+        being loaded (see ``GroupLayerLoader``).
+        """
+        return self._loading
 
     @property
     def is_tracking(self) -> bool:
@@ -48,9 +145,25 @@ class GroupLayerNode(Node):
     @layer.setter
     def layer(self, new_ptr: Layer) -> None:
         assert (
-            isinstance(new_ptr, Layer) or new_ptr is None
+            is_layer(new_ptr) or new_ptr is None
         ), f"{type(new_ptr)} is not a layer or None!"
+        if self._extent_cached:
+            # The extent of the new Layer is computed when next needed
+            if self.is_tracking:
+                for name in EXTENT_EVENTS:
+                    getattr(self.layer.events, name).disconnect(
+                        self._invalidate_extent
+                    )
+            self._invalidate_extent()
+        if self._footprint is None:
+            self._tracking_layer = new_ptr
+            return
+        # The footprint of the old Layer is cached (and being kept up to
+        # date), so switch over to the new Layer.
+        if self.is_tracking:
+            self.layer.events.data.disconnect(self._on_layer_data)
         self._tracking_layer = new_ptr
+        self._update_footprint()
 
     @property
     def name(self) -> str:
@@ -63,7 +176,7 @@ class GroupLayerNode(Node):
         if self.is_tracking:
             return self.layer.name
         else:
-            return self.__default_name
+            return self._name
 
     @name.setter
     def name(self, value: str) -> None:
@@ -74,14 +187,55 @@ class GroupLayerNode(Node):
         self,
         layer_ptr: Optional[Layer] = None,
         name: Optional[str] = None,
+        loading: bool = False,
     ):
         name = name if name else self.__default_name
         Node.__init__(self, name=name)
 
+        self._footprint = None
+        self._extent = None
+        self._extent_cached = False
         self.layer = layer_ptr
+        self._loading = loading
 
     def __str__(self) -> str:
         return f"Node[{self.name}]"
 
+    def _on_layer_data(self, event: Optional[Event] = None) -> None:
+        self._update_footprint()
+
+    def _update_footprint(self) -> None:
+        """
+        Recompute the footprint of the tracked Layer, and adjust the cached
+        footprints of the GroupLayers above this Node by the difference.
+        """
+        old = self._footprint
+        self._footprint = None
+        new = self.footprint
+        delta = new - old
+        # GroupLayers only cache their footprint once the footprints of
+        # everything inside them are cached, so the walk can stop at the
+        # first GroupLayer without a cached footprint.
+        parent = self.parent
+        while parent is not None and parent._footprint is not None:
+            parent._footprint += delta
+            parent = parent.parent
+
+    def _invalidate_extent(self, event: Optional[Event] = None) -> None:
+        """
+        Discard the cached extent of this Node, and of the GroupLayers
+        above it.
+        """
+        self._extent = None
+        self._extent_cached = False
+        # GroupLayers only cache their extent once the extents of everything
+        # inside them are cached, so the walk can stop at the first
+        # GroupLayer without a cached extent.
+        parent = self.parent
+        while parent is not None and parent._extent_cached:
+            parent._extent = None
+            parent._extent_cached = False
+            parent = parent.parent
+
     def __repr__(self) -> str:
         return self.__str__()
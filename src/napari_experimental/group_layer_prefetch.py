@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+from napari_experimental.group_layer_slice_cache import (
+    attached_cache,
+    group_slice_cache,
+)
+
+if TYPE_CHECKING:
+    from napari.components import Dims
+    from napari.layers import Layer
+    from napari.utils.events import Event
+
+    from napari_experimental.group_layer import GroupLayer
+    from napari_experimental.group_layer_slice_cache import SliceCache
+
+# Number of upcoming frames to prefetch by default
+PREFETCH_FRAMES = 4
+# Number of threads prefetching slices by default
+PREFETCH_WORKERS = 4
+
+
+class DimsPrefetcher:
+    """
+    Prefetches the upcoming slices of the Layers in visible GroupLayers, as
+    the dims are stepped through (e.g. during playback).
+
+    Whenever the current step of a single (non-displayed) dimension of the
+    dims changes, the next ``n_frames`` steps along that dimension, in the
+    direction it is moving, are sliced in a pool of worker threads for the
+    Layers in each GroupLayer that has a slice cache enabled (see
+    ``enable_slice_cache``). The slices are stored in the
+    GroupLayer's cache, so that when the dims arrive at those steps the
+    Layers are served from it.
+
+    Each GroupLayer's cache also sets its budget: fewer frames are
+    prefetched if the slices of ``n_frames`` frames (estimated from the
+    slices already cached) would not fit in it alongside the current frame.
+    Prefetching for GroupLayers that are hidden, or no longer active (see
+    ``is_active``), is cancelled.
+
+    Parameters
+    ----------
+    root : GroupLayer
+        Tree whose GroupLayers to prefetch slices for.
+    dims : napari.components.Dims
+        Dims of the viewer.
+    n_frames : int, default = PREFETCH_FRAMES
+        Maximum number of upcoming frames to prefetch.
+    max_workers : int, default = PREFETCH_WORKERS
+        Number of threads to prefetch slices with.
+    is_active : Callable[[GroupLayer], bool], optional
+        Additional condition for a (visible) GroupLayer to be prefetched
+        for, e.g. that it is expanded in a view.
+    """
+
+    def __init__(
+        self,
+        root: GroupLayer,
+        dims: Dims,
+        n_frames: int = PREFETCH_FRAMES,
+        max_workers: int = PREFETCH_WORKERS,
+        is_active: Optional[Callable[[GroupLayer], bool]] = None,
+    ) -> None:
+        self.root = root
+        self.dims = dims
+        self.n_frames = n_frames
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._is_active = is_active
+
+        self._last_step: Tuple[int, ...] = tuple(dims.current_step)
+        # Axis -> direction (+1 or -1) in which it was last stepped
+        self._directions: Dict[int, int] = {}
+        self._pending: Dict[GroupLayer, List[Future]] = {}
+
+        dims.events.current_step.connect(self._on_current_step)
+        root.events.visible.connect(self._on_visible)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers,
+                thread_name_prefix="DimsPrefetcher",
+            )
+        return self._executor
+
+    @property
+    def n_pending(self) -> int:
+        """Number of prefetches that are queued or running."""
+        return sum(
+            not future.done()
+            for futures in self._pending.values()
+            for future in futures
+        )
+
+    def _active(self, group: GroupLayer) -> bool:
+        return group.visible and (
+            self._is_active is None or self._is_active(group)
+        )
+
+    def _on_visible(self, event: Event) -> None:
+        if not event.value.visible:
+            self.cancel(event.value)
+
+    def _on_current_step(self, event: Optional[Event] = None) -> None:
+        step = tuple(self.dims.current_step)
+        previous, self._last_step = self._last_step, step
+        if len(step) != len(previous):
+            return
+        changed = [
+            axis
+            for axis, (a, b) in enumerate(zip(previous, step))  # noqa: B905
+            if a != b
+        ]
+        if len(changed) != 1:
+            return
+        axis = changed[0]
+        difference = step[axis] - previous[axis]
+        # Steps of more than one are jumps (or playback looping round), so
+        # keep the previous direction
+        if abs(difference) == 1:
+            self._directions[axis] = difference
+        self.prefetch(axis, self._directions.get(axis, 1))
+
+    def _frame_budget(self, cache: SliceCache, n_layers: int) -> int:
+        """
+        Number of frames of ``n_layers`` Layers that can be prefetched into
+        ``cache``, besides the current frame.
+        """
+        frames = cache.max_slices // n_layers - 1
+        if cache.nbytes:
+            frame_nbytes = n_layers * cache.nbytes / len(cache)
+            frames = min(frames, int(cache.max_bytes // frame_nbytes) - 1)
+        return max(0, min(self.n_frames, frames))
+
+    def prefetch(self, axis: int, direction: int = 1) -> None:
+        """
+        Prefetch the slices of the next frames along ``axis`` (in the given
+        direction) for the active GroupLayers, replacing any prefetches
+        that are still queued.
+        """
+        if axis in self.dims.displayed:
+            return
+        n_steps = self.dims.nsteps[axis]
+        current = self.dims.current_step[axis]
+
+        for group in self._groups_with_caches():
+            self.cancel(group)
+            if not self._active(group):
+                continue
+            cache = group_slice_cache(group)
+            layers = self._layers_in(group, cache)
+            if not layers:
+                continue
+            n_frames = self._frame_budget(cache, len(layers))
+            if n_frames == 0:
+                continue
+
+            # A separate model, since copies of an EventedModel share its
+            # events. napari.components imports Qt (via napari.layers), so is
+            # only imported once there is something to prefetch.
+            from napari.components import Dims
+
+            upcoming = Dims()
+            upcoming.update(self.dims)
+            futures = []
+            for offset in range(1, n_frames + 1):
+                # Playback loops round, so wrap the upcoming steps too
+                upcoming.set_current_step(
+                    axis, (current + direction * offset) % n_steps
+                )
+                for layer in layers:
+                    request = cache.prefetch_request(layer, upcoming)
+                    if request is not None:
+                        futures.append(self.executor.submit(request))
+            self._pending[group] = futures
+
+    def _groups_with_caches(self) -> List[GroupLayer]:
+        groups = [self.root]
+        groups.extend(group for group, _, _ in self.root.iter_groups())
+        return [
+            group for group in groups if group_slice_cache(group) is not None
+        ]
+
+    @staticmethod
+    def _layers_in(group: GroupLayer, cache: SliceCache) -> List[Layer]:
+        return [
+            node.layer
+            for node, _, _ in group.iter_layers(visible=True)
+            if attached_cache(node.layer) is cache
+        ]
+
+    def cancel(self, group: Optional[GroupLayer] = None) -> None:
+        """
+        Cancel the queued prefetches for ``group`` (and the GroupLayers
+        inside it), or for all GroupLayers.
+        """
+        if group is None:
+            groups = list(self._pending)
+        else:
+            groups = [group, *(item for item, _, _ in group.iter_groups())]
+        for item in groups:
+            for future in self._pending.pop(item, ()):
+                future.cancel()
+
+    def shutdown(self) -> None:
+        """
+        Cancel all prefetches, stop the worker threads, and stop following
+        the dims.
+        """
+        self.dims.events.current_step.disconnect(self._on_current_step)
+        self.root.events.visible.disconnect(self._on_visible)
+        self.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -1,20 +1,43 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Optional, Set
 
 from napari._qt.containers import QtNodeTreeModel, QtNodeTreeView
+from napari._qt.containers._base_item_model import ItemRole
 from napari._qt.containers.qt_layer_model import ThumbnailRole
-from napari._qt.qt_resources import get_current_stylesheet
-from qtpy.QtCore import QModelIndex, QSize, Qt
+from napari._qt.qt_resources import get_stylesheet
+from napari.settings import get_settings
+from qtpy.QtCore import QModelIndex, QSize, QSortFilterProxyModel, Qt, QTimer
 from qtpy.QtGui import QDropEvent, QImage
+from qtpy.QtWidgets import QAbstractItemView
 
 from napari_experimental.group_layer import GroupLayer
 from napari_experimental.group_layer_delegate import GroupLayerDelegate
+from napari_experimental.group_layer_memory import format_nbytes
 
 if TYPE_CHECKING:
+    import napari
+    from napari.utils.events import Event
     from qtpy.QtWidgets import QWidget
 
+    from napari_experimental.group_layer_node import GroupLayerNode
+
+# Tree.qss matches styles for QtListView and QtLayerList from 02_custom.qss
+# in Napari
+TREE_STYLESHEET = Path(__file__).parent / "styles" / "tree.qss"
+
+
+@lru_cache(maxsize=None)
+def tree_stylesheet(theme_id: str) -> str:
+    """
+    Return the stylesheet of the given napari theme, with the additional
+    items from 'tree.qss'. Stylesheets are cached, so that they are only
+    built once per theme rather than for every view that is created.
+    """
+    return get_stylesheet(theme_id, extra=[str(TREE_STYLESHEET)])
+
 
 class QtGroupLayerModel(QtNodeTreeModel[GroupLayer]):
     """
@@ -51,7 +74,7 @@ class QtGroupLayerModel(QtNodeTreeModel[GroupLayer]):
         elif role == Qt.ItemDataRole.SizeHintRole:
             return QSize(200, 34)
         # Match thumbnail retrieval in QtLayerListModel data()
-        elif role == ThumbnailRole and not item.is_group():
+        elif role == ThumbnailRole and item.is_tracking:
             thumbnail = item.layer.thumbnail
             return QImage(
                 thumbnail,
@@ -59,23 +82,33 @@ class QtGroupLayerModel(QtNodeTreeModel[GroupLayer]):
                 thumbnail.shape[0],
                 QImage.Format_RGBA8888,
             )
+        # Report the memory footprint of layers, and of everything in groups
+        elif role == Qt.ItemDataRole.ToolTipRole and (
+            item.is_group() or item.is_tracking
+        ):
+            return (
+                f"{item.name}\n"
+                f"{format_nbytes(item.nbytes)} ({item.footprint})"
+            )
         # Match alignment of text in QtLayerListModel data()
         elif role == Qt.ItemDataRole.TextAlignmentRole:
             return Qt.AlignCenter
         # Match check state in QtLayerListModel data()
         elif role == Qt.ItemDataRole.CheckStateRole:
-            if not item.is_group():
+            if item.is_group():
                 return (
                     Qt.CheckState.Checked
-                    if item.layer.visible
+                    if item.visible
                     else Qt.CheckState.Unchecked
                 )
-            else:
+            elif item.is_tracking:
                 return (
                     Qt.CheckState.Checked
-                    if item.visible
+                    if item.layer.visible
                     else Qt.CheckState.Unchecked
                 )
+            # Placeholders (for layers that are loading) have no checkbox
+            return None
 
         return super().data(index, role)
 
@@ -91,6 +124,8 @@ class QtGroupLayerModel(QtNodeTreeModel[GroupLayer]):
             role = Qt.ItemDataRole.DisplayRole
         elif role == Qt.ItemDataRole.CheckStateRole:
             if not item.is_group():
+                if not item.is_tracking:
+                    return False
                 item.layer.visible = (
                     Qt.CheckState(value) == Qt.CheckState.Checked
                 )
@@ -112,6 +147,84 @@ class QtGroupLayerModel(QtNodeTreeModel[GroupLayer]):
         return True
 
 
+class QtGroupLayerFilterProxyModel(QSortFilterProxyModel):
+    """
+    A QSortFilterProxyModel that only shows the items of a QtGroupLayerModel
+    matching a search, along with the GroupLayers containing them.
+
+    Matches are looked up in the ``search_index`` of the GroupLayer, rather
+    than by examining each row. Since ancestors of matches are accepted,
+    Qt never descends into GroupLayers without a match inside them.
+
+    Parameters
+    ----------
+    source : QtGroupLayerModel
+        The model to filter.
+    parent : QWidget, optional
+        Parent QObject for the instance.
+    """
+
+    def __init__(self, source: QtGroupLayerModel, parent: QWidget = None):
+        super().__init__(parent)
+        self.setSourceModel(source)
+
+        self._search_text = ""
+        self._accepted: Optional[Set[GroupLayerNode]] = None
+
+        # Changes to the tree arrive in bursts (and whilst the source model
+        # is mid-update), so re-run the search once control returns to the
+        # event loop.
+        self._refilter_timer = QTimer(self)
+        self._refilter_timer.setSingleShot(True)
+        self._refilter_timer.setInterval(0)
+        self._refilter_timer.timeout.connect(self._refilter)
+        source._root.search_index.events.changed.connect(
+            self._on_index_changed
+        )
+
+    @property
+    def search_text(self) -> str:
+        """The text that items are currently being filtered by."""
+        return self._search_text
+
+    def set_search_text(self, text: str) -> None:
+        """
+        Filter the model to the items whose name contains ``text``.
+        See ``GroupLayerSearchIndex.query`` for the accepted syntax.
+        """
+        self._search_text = text.strip()
+        self._refilter()
+
+    def _on_index_changed(self, event: Event) -> None:
+        if self._search_text:
+            self._refilter_timer.start()
+
+    def _refilter(self) -> None:
+        """Re-run the search, and update which rows are accepted."""
+        if not self._search_text:
+            self._accepted = None
+        else:
+            root: GroupLayer = self.sourceModel()._root
+            matches = root.search_index.query(self._search_text)
+            accepted = set(matches)
+            for item in matches:
+                for ancestor in item.iter_parents():
+                    if ancestor in accepted:
+                        break
+                    accepted.add(ancestor)
+            self._accepted = accepted
+        self.invalidateFilter()
+
+    def filterAcceptsRow(
+        self, source_row: int, source_parent: QModelIndex
+    ) -> bool:
+        if self._accepted is None:
+            return True
+        source = self.sourceModel()
+        item = source.getItem(source.index(source_row, 0, source_parent))
+        return item in self._accepted
+
+
 class QtGroupLayerView(QtNodeTreeView):
     """
     A QTreeView that works with the QtGroupLayerModel model.
@@ -123,30 +236,98 @@ class QtGroupLayerView(QtNodeTreeView):
         The root object from which to form the model.
     parent : QWidget, optional
         Parent QObject for the instance.
+    viewer : napari.viewer.Viewer, optional
+        Viewer whose camera the context menu can fit to the selected items.
     """
 
     _root: GroupLayer
     model_class = QtGroupLayerModel
 
-    def __init__(self, root: GroupLayer, parent: QWidget = None):
+    def __init__(
+        self,
+        root: GroupLayer,
+        parent: QWidget = None,
+        viewer: Optional[napari.viewer.Viewer] = None,
+    ):
+        # QtNodeTreeView.__init__ calls (our override of) setRoot
         super().__init__(root, parent)
-        self.setRoot(root)
+        self.viewer = viewer
 
         grouplayer_delegate = GroupLayerDelegate()
         self.setItemDelegate(grouplayer_delegate)
 
         # Keep existing style and add additional items from 'tree.qss'
-        # Tree.qss matches styles for QtListView and QtLayerList from
-        # 02_custom.qss in Napari
-        stylesheet = get_current_stylesheet(
-            extra=[str(Path(__file__).parent / "styles" / "tree.qss")]
+        self.setStyleSheet(tree_stylesheet(get_settings().appearance.theme))
+
+    @property
+    def filter_model(self) -> QtGroupLayerFilterProxyModel:
+        """
+        Proxy model used to display the results of a search, created on
+        first use.
+        """
+        if self._filter_model is None:
+            self._filter_model = QtGroupLayerFilterProxyModel(
+                self._group_layer_model, self
+            )
+        return self._filter_model
+
+    def set_filter_text(self, text: str) -> None:
+        """
+        Only show the items whose name contains ``text``, along with the
+        groups containing them. Passing an empty string shows all items.
+
+        Whilst a filter is active the view displays the ``filter_model``
+        rather than the underlying QtGroupLayerModel, and drag and drop is
+        disabled.
+        """
+        self.filter_model.set_search_text(text)
+        filtering = bool(self.filter_model.search_text)
+
+        target_model = (
+            self.filter_model if filtering else self._group_layer_model
         )
-        self.setStyleSheet(stylesheet)
+        if self.model() is not target_model:
+            self.setModel(target_model)
+            self._sync_selection_models()
+            self.setDragDropMode(
+                QAbstractItemView.DragDropMode.NoDragDrop
+                if filtering
+                else QAbstractItemView.DragDropMode.InternalMove
+            )
+        if filtering:
+            self.expandAll()
+
+    def is_item_expanded(self, item: GroupLayerNode) -> bool:
+        """
+        Whether ``item`` (a GroupLayer in the tree) is expanded in the view.
+        The root of the tree is always considered expanded.
+        """
+        if item is self._root:
+            return True
+        index = self._group_layer_model.nestedIndex(item.index_from_root())
+        if self.model() is not self._group_layer_model:
+            index = self.model().mapFromSource(index)
+        return index.isValid() and self.isExpanded(index)
+
+    def select_item(self, item: GroupLayerNode) -> None:
+        """
+        Select (only) ``item``, expanding the groups above it and scrolling
+        the view to it.
+        """
+        self._root.propagate_selection(event=None, new_selection=[item])
+        index = self._group_layer_model.nestedIndex(item.index_from_root())
+        if self.model() is not self._group_layer_model:
+            index = self.model().mapFromSource(index)
+        if index.isValid():
+            # Also expands the (collapsed) groups above the item
+            self.scrollTo(index)
 
     def setRoot(self, root: GroupLayer):
         """Override setRoot to ensure .model is a QtGroupLayerModel"""
         self._root = root
-        self.setModel(QtGroupLayerModel(root, self))
+        self._group_layer_model = QtGroupLayerModel(root, self)
+        self._filter_model = None
+        self.setModel(self._group_layer_model)
 
         # from _BaseEventedItemView
         root.selection.events.changed.connect(self._on_py_selection_change)
@@ -154,8 +335,8 @@ class QtGroupLayerView(QtNodeTreeView):
         self._sync_selection_models()
 
         # from QtNodeTreeView
-        self.model().rowsRemoved.connect(self._redecorate_root)
-        self.model().rowsInserted.connect(self._redecorate_root)
+        self._group_layer_model.rowsRemoved.connect(self._redecorate_root)
+        self._group_layer_model.rowsInserted.connect(self._redecorate_root)
         self._redecorate_root()
 
     def dropEvent(self, event: QDropEvent):
@@ -168,5 +349,5 @@ class QtGroupLayerView(QtNodeTreeView):
 
     def sync_selection_from_view_to_model(self):
         """Force model / group layer to select the same items as the view"""
-        selected = [self.model().getItem(qi) for qi in self.selectedIndexes()]
+        selected = [qi.data(ItemRole) for qi in self.selectedIndexes()]
         self._root.propagate_selection(event=None, new_selection=selected)
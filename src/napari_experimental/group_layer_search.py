@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+)
+
+from napari.utils.events import EmitterGroup, Event
+
+if TYPE_CHECKING:
+    from napari.layers import Layer
+
+    from napari_experimental.group_layer import GroupLayer
+    from napari_experimental.group_layer_node import GroupLayerNode
+
+GROUP_TYPE_STRING = "group"
+TYPE_QUERY_PREFIX = "type:"
+
+# Names are padded before being split into trigrams, so that names shorter
+# than three characters still produce at least one gram.
+_GRAM_LENGTH = 3
+_PAD = "\x00"
+
+
+def node_type_string(node: GroupLayerNode) -> str:
+    """
+    Return the type string of a node in the tree: ``"group"`` for
+    GroupLayers, and the ``_type_string`` of the tracked Layer otherwise.
+    """
+    if node.is_group():
+        return GROUP_TYPE_STRING
+    if not node.is_tracking:
+        return ""
+    return node.layer._type_string
+
+
+def _grams_of(key: str) -> Set[str]:
+    padded = f"{_PAD}{key}{_PAD}"
+    return {
+        padded[i : i + _GRAM_LENGTH]
+        for i in range(len(padded) - _GRAM_LENGTH + 1)
+    }
+
+
+class GroupLayerSearchIndex:
+    """
+    Incrementally maintained index of the names and (layer) types of the
+    items in a GroupLayer tree.
+
+    Names are indexed case-insensitively by their trigrams, so that a
+    substring query only has to examine the names sharing all of its
+    trigrams, rather than scanning every item in the tree. Exact names are
+    also indexed, both across the whole tree and amongst the children of
+    each GroupLayer, which allows items to be looked up by name or by path
+    (see ``GroupLayer.find``) in constant time per path component.
+
+    The index is kept up to date through the ``inserted``, ``removed``,
+    ``moved`` and ``name`` events of the tree, and the ``name`` events of the
+    tracked Layers. The root of the tree is not itself indexed.
+
+    Parameters
+    ----------
+    root : GroupLayer
+        The tree to index.
+
+    Attributes
+    ----------
+    events : EmitterGroup
+        Emits ``changed`` whenever the contents of the index change.
+    """
+
+    def __init__(self, root: GroupLayer) -> None:
+        self.root = root
+        self.events = EmitterGroup(source=self, changed=Event)
+
+        # trigram -> (lower-case) names containing that trigram
+        self._names_with_gram: Dict[str, Set[str]] = defaultdict(set)
+        # (lower-case) name -> items with that name
+        self._nodes_with_name: Dict[str, Set[GroupLayerNode]] = defaultdict(
+            set
+        )
+        # (exact) name -> items with that name
+        self._nodes_with_exact_name: Dict[str, Set[GroupLayerNode]] = (
+            defaultdict(set)
+        )
+        # GroupLayer -> (exact) name -> children of the GroupLayer with that
+        # name, in the order they were indexed
+        self._children_named: Dict[
+            GroupLayer, Dict[str, List[GroupLayerNode]]
+        ] = defaultdict(lambda: defaultdict(list))
+        # item -> the GroupLayer it was indexed as a child of
+        self._indexed_parent: Dict[GroupLayerNode, GroupLayer] = {}
+        # type string -> items of that type
+        self._nodes_with_type: Dict[str, Set[GroupLayerNode]] = defaultdict(
+            set
+        )
+        # item -> the name it is currently indexed under
+        self._indexed_name: Dict[GroupLayerNode, str] = {}
+        # Layer -> items tracking that Layer, so that renaming the
+        # Layer can be reflected on the correct items
+        self._nodes_tracking: Dict[Layer, Set[GroupLayerNode]] = defaultdict(
+            set
+        )
+        # Layer -> callback connected to the name event of that Layer
+        self._rename_callbacks: Dict[Layer, Callable[[Event], None]] = {}
+
+        for item in root.traverse():
+            if item is not root:
+                self._add(item)
+
+        root.events.inserted.connect(self._on_inserted)
+        root.events.removed.connect(self._on_removed)
+        root.events.moved.connect(self._on_moved)
+        root.events.name.connect(self._on_group_renamed)
+
+    def __len__(self) -> int:
+        return len(self._indexed_name)
+
+    def __contains__(self, item: GroupLayerNode) -> bool:
+        return item in self._indexed_name
+
+    def _add(self, item: GroupLayerNode) -> None:
+        """Add a single item (not its children) to the index."""
+        self._indexed_parent[item] = item.parent
+        self._index_name(item)
+        self._nodes_with_type[node_type_string(item)].add(item)
+        if not item.is_group() and item.is_tracking:
+            layer = item.layer
+            if layer not in self._rename_callbacks:
+                callback = partial(self._on_layer_renamed, layer)
+                layer.events.name.connect(callback)
+                self._rename_callbacks[layer] = callback
+            self._nodes_tracking[layer].add(item)
+
+    def _discard(self, item: GroupLayerNode) -> None:
+        """Remove a single item (not its children) from the index."""
+        if item not in self._indexed_name:
+            return
+        self._unindex_name(item)
+        del self._indexed_parent[item]
+        type_string = node_type_string(item)
+        self._nodes_with_type[type_string].discard(item)
+        if not self._nodes_with_type[type_string]:
+            del self._nodes_with_type[type_string]
+        if not item.is_group() and item.is_tracking:
+            layer = item.layer
+            self._nodes_tracking[layer].discard(item)
+            if not self._nodes_tracking[layer]:
+                del self._nodes_tracking[layer]
+                layer.events.name.disconnect(self._rename_callbacks.pop(layer))
+
+    def _index_name(self, item: GroupLayerNode) -> None:
+        name = item.name
+        key = name.lower()
+        self._indexed_name[item] = name
+        self._nodes_with_exact_name[name].add(item)
+        self._children_named[self._indexed_parent[item]][name].append(item)
+        if not self._nodes_with_name[key]:
+            for gram in _grams_of(key):
+                self._names_with_gram[gram].add(key)
+        self._nodes_with_name[key].add(item)
+
+    def _unindex_name(self, item: GroupLayerNode) -> None:
+        name = self._indexed_name.pop(item)
+        key = name.lower()
+        self._nodes_with_exact_name[name].discard(item)
+        if not self._nodes_with_exact_name[name]:
+            del self._nodes_with_exact_name[name]
+        self._unindex_child(item, name)
+        self._nodes_with_name[key].discard(item)
+        if not self._nodes_with_name[key]:
+            del self._nodes_with_name[key]
+            for gram in _grams_of(key):
+                self._names_with_gram[gram].discard(key)
+                if not self._names_with_gram[gram]:
+                    del self._names_with_gram[gram]
+
+    def _unindex_child(self, item: GroupLayerNode, name: str) -> None:
+        parent = self._indexed_parent[item]
+        siblings = self._children_named[parent]
+        siblings[name].remove(item)
+        if not siblings[name]:
+            del siblings[name]
+        if not siblings:
+            del self._children_named[parent]
+
+    def _reindex_name(self, item: GroupLayerNode) -> None:
+        if item not in self._indexed_name:
+            return
+        self._unindex_name(item)
+        self._index_name(item)
+
+    def _on_inserted(self, event: Event) -> None:
+        for item in event.value.traverse():
+            self._add(item)
+        self.events.changed()
+
+    def _on_removed(self, event: Event) -> None:
+        for item in event.value.traverse():
+            self._discard(item)
+        self.events.changed()
+
+    def _on_moved(self, event: Event) -> None:
+        # Moving an item keeps its name and type, but can change the
+        # GroupLayer it is a child of (its own children are unaffected).
+        item = event.value
+        if item not in self._indexed_name:
+            return
+        name = self._indexed_name[item]
+        self._unindex_child(item, name)
+        self._indexed_parent[item] = item.parent
+        self._children_named[item.parent][name].append(item)
+        self.events.changed()
+
+    def _on_group_renamed(self, event: Event) -> None:
+        self._reindex_name(event.value)
+        self.events.changed()
+
+    def _on_layer_renamed(self, layer: Layer, event: Event) -> None:
+        for item in self._nodes_tracking.get(layer, ()):
+            self._reindex_name(item)
+        self.events.changed()
+
+    def _names_containing(self, text: str) -> Iterable[str]:
+        """
+        Return the indexed (lower-case) names that contain ``text``.
+
+        For ``text`` at least as long as a trigram, only the names sharing
+        every trigram of ``text`` are examined. Shorter ``text`` is matched
+        against the trigrams themselves, whose number is bounded by the
+        vocabulary of the names rather than the number of items in the tree.
+        """
+        if len(text) >= _GRAM_LENGTH:
+            grams = [
+                text[i : i + _GRAM_LENGTH]
+                for i in range(len(text) - _GRAM_LENGTH + 1)
+            ]
+            postings = sorted(
+                (self._names_with_gram.get(gram, set()) for gram in grams),
+                key=len,
+            )
+            candidates = postings[0].intersection(*postings[1:])
+        else:
+            candidates = set()
+            for gram, names in self._names_with_gram.items():
+                if text in gram:
+                    candidates |= names
+        return (name for name in candidates if text in name)
+
+    def children_named(
+        self, group: GroupLayer, name: str
+    ) -> List[GroupLayerNode]:
+        """
+        Return the (direct) children of ``group`` called ``name``.
+        """
+        return list(self._children_named.get(group, {}).get(name, ()))
+
+    def nodes_named(self, name: str) -> Set[GroupLayerNode]:
+        """
+        Return the items in the tree called ``name`` (case-sensitive).
+        """
+        return set(self._nodes_with_exact_name.get(name, ()))
+
+    def nodes_of_type(self, type_string: str) -> Set[GroupLayerNode]:
+        """
+        Return the items whose type string is ``type_string``.
+
+        Layers use their ``_type_string`` (e.g. "image", "points"),
+        GroupLayers use "group".
+        """
+        return set(self._nodes_with_type.get(type_string.lower(), ()))
+
+    def query(
+        self, text: str, type_string: Optional[str] = None
+    ) -> Set[GroupLayerNode]:
+        """
+        Return the items in the tree whose name contains ``text``
+        (case-insensitive).
+
+        Whitespace-separated terms in ``text`` of the form ``type:<type>``
+        restrict the results to items of (any of) those types, the
+        remaining text is
+        matched against the item names. An empty ``text`` matches every
+        item of the requested type.
+
+        Parameters
+        ----------
+        text : str
+            Text to search for.
+        type_string : str, optional
+            If given, only return items of this type (see
+            ``nodes_of_type``).
+        """
+        type_strings = set() if type_string is None else {type_string}
+        name_terms = []
+        for term in text.lower().split():
+            if term.startswith(TYPE_QUERY_PREFIX):
+                type_strings.add(term[len(TYPE_QUERY_PREFIX) :])
+            else:
+                name_terms.append(term)
+        name_text = " ".join(name_terms)
+
+        if name_text:
+            matches: Set[GroupLayerNode] = set()
+            for name in self._names_containing(name_text):
+                matches |= self._nodes_with_name[name]
+        else:
+            matches = set(self._indexed_name)
+        if type_strings:
+            of_requested_types: Set[GroupLayerNode] = set()
+            for requested_type in type_strings:
+                of_requested_types |= self._nodes_with_type.get(
+                    requested_type, set()
+                )
+            matches &= of_requested_types
+        return matches
@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+import dataclasses
+import threading
+import warnings
+from collections import OrderedDict
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Tuple
+from weakref import WeakKeyDictionary
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from napari.layers import Layer
+    from napari.utils.events import Event
+
+    from napari_experimental.group_layer import GroupLayer
+
+# Types of Layer whose slices are cached. Their slices are (potentially
+# expensive) reads of an array, whereas the slices of other Layers are
+# cheap to compute.
+CACHED_LAYER_TYPES = ("image", "labels")
+# Method of a Layer's slicing state that is replaced whilst it is attached.
+# It is private to napari, so may be renamed or removed in another version.
+SLICE_REQUEST_METHOD = "_make_slice_request_internal"
+# Events that mean the data of a Layer has changed, in addition to ``data``
+_DATA_CHANGED_EVENTS = ("data", "paint", "labels_update")
+
+# Layer -> the SliceCache it is attached to
+_ATTACHED: WeakKeyDictionary[Layer, SliceCache] = WeakKeyDictionary()
+# GroupLayer -> the SliceCache enabled for it
+_GROUP_CACHES: WeakKeyDictionary[GroupLayer, SliceCache] = WeakKeyDictionary()
+
+
+def _nbytes(obj: Any, depth: int = 0) -> int:
+    """Bytes in the arrays held by a slice response (or its parts)."""
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if depth >= 2:
+        return 0
+    if dataclasses.is_dataclass(obj):
+        values = [
+            getattr(obj, field.name) for field in dataclasses.fields(obj)
+        ]
+    elif hasattr(obj, "__dict__"):
+        values = list(vars(obj).values())
+    else:
+        return 0
+    return sum(_nbytes(value, depth + 1) for value in values)
+
+
+def _as_key(array: Any) -> Tuple:
+    # NaN (e.g. of displayed dimensions) does not compare equal to itself,
+    # so would never match a cached key
+    return tuple(
+        None if value != value else value
+        for value in np.asarray(array).ravel().tolist()
+    )
+
+
+def _slicing_state(layer: Layer) -> Any:
+    """
+    The object that makes the slice requests of ``layer``: the Layer
+    itself in older versions of napari, or its ``_slicing_state``.
+    """
+    return getattr(layer, "_slicing_state", layer)
+
+
+def can_cache_slices(layer: Layer) -> bool:
+    """
+    Whether the slicing state of ``layer`` has the ``SLICE_REQUEST_METHOD``
+    that a SliceCache replaces, which it must to be attached.
+    """
+    return callable(
+        getattr(type(_slicing_state(layer)), SLICE_REQUEST_METHOD, None)
+    )
+
+
+class SliceCache:
+    """
+    Memory-bounded LRU cache of the slices of the Layers in a GroupLayer,
+    see ``enable_slice_cache``.
+
+    Slices are keyed by the Layer, the point (and thickness) of the slice
+    in data coordinates, the displayed dimensions, the projection mode and
+    data level of the Layer, and a version number of the Layer's data,
+    which is bumped whenever the Layer emits a ``data`` (or, for Labels,
+    ``paint``) event. Re-showing a hidden Layer, or
+    stepping back to a recently viewed point, is then served from the cache
+    rather than reading the data again.
+
+    Changes made to the data of a Layer in-place, without an event, are not
+    detected; call ``invalidate`` after making them.
+
+    Parameters
+    ----------
+    max_slices : int
+        Maximum number of slices to keep (across all the Layers).
+    max_bytes : int
+        Maximum number of bytes of slices to keep.
+    """
+
+    def __init__(self, max_slices: int, max_bytes: int) -> None:
+        self.max_slices = max_slices
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # Whether the slice requests being made are prefetches
+        self._prefetching = False
+
+        # Slices may be requested from the async slicing thread
+        self._lock = threading.Lock()
+        # Key -> (slice response, bytes), least recently used first
+        self._entries: OrderedDict[Hashable, Tuple[Any, int]] = OrderedDict()
+        self._nbytes = 0
+        self._versions: WeakKeyDictionary[Layer, int] = WeakKeyDictionary()
+        # Layer -> token identifying its slices in the keys. Unlike the id
+        # of the Layer, a token is never reused by another Layer whilst
+        # slices keyed by it remain.
+        self._tokens: WeakKeyDictionary[Layer, object] = WeakKeyDictionary()
+        # Layer -> callback bumping its version
+        self._callbacks: WeakKeyDictionary[Layer, Callable] = (
+            WeakKeyDictionary()
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes of slices currently cached."""
+        return self._nbytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def attach(self, layer: Layer) -> None:
+        """
+        Start caching the slices of ``layer``. Layers can only be attached
+        to one SliceCache at once, so this does nothing if ``layer`` is
+        already attached to one, or is not of a type that is cached.
+
+        If the Layer cannot be attached with this version of napari (see
+        ``can_cache_slices``), a warning is issued and its slices are not
+        cached.
+        """
+        if layer in _ATTACHED or layer._type_string not in CACHED_LAYER_TYPES:
+            return
+        if getattr(layer, "multiscale", False):
+            # Multiscale slices depend on the visible region of the canvas
+            return
+        if not can_cache_slices(layer):
+            warnings.warn(
+                f"Cannot cache the slices of {type(layer).__name__} layers, "
+                f"which have no {SLICE_REQUEST_METHOD} with this version of "
+                "napari",
+                stacklevel=2,
+            )
+            return
+        _ATTACHED[layer] = self
+        self._versions.setdefault(layer, 0)
+        self._tokens[layer] = object()
+        callback = partial(self._bump_version, layer)
+        for name in _DATA_CHANGED_EVENTS:
+            if hasattr(layer.events, name):
+                getattr(layer.events, name).connect(callback)
+        self._callbacks[layer] = callback
+        # Instance attributes take precedence over the methods of the class
+        setattr(
+            _slicing_state(layer),
+            SLICE_REQUEST_METHOD,
+            partial(self._make_slice_request, layer),
+        )
+
+    def detach(self, layer: Layer) -> None:
+        """Stop caching the slices of ``layer``, and discard them."""
+        if _ATTACHED.get(layer) is not self:
+            return
+        del _ATTACHED[layer]
+        delattr(_slicing_state(layer), SLICE_REQUEST_METHOD)
+        callback = self._callbacks.pop(layer)
+        for name in _DATA_CHANGED_EVENTS:
+            if hasattr(layer.events, name):
+                getattr(layer.events, name).disconnect(callback)
+        self.invalidate(layer)
+        del self._tokens[layer]
+
+    def _update_attached_items(self, event: Event) -> None:
+        """
+        Attach the Layers inserted into the GroupLayer this cache is enabled
+        for, and detach those removed from it.
+        """
+        item = event.value
+        nodes = (
+            (node for node, _, _ in item.iter_layers())
+            if item.is_group()
+            else (item,)
+        )
+        for node in nodes:
+            if node.is_tracking:
+                if event.type == "inserted":
+                    self.attach(node.layer)
+                else:
+                    self.detach(node.layer)
+
+    def invalidate(self, layer: Layer | None = None) -> None:
+        """Discard the cached slices of ``layer``, or of all Layers."""
+        with self._lock:
+            if layer is None:
+                self._entries.clear()
+                self._nbytes = 0
+                return
+            token = self._tokens.get(layer)
+            if token is None:
+                return
+            for key in [key for key in self._entries if key[0] is token]:
+                _, nbytes = self._entries.pop(key)
+                self._nbytes -= nbytes
+
+    def _bump_version(self, layer: Layer, event: Any = None) -> None:
+        # Slices of the old version are left to be evicted
+        self._versions[layer] = self._versions.get(layer, 0) + 1
+
+    def _key(self, layer: Layer, slice_input: Any, data_slice: Any) -> Tuple:
+        return (
+            self._tokens.get(layer),
+            self._versions.get(layer, 0),
+            _as_key(data_slice.point),
+            _as_key(data_slice.margin_left),
+            _as_key(data_slice.margin_right),
+            slice_input.ndisplay,
+            tuple(slice_input.order),
+            str(layer.projection_mode),
+            layer.data_level,
+            # The visible region only changes the slices of multiscale
+            # Layers, and changes with every pan otherwise
+            (
+                _as_key(layer.corner_pixels)
+                if getattr(layer, "multiscale", False)
+                else None
+            ),
+        )
+
+    def _store(self, key: Hashable, response: Any) -> None:
+        nbytes = _nbytes(response)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (response, nbytes)
+            self._nbytes += nbytes
+            while self._entries and (
+                len(self._entries) > self.max_slices
+                or self._nbytes > self.max_bytes
+            ):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._nbytes -= evicted
+
+    def prefetch_request(
+        self, layer: Layer, dims: Any
+    ) -> Callable[[], None] | None:
+        """
+        Return a request that slices ``layer`` at the point of ``dims``
+        and stores the result in the cache (without returning it), or None
+        if that slice is already cached. The request is made on the calling
+        (main) thread, as by napari's asynchronous slicing, but can be run
+        on any thread. Prefetching does not count towards ``hits`` or
+        ``misses``.
+        """
+        self._prefetching = True
+        try:
+            request = _slicing_state(layer)._make_slice_request(dims)
+        finally:
+            self._prefetching = False
+        if request is None:
+            return None
+
+        def prefetch() -> None:
+            request()
+
+        return prefetch
+
+    def _make_slice_request(
+        self, layer: Layer, **kwargs: Any
+    ) -> Callable[[], Any] | None:
+        """
+        Stands in for the ``_make_slice_request_internal`` method of an
+        attached Layer, returning a request that is served from the cache
+        if possible. Whilst prefetching, None is returned for slices that
+        are already cached instead.
+        """
+        key = self._key(layer, kwargs["slice_input"], kwargs["data_slice"])
+        with self._lock:
+            cached = self._entries.get(key)
+            if self._prefetching:
+                if cached is not None:
+                    return None
+            elif cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return lambda: cached[0]
+            else:
+                self.misses += 1
+
+        slicing_state = _slicing_state(layer)
+        request = getattr(type(slicing_state), SLICE_REQUEST_METHOD)(
+            slicing_state, **kwargs
+        )
+
+        def cached_request() -> Any:
+            response = request()
+            self._store(key, response)
+            return response
+
+        return cached_request
+
+
+def attached_cache(layer: Layer) -> SliceCache | None:
+    """The SliceCache that ``layer`` is attached to, if any."""
+    return _ATTACHED.get(layer)
+
+
+def group_slice_cache(group: GroupLayer) -> SliceCache | None:
+    """
+    The SliceCache enabled for ``group`` (see ``enable_slice_cache``), if
+    any.
+    """
+    return _GROUP_CACHES.get(group)
+
+
+def enable_slice_cache(
+    group: GroupLayer, max_slices: int = 32, max_bytes: int = 512 * 2**20
+) -> SliceCache:
+    """
+    Keep the most recently rendered slices of the Image and Labels Layers
+    in ``group`` (at any depth) in a memory-bounded LRU cache, so that
+    showing the GroupLayer again after hiding it, or stepping back to a
+    recently viewed point of the dims, does not read the data again. See
+    ``SliceCache`` for details.
+
+    Layers already using the slice cache of another GroupLayer are not
+    added to this one. If the cache is already enabled, its limits are
+    updated. Layers inserted into (or removed from) the GroupLayer whilst
+    the cache is enabled are attached to (or detached from) it.
+
+    Parameters
+    ----------
+    group : GroupLayer
+        GroupLayer to cache the slices of the Layers of.
+    max_slices : int, default = 32
+        Maximum number of slices to keep, across all the Layers.
+    max_bytes : int, default = 512 MiB
+        Maximum number of bytes of slices to keep.
+
+    Returns
+    -------
+    SliceCache
+        The cache, which also reports its ``hits`` and ``misses``.
+    """
+    cache = _GROUP_CACHES.get(group)
+    if cache is not None:
+        cache.max_slices = max_slices
+        cache.max_bytes = max_bytes
+        return cache
+    cache = _GROUP_CACHES[group] = SliceCache(max_slices, max_bytes)
+    for node, _, _ in group.iter_layers():
+        if node.is_tracking:
+            cache.attach(node.layer)
+    # Only GroupLayers with a cache listen for the items inserted into (and
+    # removed from) them
+    group.events.inserted.connect(cache._update_attached_items)
+    group.events.removed.connect(cache._update_attached_items)
+    return cache
+
+
+def disable_slice_cache(group: GroupLayer) -> None:
+    """Stop caching the slices of the Layers in ``group``."""
+    cache = _GROUP_CACHES.pop(group, None)
+    if cache is None:
+        return
+    group.events.inserted.disconnect(cache._update_attached_items)
+    group.events.removed.disconnect(cache._update_attached_items)
+    for node, _, _ in group.iter_layers():
+        if node.is_tracking:
+            cache.detach(node.layer)
+    cache.invalidate()
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+import numpy as np
+
+from napari_experimental.group_layer_search import (
+    GROUP_TYPE_STRING,
+    node_type_string,
+)
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from napari_experimental.group_layer import GroupLayer
+    from napari_experimental.group_layer_node import GroupLayerNode
+
+# Codes used for the type of each item in a snapshot. Layer types that are
+# not listed here are assigned codes after these, in order of appearance.
+TYPE_CODES: Tuple[str, ...] = (
+    GROUP_TYPE_STRING,
+    "image",
+    "labels",
+    "points",
+    "shapes",
+    "surface",
+    "tracks",
+    "vectors",
+)
+
+
+def _read_only(array: npt.NDArray) -> npt.NDArray:
+    array.flags.writeable = False
+    return array
+
+
+class GroupLayerSnapshot:
+    """
+    Structure-of-arrays export of a GroupLayer tree.
+
+    Items are stored in Euler-tour (pre-order) order: the root of the tree is
+    at position 0, and every group is immediately followed by the items it
+    contains (see also ``GroupLayer.flat_index_order``). As a consequence,
+    the items in the subtree of the item at position ``i`` are exactly those
+    at positions ``subtree_start[i]`` (which is ``i`` itself) up to, but not
+    including, ``subtree_end[i]``. This allows ancestor / descendant tests
+    to be made in O(1), and queries over a subtree to be made as vectorised
+    operations on a contiguous slice of the arrays.
+
+    Snapshots are not updated when the tree changes - use
+    ``GroupLayer.tree_snapshot`` to obtain an up-to-date snapshot, which is
+    cached and only rebuilt after the tree has been modified.
+
+    Parameters
+    ----------
+    root : GroupLayer
+        The tree to take a snapshot of.
+
+    Attributes
+    ----------
+    nodes : list of GroupLayerNode
+        The items in the tree, in Euler-tour order.
+    parent : numpy.ndarray of int
+        Position of the parent of each item (-1 for the root).
+    depth : numpy.ndarray of int
+        Depth of each item (0 for the root).
+    subtree_start, subtree_end : numpy.ndarray of int
+        Each subtree occupies positions ``subtree_start:subtree_end``.
+    is_group : numpy.ndarray of bool
+        Whether each item is a GroupLayer.
+    type_code : numpy.ndarray of int
+        Code of the type of each item, see ``type_names``.
+    type_names : tuple of str
+        ``type_names[code]`` is the type string (as in
+        ``GroupLayerSearchIndex``) corresponding to each code.
+    """
+
+    def __init__(self, root: GroupLayer) -> None:
+        type_names: List[str] = list(TYPE_CODES)
+        codes: Dict[str, int] = {name: i for i, name in enumerate(type_names)}
+
+        nodes: List[GroupLayerNode] = []
+        parent: List[int] = []
+        depth: List[int] = []
+        type_code: List[int] = []
+        subtree_end: List[int] = []
+
+        # Iterative pre-order traversal, so that deep trees don't hit the
+        # recursion limit. Entries are (item, parent position, depth), or
+        # (None, position, -1) to mark the end of the subtree at position.
+        to_visit: List[Tuple[GroupLayerNode | None, int, int]] = [
+            (root, -1, 0)
+        ]
+        while to_visit:
+            item, parent_position, item_depth = to_visit.pop()
+            if item is None:
+                subtree_end[parent_position] = len(nodes)
+                continue
+            position = len(nodes)
+            nodes.append(item)
+            parent.append(parent_position)
+            depth.append(item_depth)
+            subtree_end.append(position + 1)
+
+            type_string = node_type_string(item)
+            if type_string not in codes:
+                codes[type_string] = len(type_names)
+                type_names.append(type_string)
+            type_code.append(codes[type_string])
+
+            if item.is_group():
+                to_visit.append((None, position, -1))
+                to_visit.extend(
+                    (child, position, item_depth + 1)
+                    for child in reversed(item)
+                )
+
+        self.nodes = nodes
+        self.type_names = tuple(type_names)
+        self.parent = _read_only(np.array(parent, dtype=np.intp))
+        self.depth = _read_only(np.array(depth, dtype=np.intp))
+        self.subtree_start = _read_only(np.arange(len(nodes), dtype=np.intp))
+        self.subtree_end = _read_only(np.array(subtree_end, dtype=np.intp))
+        self.type_code = _read_only(np.array(type_code, dtype=np.intp))
+        self.is_group = _read_only(self.type_code == codes[GROUP_TYPE_STRING])
+
+        self._positions: Dict[GroupLayerNode, int] = {
+            item: position for position, item in enumerate(nodes)
+        }
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def position_of(self, item: GroupLayerNode) -> int:
+        """
+        Return the position of ``item`` in the snapshot arrays.
+
+        Raises a KeyError if ``item`` was not in the tree when the snapshot
+        was taken.
+        """
+        return self._positions[item]
+
+    def is_ancestor(
+        self, ancestor: GroupLayerNode, descendant: GroupLayerNode
+    ) -> bool:
+        """
+        Return True if ``descendant`` is (strictly) inside ``ancestor``.
+        """
+        a = self.position_of(ancestor)
+        d = self.position_of(descendant)
+        return bool(self.subtree_start[a] < d < self.subtree_end[a])
+
+    def ancestor_mask(self, position: int) -> npt.NDArray:
+        """
+        Return a boolean mask over the snapshot that is True at every
+        position whose subtree contains the item at ``position`` (excluding
+        the item itself).
+        """
+        return (self.subtree_start < position) & (position < self.subtree_end)
+
+    def subtree(self, item: GroupLayerNode) -> slice:
+        """
+        Return the slice of the snapshot arrays occupied by the subtree
+        rooted at ``item`` (including ``item`` itself).
+        """
+        position = self.position_of(item)
+        return slice(position, int(self.subtree_end[position]))
+
+    def layer_positions_under(self, item: GroupLayerNode) -> npt.NDArray:
+        """
+        Return the positions of all (non-group) items inside the subtree
+        rooted at ``item``, in Euler-tour order.
+        """
+        subtree = self.subtree(item)
+        return np.flatnonzero(~self.is_group[subtree]) + subtree.start
+
+    def layers_under(self, item: GroupLayerNode) -> List[GroupLayerNode]:
+        """
+        Return all (non-group) items inside the subtree rooted at ``item``,
+        in Euler-tour order.
+        """
+        return [self.nodes[i] for i in self.layer_positions_under(item)]
+
+    def type_mask(self, type_string: str) -> npt.NDArray:
+        """
+        Return a boolean mask which is True at the positions of items of
+        the given type.
+        """
+        if type_string not in self.type_names:
+            return np.zeros(len(self), dtype=bool)
+        return self.type_code == self.type_names.index(type_string)
+
+    def count_per_depth(self, layers_only: bool = False) -> npt.NDArray:
+        """
+        Return the number of items at each depth of the tree (index 0 being
+        the root).
+
+        Parameters
+        ----------
+        layers_only : bool, default = False
+            If True, only count the (non-group) items at each depth.
+        """
+        depth = self.depth[~self.is_group] if layers_only else self.depth
+        return np.bincount(depth, minlength=int(self.depth.max()) + 1)
@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import numpy as np
+from napari.utils.events import Event
+
+from napari_experimental.group_layer_node import EXTENT_EVENTS
+
+if TYPE_CHECKING:
+    from napari.layers import Layer
+
+    from napari_experimental.group_layer import GroupLayer
+    from napari_experimental.group_layer_node import GroupLayerNode
+
+# Items whose box covers more grid cells than this are not added to the
+# cells, but checked on every query instead. These are typically the few
+# groups spanning most of the scene.
+SPATIAL_INDEX_MAX_CELLS = 64
+
+Cell = Tuple[int, int]
+
+
+class GroupLayerSpatialIndex:
+    """
+    Incrementally maintained spatial index of the world extents of the
+    items in a GroupLayer tree, used to find the items under a point (e.g.
+    the cursor in the canvas).
+
+    Items are bucketed into a uniform grid over the last two (world) axes,
+    so a point query only examines the items sharing its grid cell, rather
+    than every item in the tree. Items much larger than a cell (see
+    ``SPATIAL_INDEX_MAX_CELLS``) are kept aside and checked on every query.
+    Unless given, the size of the cells is taken from the median size of
+    the Layers when they are first indexed.
+
+    Layers are indexed by their extent (see ``GroupLayerNode.extent``),
+    padded by half a data step so that a point anywhere on a pixel picks
+    the Layer, and GroupLayers by their cached extent (see
+    ``GroupLayer.extent``). The ``inserted``, ``removed`` and ``moved``
+    events of the tree, and the data and transform events of the tracked
+    Layers, mark the changed items and the GroupLayers above them as out of
+    date. Only those items are re-indexed, at the next query. The root of
+    the tree is not itself indexed.
+
+    Parameters
+    ----------
+    root : GroupLayer
+        The tree to index.
+    cell_size : float, optional
+        Size of the cells of the grid, in world units.
+    """
+
+    def __init__(
+        self, root: GroupLayer, cell_size: Optional[float] = None
+    ) -> None:
+        self.root = root
+        self.cell_size = cell_size
+
+        # cell -> items whose box overlaps that cell
+        self._cells: Dict[Cell, Set[GroupLayerNode]] = defaultdict(set)
+        # item -> cells it has been added to
+        self._cells_of: Dict[GroupLayerNode, List[Cell]] = {}
+        # items covering too many cells to be added to them
+        self._large: Set[GroupLayerNode] = set()
+        # item -> its box, as a (2, ndim) array of minima and maxima
+        self._boxes: Dict[GroupLayerNode, np.ndarray] = {}
+        # item -> the GroupLayer it was indexed as a child of
+        self._indexed_parent: Dict[GroupLayerNode, GroupLayer] = {}
+        # items whose box is out of date
+        self._dirty: Set[GroupLayerNode] = set()
+        # Layer -> items tracking that Layer, so that changes to the extent
+        # of the Layer can be reflected on the correct items
+        self._nodes_tracking: Dict[Layer, Set[GroupLayerNode]] = defaultdict(
+            set
+        )
+        # Layer -> callback connected to the extent events of that Layer
+        self._extent_callbacks: Dict[Layer, Callable[[Event], None]] = {}
+
+        for item in root.traverse():
+            if item is not root:
+                self._add(item)
+
+        root.events.inserted.connect(self._on_inserted)
+        root.events.removed.connect(self._on_removed)
+        root.events.moved.connect(self._on_moved)
+
+    def __len__(self) -> int:
+        return len(self._indexed_parent)
+
+    def __contains__(self, item: GroupLayerNode) -> bool:
+        return item in self._indexed_parent
+
+    def _add(self, item: GroupLayerNode) -> None:
+        """Add a single item (not its children) to the index."""
+        self._indexed_parent[item] = item.parent
+        self._dirty.add(item)
+        if not item.is_group() and item.is_tracking:
+            layer = item.layer
+            if layer not in self._extent_callbacks:
+                callback = partial(self._on_layer_extent, layer)
+                for name in EXTENT_EVENTS:
+                    getattr(layer.events, name).connect(callback)
+                self._extent_callbacks[layer] = callback
+            self._nodes_tracking[layer].add(item)
+
+    def _discard(self, item: GroupLayerNode) -> None:
+        """Remove a single item (not its children) from the index."""
+        if item not in self._indexed_parent:
+            return
+        self._unplace(item)
+        self._dirty.discard(item)
+        del self._indexed_parent[item]
+        if not item.is_group() and item.is_tracking:
+            layer = item.layer
+            self._nodes_tracking[layer].discard(item)
+            if not self._nodes_tracking[layer]:
+                del self._nodes_tracking[layer]
+                callback = self._extent_callbacks.pop(layer)
+                for name in EXTENT_EVENTS:
+                    getattr(layer.events, name).disconnect(callback)
+
+    def _mark_from(self, item: Optional[GroupLayerNode]) -> None:
+        """Mark ``item``, and the GroupLayers above it, as out of date."""
+        while item is not None and item is not self.root:
+            self._dirty.add(item)
+            item = self._indexed_parent.get(item)
+
+    def _on_inserted(self, event: Event) -> None:
+        for item in event.value.traverse():
+            self._add(item)
+        self._mark_from(event.value.parent)
+
+    def _on_removed(self, event: Event) -> None:
+        parent = self._indexed_parent.get(event.value)
+        for item in event.value.traverse():
+            self._discard(item)
+        self._mark_from(parent)
+
+    def _on_moved(self, event: Event) -> None:
+        # Moving an item keeps its extent, but changes the extents of the
+        # GroupLayers it was moved out of and into.
+        item = event.value
+        if item not in self._indexed_parent:
+            return
+        self._mark_from(self._indexed_parent[item])
+        self._indexed_parent[item] = item.parent
+        self._mark_from(item.parent)
+
+    def _on_layer_extent(self, layer: Layer, event: Event) -> None:
+        for item in self._nodes_tracking.get(layer, ()):
+            self._mark_from(item)
+
+    @staticmethod
+    def _box(item: GroupLayerNode) -> Optional[np.ndarray]:
+        """The box to index ``item`` by, if it has (at least 2D) extent."""
+        extent = item.extent
+        if extent is None or extent.shape[1] < 2:
+            return None
+        if item.is_group():
+            return extent
+        half_step = np.asarray(item.layer.extent.step) / 2
+        return extent + np.stack([-half_step, half_step])
+
+    def _cell_of(self, point: np.ndarray) -> Cell:
+        return tuple(np.floor(point[-2:] / self.cell_size).astype(int))
+
+    def _place(self, item: GroupLayerNode, box: np.ndarray) -> None:
+        self._boxes[item] = box
+        low, high = self._cell_of(box[0]), self._cell_of(box[1])
+        n_cells = (high[0] - low[0] + 1) * (high[1] - low[1] + 1)
+        if n_cells > SPATIAL_INDEX_MAX_CELLS:
+            self._large.add(item)
+            return
+        cells = [
+            (row, column)
+            for row in range(low[0], high[0] + 1)
+            for column in range(low[1], high[1] + 1)
+        ]
+        for cell in cells:
+            self._cells[cell].add(item)
+        self._cells_of[item] = cells
+
+    def _unplace(self, item: GroupLayerNode) -> None:
+        self._boxes.pop(item, None)
+        self._large.discard(item)
+        for cell in self._cells_of.pop(item, ()):
+            self._cells[cell].discard(item)
+            if not self._cells[cell]:
+                del self._cells[cell]
+
+    @staticmethod
+    def _default_cell_size(boxes: List[np.ndarray]) -> Optional[float]:
+        """Median size of the (Layer) boxes, along the last two axes."""
+        sizes = [np.max(box[1, -2:] - box[0, -2:]) for box in boxes]
+        sizes = [size for size in sizes if size > 0]
+        return float(np.median(sizes)) if sizes else None
+
+    def _update(self) -> None:
+        """Re-index the items that are out of date."""
+        if not self._dirty:
+            return
+        boxes = {item: self._box(item) for item in self._dirty}
+        self._dirty.clear()
+        if self.cell_size is None:
+            self.cell_size = self._default_cell_size(
+                [
+                    box
+                    for item, box in boxes.items()
+                    if box is not None and not item.is_group()
+                ]
+            )
+            if self.cell_size is None:
+                # Nothing with a size to go by (yet), so index everything
+                # again once there is
+                self._dirty.update(boxes)
+                return
+        for item, box in boxes.items():
+            self._unplace(item)
+            if box is not None:
+                self._place(item, box)
+
+    def items_at(self, position: Sequence[float]) -> List[GroupLayerNode]:
+        """
+        All the items in the tree (at any depth) whose box contains the
+        world ``position``. Positions and boxes with different numbers of
+        dimensions are aligned to their last dimensions.
+        """
+        self._update()
+        if self.cell_size is None:
+            return []
+        point = np.asarray(position, dtype=float)
+        candidates = self._cells.get(self._cell_of(point), set()) | self._large
+        return [
+            item
+            for item in candidates
+            if _box_contains(self._boxes[item], point)
+        ]
+
+    def _is_shown(self, item: GroupLayerNode) -> bool:
+        """Whether ``item``, and every GroupLayer above it, is visible."""
+        while item is not None and item is not self.root:
+            visible = item.visible if item.is_group() else item.layer.visible
+            if not visible:
+                return False
+            item = self._indexed_parent.get(item)
+        return True
+
+    def _depth(self, item: GroupLayerNode) -> int:
+        depth = 0
+        while item is not None and item is not self.root:
+            depth += 1
+            item = self._indexed_parent.get(item)
+        return depth
+
+    def item_at(
+        self, position: Sequence[float], visible: bool = True
+    ) -> Optional[GroupLayerNode]:
+        """
+        The deepest item in the tree whose box contains the world
+        ``position``, or None if there is none. Amongst items at the same
+        depth, the one drawn on top (first in the tree) is returned.
+
+        Parameters
+        ----------
+        position : Sequence[float]
+            World position, e.g. ``viewer.cursor.position``.
+        visible : bool, default = True
+            Only consider items that are visible, and in visible groups.
+        """
+        matches = self.items_at(position)
+        if visible:
+            matches = [item for item in matches if self._is_shown(item)]
+        if not matches:
+            return None
+        depths = [self._depth(item) for item in matches]
+        deepest = max(depths)
+        return min(
+            (
+                item
+                for item, depth in zip(matches, depths)  # noqa: B905
+                if depth == deepest
+            ),
+            key=lambda item: item.index_from_root(),
+        )
+
+
+def _box_contains(box: np.ndarray, point: np.ndarray) -> bool:
+    ndim = min(box.shape[1], point.shape[0])
+    return bool(
+        np.all(box[0, -ndim:] <= point[-ndim:])
+        and np.all(point[-ndim:] <= box[1, -ndim:])
+    )
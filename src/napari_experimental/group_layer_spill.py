@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import contextlib
+import os
+import shutil
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+from weakref import WeakKeyDictionary
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from napari.layers import Layer
+    from napari.utils.events import Event
+
+    from napari_experimental.group_layer import GroupLayer
+
+# Types of Layer whose data is spilled. These hold a single array, which is
+# typically large; the data of other Layers is small, or not an array.
+SPILLED_LAYER_TYPES = ("image", "labels")
+
+
+class SpillPolicy(NamedTuple):
+    """
+    When the data of the (hidden) Layers in a GroupLayer should be spilled
+    to disk. Policies are opt-in, by setting ``GroupLayer.spill_policy``.
+
+    Parameters
+    ----------
+    hidden_for : float, optional
+        Spill once the GroupLayer has been hidden for this many seconds.
+    memory_limit : int, optional
+        Spill (whilst the GroupLayer is hidden) once the data of all the
+        Layers in the tree takes up more than this many bytes of memory.
+    directory : str | Path, optional
+        Scratch directory to write the spill files to. By default, a
+        temporary directory is created.
+    """
+
+    hidden_for: Optional[float] = 60.0
+    memory_limit: Optional[int] = None
+    directory: Optional[str | Path] = None
+
+
+def _in_memory_array(layer: Layer) -> Optional[np.ndarray]:
+    """The data of ``layer``, if it is a (non-mapped) array in memory."""
+    data = layer.data
+    return data if type(data) is np.ndarray else None
+
+
+class GroupLayerSpiller:
+    """
+    Spills the data of hidden Layers in GroupLayers with a ``spill_policy``
+    to memory-mapped files, and restores it when the Layers are shown.
+
+    Spilled Layers have their (in-memory) array replaced by an ``np.memmap``
+    of a file in a scratch directory, so the operating system can page the
+    data out of RAM. As soon as a spilled Layer is made visible (typically,
+    by showing its GroupLayer) its data is read back into memory, and the
+    file deleted. Only Image and Labels Layers are spilled.
+
+    ``check`` applies the policies, and should be called periodically (the
+    widget does so on a timer, whilst ``has_policies``).
+
+    Parameters
+    ----------
+    root : GroupLayer
+        Tree whose GroupLayers' policies to apply.
+    clock : Callable[[], float], default = time.monotonic
+        Source of the current time, in seconds.
+    """
+
+    def __init__(
+        self,
+        root: GroupLayer,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.root = root
+        self._clock = clock
+        self._scratch_directory: Optional[Path] = None
+        # GroupLayer -> time it was (first seen to be) hidden
+        self._hidden_since: WeakKeyDictionary[GroupLayer, float] = (
+            WeakKeyDictionary()
+        )
+        # Spilled Layer -> (spill file, bytes spilled, visibility callback)
+        self._spilled: Dict[Layer, Tuple[Path, int, Callable]] = {}
+
+        root.events.visible.connect(self._on_visible)
+
+    @property
+    def bytes_reclaimed(self) -> int:
+        """Number of bytes of Layer data that are currently spilled."""
+        return sum(nbytes for _, nbytes, _ in self._spilled.values())
+
+    @property
+    def has_policies(self) -> bool:
+        """Whether any GroupLayer in the tree has a ``spill_policy``."""
+        return any(
+            group.spill_policy is not None
+            for group, _, _ in self.root.iter_groups()
+        )
+
+    @property
+    def spilled_layers(self) -> List[Layer]:
+        """The Layers whose data is currently spilled."""
+        return list(self._spilled)
+
+    def _on_visible(self, event: Event) -> None:
+        group = event.value
+        if group.visible:
+            self._hidden_since.pop(group, None)
+        else:
+            self._hidden_since[group] = self._clock()
+
+    def _directory(self, policy: SpillPolicy) -> Path:
+        if policy.directory is not None:
+            directory = Path(policy.directory)
+            directory.mkdir(parents=True, exist_ok=True)
+            return directory
+        if self._scratch_directory is None:
+            self._scratch_directory = Path(
+                tempfile.mkdtemp(prefix="napari-group-spill-")
+            )
+        return self._scratch_directory
+
+    def in_memory_bytes(self) -> int:
+        """
+        Number of bytes taken up by the (in-memory) data of the Layers in
+        the tree that can be spilled.
+        """
+        seen = set()
+        total = 0
+        for node, _, _ in self.root.iter_layers(
+            layer_type=SPILLED_LAYER_TYPES
+        ):
+            if node.layer in seen:
+                continue
+            seen.add(node.layer)
+            data = _in_memory_array(node.layer)
+            if data is not None:
+                total += data.nbytes
+        return total
+
+    def _spill_layer(self, layer: Layer, directory: Path) -> int:
+        """Spill the data of ``layer``, returning the bytes reclaimed."""
+        data = _in_memory_array(layer)
+        if layer in self._spilled or data is None or data.nbytes == 0:
+            return 0
+        fd, filename = tempfile.mkstemp(
+            prefix="layer-", suffix=".dat", dir=directory
+        )
+        os.close(fd)
+        mapped = np.memmap(
+            filename, dtype=data.dtype, mode="w+", shape=data.shape
+        )
+        mapped[...] = data
+        mapped.flush()
+        layer.data = mapped
+
+        callback = partial(self._on_layer_visible, layer)
+        layer.events.visible.connect(callback)
+        self._spilled[layer] = (Path(filename), data.nbytes, callback)
+        return data.nbytes
+
+    def _on_layer_visible(self, layer: Layer, event: Event) -> None:
+        if layer.visible:
+            self.restore(layer)
+
+    def spill(self, group: GroupLayer, policy: SpillPolicy) -> int:
+        """
+        Spill the data of the hidden Layers in ``group`` (and its
+        sub-groups) to disk, and return the number of bytes reclaimed.
+        """
+        directory = self._directory(policy)
+        return sum(
+            self._spill_layer(node.layer, directory)
+            for node, _, _ in group.iter_layers(
+                layer_type=SPILLED_LAYER_TYPES, visible=False
+            )
+        )
+
+    def restore(self, layer: Layer) -> None:
+        """
+        Read the spilled data of ``layer`` back into memory, and delete its
+        spill file. Does nothing if ``layer`` is not spilled.
+        """
+        if layer not in self._spilled:
+            return
+        path, _, callback = self._spilled.pop(layer)
+        layer.events.visible.disconnect(callback)
+        mapped = layer.data
+        # The data may have been replaced since it was spilled
+        if isinstance(mapped, np.memmap) and Path(mapped.filename) == path:
+            layer.data = np.array(mapped)
+        del mapped
+        with contextlib.suppress(OSError):
+            path.unlink()
+
+    def restore_all(self) -> None:
+        """Restore the data of all spilled Layers."""
+        for layer in list(self._spilled):
+            self.restore(layer)
+
+    def check(self, now: Optional[float] = None) -> int:
+        """
+        Spill the GroupLayers whose policies say they are due, and return
+        the number of bytes reclaimed.
+
+        GroupLayers that have been hidden the longest are spilled first.
+        Memory limits are checked against the data still in memory after
+        spilling each GroupLayer, so only as many GroupLayers are spilled
+        as is needed to get below them.
+
+        Parameters
+        ----------
+        now : float, optional
+            The current time, by default given by the ``clock``.
+        """
+        now = self._clock() if now is None else now
+        candidates = []
+        for group, _, _ in self.root.iter_groups():
+            policy = group.spill_policy
+            if policy is None:
+                continue
+            if group.visible:
+                self._hidden_since.pop(group, None)
+                continue
+            hidden_since = self._hidden_since.setdefault(group, now)
+            candidates.append((hidden_since, group, policy))
+        candidates.sort(key=lambda candidate: candidate[0])
+
+        reclaimed = 0
+        in_memory = None
+        for hidden_since, group, policy in candidates:
+            due = (
+                policy.hidden_for is not None
+                and now - hidden_since >= policy.hidden_for
+            )
+            if not due and policy.memory_limit is not None:
+                if in_memory is None:
+                    in_memory = self.in_memory_bytes()
+                due = in_memory > policy.memory_limit
+            if due:
+                spilled = self.spill(group, policy)
+                reclaimed += spilled
+                if in_memory is not None:
+                    in_memory -= spilled
+        return reclaimed
+
+    def close(self) -> None:
+        """
+        Restore the data of all spilled Layers, and remove the scratch
+        directory (if one was created).
+        """
+        self.restore_all()
+        if self._scratch_directory is not None:
+            shutil.rmtree(self._scratch_directory, ignore_errors=True)
+            self._scratch_directory = None
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from functools import partial
+from queue import Empty, SimpleQueue
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+from weakref import WeakKeyDictionary
+
+import numpy as np
+
+from napari_experimental.group_layer_histogram import iter_blocks
+
+if TYPE_CHECKING:
+    from napari.layers import Layer
+
+    from napari_experimental.group_layer import GroupLayer
+
+# Number of workers computing statistics by default
+STATISTICS_WORKERS = 4
+# Events that mean the data of a Layer has changed
+_DATA_CHANGED_EVENTS = ("data", "paint", "labels_update", "set_data")
+
+
+class LayerStatistics(NamedTuple):
+    """
+    Summary statistics of the data of a Layer, or of several Layers.
+
+    Statistics that do not apply to a type of Layer are None, e.g. the
+    intensity statistics of a Points Layer.
+
+    Parameters
+    ----------
+    n_points : int, optional
+        Number of points, of Points Layers.
+    n_labels : int, optional
+        Number of distinct (non-background) labels, of Labels Layers.
+    n_values : int
+        Number of (finite) intensity values, of Image Layers.
+    mean, min, max : float, optional
+        Mean, minimum and maximum of the intensity values.
+    """
+
+    n_points: Optional[int] = None
+    n_labels: Optional[int] = None
+    n_values: int = 0
+    mean: Optional[float] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+
+def _sum_optional(values: Iterable[Optional[int]]) -> Optional[int]:
+    present = [value for value in values if value is not None]
+    return sum(present) if present else None
+
+
+def combine_statistics(statistics: List[LayerStatistics]) -> LayerStatistics:
+    """
+    Aggregate the statistics of several Layers: counts are summed, means
+    are weighted by the number of values, and extremes are combined.
+    Labels are counted per Layer, so the same label in two Layers counts
+    twice.
+    """
+    n_values = sum(item.n_values for item in statistics)
+    with_values = [item for item in statistics if item.n_values]
+    return LayerStatistics(
+        n_points=_sum_optional(item.n_points for item in statistics),
+        n_labels=_sum_optional(item.n_labels for item in statistics),
+        n_values=n_values,
+        mean=(
+            sum(item.mean * item.n_values for item in with_values) / n_values
+            if n_values
+            else None
+        ),
+        min=min((item.min for item in with_values), default=None),
+        max=max((item.max for item in with_values), default=None),
+    )
+
+
+def _full_resolution(data: Any, multiscale: bool) -> Any:
+    return data[0] if multiscale else data
+
+
+def compute_statistics(
+    layer_type: str, data: Any, multiscale: bool = False
+) -> LayerStatistics:
+    """
+    Compute the statistics of the ``data`` of a Layer of ``layer_type``
+    (e.g. ``"image"``), reading arrays a block at a time so that data larger
+    than memory can be summarised. This is a module-level function, so that
+    it can be run in a process pool.
+    """
+    if layer_type == "points":
+        return LayerStatistics(n_points=len(data))
+
+    if layer_type == "labels":
+        labels = np.empty(0, dtype=np.int64)
+        for block in iter_blocks(_full_resolution(data, multiscale)):
+            labels = np.union1d(labels, np.unique(block))
+        return LayerStatistics(n_labels=int(np.count_nonzero(labels)))
+
+    if layer_type == "image":
+        n_values, total = 0, 0.0
+        low, high = np.inf, -np.inf
+        for block in iter_blocks(_full_resolution(data, multiscale)):
+            if block.dtype.kind == "f":
+                block = block[np.isfinite(block)]
+            if block.size == 0:
+                continue
+            n_values += block.size
+            total += float(block.sum(dtype=np.float64))
+            low = min(low, float(block.min()))
+            high = max(high, float(block.max()))
+        if n_values == 0:
+            return LayerStatistics()
+        return LayerStatistics(
+            n_values=n_values, mean=total / n_values, min=low, max=high
+        )
+
+    return LayerStatistics()
+
+
+class GroupLayerStatistics:
+    """
+    Computes the statistics (see ``LayerStatistics``) of the Layers in a
+    tree of GroupLayers in the background, and caches them.
+
+    ``request`` submits the Layers of a GroupLayer whose statistics are not
+    cached to an executor, one task per Layer. As each task completes, its
+    statistics are cached, and queued to be picked up by ``collect`` (on
+    the main thread), so that a display can fill in progressively.
+    Outstanding tasks can be cancelled with ``cancel``.
+
+    The statistics of each Layer are cached against a version number of
+    its data, which is bumped whenever the Layer emits a ``data`` (or, for
+    Labels, ``paint``) event, so only Layers whose data has changed are
+    computed again. Extents are cached by the tree itself, see
+    ``GroupLayer.extent``.
+
+    Parameters
+    ----------
+    root : GroupLayer
+        Tree whose Layers to compute the statistics of.
+    executor : concurrent.futures.Executor, optional
+        Executor to compute the statistics in. By default, a pool of
+        ``STATISTICS_WORKERS`` threads is used (NumPy releases the GIL
+        whilst reducing arrays, and threads avoid copying the data of the
+        Layers to other processes). A ``ProcessPoolExecutor`` can be given
+        instead, provided the data of the Layers can be pickled.
+    """
+
+    def __init__(
+        self, root: GroupLayer, executor: Optional[Executor] = None
+    ) -> None:
+        self.root = root
+        self._executor = executor
+        self._owns_executor = executor is None
+
+        self._lock = threading.Lock()
+        self._versions: WeakKeyDictionary[Layer, int] = WeakKeyDictionary()
+        # Layer -> (version of its data, statistics)
+        self._cache: WeakKeyDictionary[Layer, Tuple[int, LayerStatistics]] = (
+            WeakKeyDictionary()
+        )
+        self._pending: Dict[Layer, Future] = {}
+        self._completed: SimpleQueue[Tuple[Layer, LayerStatistics]] = (
+            SimpleQueue()
+        )
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=STATISTICS_WORKERS,
+                thread_name_prefix="GroupLayerStatistics",
+            )
+        return self._executor
+
+    @property
+    def n_pending(self) -> int:
+        """Number of Layers whose statistics are being computed."""
+        with self._lock:
+            return len(self._pending)
+
+    def _version(self, layer: Layer) -> int:
+        if layer not in self._versions:
+            self._versions[layer] = 0
+            for name in _DATA_CHANGED_EVENTS:
+                if hasattr(layer.events, name):
+                    getattr(layer.events, name).connect(
+                        partial(self._bump_version, layer)
+                    )
+        return self._versions[layer]
+
+    def _bump_version(self, layer: Layer, event: Any = None) -> None:
+        self._versions[layer] = self._versions.get(layer, 0) + 1
+
+    def statistics(self, layer: Layer) -> Optional[LayerStatistics]:
+        """
+        The cached statistics of ``layer``, or None if they have not been
+        computed for the current version of its data.
+        """
+        with self._lock:
+            cached = self._cache.get(layer)
+        if cached is None or cached[0] != self._version(layer):
+            return None
+        return cached[1]
+
+    def aggregate(self, group: GroupLayer) -> LayerStatistics:
+        """
+        The combined statistics (see ``combine_statistics``) of the Layers
+        in ``group`` (at any depth) whose statistics are cached.
+        """
+        statistics = [
+            self.statistics(node.layer)
+            for node, _, _ in group.iter_layers()
+            if node.is_tracking
+        ]
+        return combine_statistics(
+            [item for item in statistics if item is not None]
+        )
+
+    def request(self, group: GroupLayer) -> int:
+        """
+        Compute the statistics of the Layers in ``group`` (at any depth)
+        that are neither cached nor already being computed, in the
+        background. Returns the number of Layers submitted.
+        """
+        n_submitted = 0
+        for node, _, _ in group.iter_layers():
+            if not node.is_tracking:
+                continue
+            layer = node.layer
+            with self._lock:
+                if layer in self._pending:
+                    continue
+            if self.statistics(layer) is not None:
+                continue
+            version = self._version(layer)
+            future = self.executor.submit(
+                compute_statistics,
+                layer._type_string,
+                layer.data,
+                getattr(layer, "multiscale", False),
+            )
+            with self._lock:
+                self._pending[layer] = future
+            future.add_done_callback(partial(self._on_done, layer, version))
+            n_submitted += 1
+        return n_submitted
+
+    def _on_done(self, layer: Layer, version: int, future: Future) -> None:
+        with self._lock:
+            if self._pending.get(layer) is future:
+                del self._pending[layer]
+        if future.cancelled() or future.exception() is not None:
+            return
+        statistics = future.result()
+        with self._lock:
+            self._cache[layer] = (version, statistics)
+        self._completed.put((layer, statistics))
+
+    def collect(self) -> List[Tuple[Layer, LayerStatistics]]:
+        """
+        Return the ``(layer, statistics)`` that have been computed since the
+        last call. Call this on the main thread.
+        """
+        completed = []
+        while True:
+            try:
+                completed.append(self._completed.get_nowait())
+            except Empty:
+                return completed
+
+    def cancel(self) -> None:
+        """Cancel the computations that have not started yet."""
+        with self._lock:
+            pending = list(self._pending.values())
+        for future in pending:
+            future.cancel()
+
+    def shutdown(self) -> None:
+        """Cancel all the computations, and stop the workers."""
+        self.cancel()
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from qtpy.QtCore import QTimer
+from qtpy.QtWidgets import (
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QTreeWidget,
+    QTreeWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from napari_experimental.group_layer import GroupLayer
+from napari_experimental.group_layer_statistics import (
+    GroupLayerStatistics,
+    LayerStatistics,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from napari_experimental.group_layer_node import GroupLayerNode
+
+# Interval (ms) at which statistics computed in the background are shown.
+STATISTICS_POLL_INTERVAL = 100
+STATISTICS_COLUMNS = (
+    "Name",
+    "Type",
+    "Points",
+    "Labels",
+    "Mean",
+    "Min",
+    "Max",
+    "Extent",
+)
+
+
+def _format_value(value: Optional[float]) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, int):
+        return str(value)
+    return f"{value:.4g}"
+
+
+def _format_extent(extent: Optional[np.ndarray]) -> str:
+    if extent is None:
+        return ""
+    return " × ".join(f"{low:.4g}–{high:.4g}" for low, high in extent.T)
+
+
+class QtGroupStatisticsPanel(QWidget):
+    """
+    Table of the statistics (see ``LayerStatistics``) of each Layer in a
+    tree of GroupLayers, and of each GroupLayer as a whole.
+
+    Rows mirror the tree, with each GroupLayer showing the combined
+    statistics of the Layers inside it. ``refresh`` requests the statistics
+    of any Layers that are out of date, which are computed in the
+    background and filled in as they complete. ``cancel`` stops the
+    computations that have not started yet.
+
+    Parameters
+    ----------
+    root : GroupLayer
+        Tree whose statistics to show.
+    statistics : GroupLayerStatistics, optional
+        Computes and caches the statistics. By default, one is created for
+        ``root``.
+    parent : QWidget, optional
+        Parent widget.
+    """
+
+    def __init__(
+        self,
+        root: GroupLayer,
+        statistics: Optional[GroupLayerStatistics] = None,
+        parent: Optional[QWidget] = None,
+    ) -> None:
+        super().__init__(parent)
+        self.root = root
+        if statistics is None:
+            statistics = GroupLayerStatistics(root)
+        self.statistics = statistics
+        # Rows of the Layers (by the id of the Layer), and of the
+        # GroupLayers, as of the last refresh
+        self._layer_rows: Dict[int, QTreeWidgetItem] = {}
+        self._group_rows: List[Tuple[GroupLayer, QTreeWidgetItem]] = []
+
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(STATISTICS_POLL_INTERVAL)
+        self._poll_timer.timeout.connect(self._show_completed)
+
+        self.table = QTreeWidget()
+        self.table.setHeaderLabels(STATISTICS_COLUMNS)
+
+        self.refresh_button = QPushButton("Refresh")
+        self.refresh_button.clicked.connect(self.refresh)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel)
+        self.status = QLabel()
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.refresh_button)
+        buttons.addWidget(self.cancel_button)
+        buttons.addWidget(self.status)
+
+        self.setLayout(QVBoxLayout())
+        self.layout().addLayout(buttons)
+        self.layout().addWidget(self.table)
+
+    def _add_rows(self, group: GroupLayer, parent: QTreeWidgetItem) -> None:
+        for item in group:
+            row = QTreeWidgetItem(parent, [item.name])
+            if item.is_group():
+                row.setText(1, "group")
+                self._group_rows.append((item, row))
+                self._add_rows(item, row)
+            elif item.is_tracking:
+                row.setText(1, item.layer._type_string)
+                row.setText(7, _format_extent(item.extent))
+                self._layer_rows[id(item.layer)] = row
+                self._show(row, self.statistics.statistics(item.layer))
+
+    @staticmethod
+    def _show(
+        row: QTreeWidgetItem, statistics: Optional[LayerStatistics]
+    ) -> None:
+        if statistics is None:
+            return
+        for column, value in enumerate(
+            (
+                statistics.n_points,
+                statistics.n_labels,
+                statistics.mean,
+                statistics.min,
+                statistics.max,
+            ),
+            start=2,
+        ):
+            row.setText(column, _format_value(value))
+
+    def _show_groups(self) -> None:
+        for group, row in self._group_rows:
+            self._show(row, self.statistics.aggregate(group))
+
+    def _show_status(self) -> None:
+        n_pending = self.statistics.n_pending
+        self.status.setText(f"Computing {n_pending}…" if n_pending else "")
+        self.cancel_button.setEnabled(n_pending > 0)
+
+    def refresh(self) -> None:
+        """
+        Rebuild the table from the tree, and compute the statistics of the
+        Layers that are out of date in the background.
+        """
+        self.table.clear()
+        self._layer_rows.clear()
+        self._group_rows.clear()
+
+        root_row = QTreeWidgetItem(self.table, [self.root.name, "group"])
+        self._group_rows.append((self.root, root_row))
+        self._add_rows(self.root, root_row)
+        for group, row in self._group_rows:
+            row.setText(7, _format_extent(group.extent))
+        self._show_groups()
+        self.table.expandAll()
+
+        self.statistics.request(self.root)
+        self._show_completed()
+        if self.statistics.n_pending:
+            self._poll_timer.start()
+
+    def _show_completed(self) -> None:
+        """Fill in the statistics computed since the last call."""
+        completed = self.statistics.collect()
+        for layer, statistics in completed:
+            row = self._layer_rows.get(id(layer))
+            if row is not None:
+                self._show(row, statistics)
+        if completed:
+            self._show_groups()
+        self._show_status()
+        if not self.statistics.n_pending:
+            self._poll_timer.stop()
+
+    def cancel(self) -> None:
+        """Cancel the computations that have not started yet."""
+        self.statistics.cancel()
+        self._show_status()
+
+    def node_row(self, node: GroupLayerNode) -> Optional[QTreeWidgetItem]:
+        """The row of the Layer tracked by ``node``, if it is in the table."""
+        return self._layer_rows.get(id(node.layer))
+
+    def closeEvent(self, event) -> None:
+        self._poll_timer.stop()
+        self.statistics.shutdown()
+        super().closeEvent(event)
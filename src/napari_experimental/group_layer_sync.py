@@ -0,0 +1,411 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from napari_experimental.group_layer_node import GroupLayerNode
+
+if TYPE_CHECKING:
+    from napari.components import LayerList
+    from napari.layers import Layer
+    from napari.utils.events import Event
+    from napari.utils.events.containers import EventedList
+    from napari.utils.events.containers._nested_list import NestedIndex
+
+    from napari_experimental.group_layer import GroupLayer
+
+
+def _position_in(
+    container: EventedList, item: object, hint: Optional[int] = None
+) -> int:
+    """
+    Return the position of ``item`` in ``container`` (a LayerList or a
+    GroupLayer), which is assumed to hold it.
+
+    ``hint`` (a previously known position) is checked first, in O(1).
+    Otherwise the underlying list is searched by identity, which avoids the
+    Python-level loop (and name lookups) of ``EventedList.index``.
+    """
+    items = container._list
+    if hint is not None and 0 <= hint < len(items) and items[hint] is item:
+        return hint
+    return items.index(item)
+
+
+class GroupLayerReconciler:
+    """
+    Keeps a GroupLayer tree consistent with the LayerList of a viewer.
+
+    Rather than reacting to each event as it is emitted, changes on either
+    side are queued and collapsed, and then applied as a single diff when
+    ``reconcile`` is called (typically, once per tick of the event loop).
+    Bulk operations such as ``LayerList.clear``, or a reader adding
+    hundreds of layers, thus cost one pass over the tree rather than one
+    pass per layer.
+
+    - Layers inserted into the LayerList are added to the tree, in a
+      position consistent with the (reversed) LayerList order.
+    - Layers removed from the LayerList have their Nodes removed from the
+      tree, along with any GroupLayers this leaves empty.
+    - Layers whose Nodes are removed from the tree are removed from the
+      LayerList, unless they are still tracked elsewhere in the tree.
+    - When items are moved in the tree, the LayerList is reordered to match.
+
+    Parameters
+    ----------
+    layers : LayerList
+        The LayerList of the viewer.
+    group_layers : GroupLayer
+        The tree to keep consistent with ``layers``.
+    schedule : Callable[[], None], optional
+        Called whenever changes are queued, and should arrange for
+        ``reconcile`` to be called later. Calling it several times before
+        ``reconcile`` runs should only result in one call to ``reconcile``.
+    """
+
+    def __init__(
+        self,
+        layers: LayerList,
+        group_layers: GroupLayer,
+        schedule: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.layers = layers
+        self.group_layers = group_layers
+        self._schedule = schedule
+
+        # Set whilst changes are being applied, so that the events this
+        # emits are not queued as further changes.
+        self._applying = False
+        # Layers to add to the tree, in the order they were queued, with
+        # their position in the LayerList when they were queued (if known)
+        self._to_insert: Dict[Layer, Optional[int]] = {}
+        # Layer -> Nodes tracking it, kept up to date as the tree changes
+        self._nodes: Dict[Layer, List[GroupLayerNode]] = defaultdict(list)
+        for node, _, _ in group_layers.iter_layers():
+            self._track(node)
+        self._removed_from_layers: Set[Layer] = set()
+        self._removed_from_tree: Set[Layer] = set()
+        self._tree_moved = False
+
+        layers.events.inserted.connect(self._on_layers_inserted)
+        layers.events.removed.connect(self._on_layers_removed)
+        group_layers.events.inserted.connect(self._on_tree_inserted)
+        group_layers.events.removed.connect(self._on_tree_removed)
+        group_layers.events.moved.connect(self._on_tree_moved)
+
+    @property
+    def has_pending_changes(self) -> bool:
+        """True if there are changes waiting to be reconciled."""
+        return bool(
+            self._to_insert
+            or self._removed_from_layers
+            or self._removed_from_tree
+            or self._tree_moved
+        )
+
+    @property
+    def n_pending_insertions(self) -> int:
+        """Number of layers waiting to be added to the tree."""
+        return len(self._to_insert)
+
+    def _changed(self) -> None:
+        if self._schedule is not None and not self._applying:
+            self._schedule()
+
+    def _track(self, node: GroupLayerNode) -> None:
+        if not node.is_group() and node.is_tracking:
+            self._nodes[node.layer].append(node)
+
+    def _untrack(self, node: GroupLayerNode) -> None:
+        if node.is_group() or not node.is_tracking:
+            return
+        nodes = self._nodes.get(node.layer, [])
+        if node in nodes:
+            nodes.remove(node)
+        if not nodes:
+            self._nodes.pop(node.layer, None)
+
+    def _on_layers_inserted(self, event: Event) -> None:
+        if self._applying:
+            return
+        self._to_insert[event.value] = event.index
+        self._changed()
+
+    def _on_layers_removed(self, event: Event) -> None:
+        if self._applying:
+            return
+        self._removed_from_layers.add(event.value)
+        self._changed()
+
+    def _on_tree_inserted(self, event: Event) -> None:
+        for item in event.value.traverse():
+            self._track(item)
+
+    def _on_tree_removed(self, event: Event) -> None:
+        removed = [
+            item.layer
+            for item in event.value.traverse()
+            if not item.is_group() and item.is_tracking
+        ]
+        for item in event.value.traverse():
+            self._untrack(item)
+        if self._applying:
+            return
+        self._removed_from_tree.update(removed)
+        self._changed()
+
+    def _on_tree_moved(self, event: Event) -> None:
+        if self._applying:
+            return
+        self._tree_moved = True
+        self._changed()
+
+    def _remove_from_tree(self, layers: Set[Layer]) -> None:
+        """
+        Remove the Nodes tracking any of ``layers`` from the tree, then
+        prune the GroupLayers that are left empty.
+        """
+        to_remove: Dict[GroupLayer, Set[int]] = defaultdict(set)
+        for layer in layers:
+            for node in self._nodes.get(layer, ()):
+                to_remove[node.parent].add(id(node))
+
+        for group, node_ids in to_remove.items():
+            # One pass over each GroupLayer finds all of its Nodes to remove,
+            # which are then deleted from the back to keep indices valid.
+            indices = [
+                i for i, item in enumerate(group._list) if id(item) in node_ids
+            ]
+            for index in reversed(indices):
+                del group[index]
+        # Pruning is left until all the Nodes are removed, since it changes
+        # the indices of items in the parents of the pruned GroupLayers.
+        for group in to_remove:
+            while (
+                len(group) == 0
+                and group is not self.group_layers
+                and group.parent is not None
+            ):
+                parent = group.parent
+                parent.remove(group)
+                group = parent
+
+    def _remove_from_layers(self, layers: Set[Layer]) -> None:
+        """
+        Remove ``layers`` from the LayerList, unless they are still
+        tracked elsewhere in the tree.
+        """
+        indices = []
+        for layer in layers:
+            if layer in self._nodes:
+                continue
+            try:
+                indices.append(_position_in(self.layers, layer))
+            except ValueError:
+                continue
+        for index in sorted(indices, reverse=True):
+            del self.layers[index]
+
+    def _insertion_point(
+        self, position: int, hints: Dict[GroupLayerNode, int]
+    ) -> Tuple[GroupLayer, int]:
+        """
+        Return the GroupLayer, and the index within it, at which to insert
+        the layer at ``position`` in the LayerList.
+
+        The LayerList is searched outwards from ``position`` for the
+        nearest layer that is already in the tree. The new layer is placed
+        above that layer's Node if it lies below ``position`` in the
+        LayerList, or beneath it if it lies above. Since consecutive layers
+        tend to be added together, the search usually stops at one of the
+        adjacent positions, and ``hints`` (the known positions of recently
+        inserted Nodes) then locates the Node in its GroupLayer in O(1).
+        """
+        items = self.layers._list
+        below, above = position - 1, position + 1
+        while below >= 0 or above < len(items):
+            if below >= 0:
+                nodes = self._nodes.get(items[below])
+                if nodes:
+                    node = nodes[0]
+                    group = node.parent
+                    return group, _position_in(group, node, hints.get(node))
+                below -= 1
+            if above < len(items):
+                nodes = self._nodes.get(items[above])
+                if nodes:
+                    node = nodes[0]
+                    group = node.parent
+                    return (
+                        group,
+                        _position_in(group, node, hints.get(node)) + 1,
+                    )
+                above += 1
+        return self.group_layers, len(self.group_layers)
+
+    def _insert_into_tree(self, max_insertions: Optional[int]) -> int:
+        """
+        Add (up to ``max_insertions`` of) the queued layers to the tree, in
+        the order they were queued, and return the number of layers added.
+
+        Each layer is placed next to its nearest neighbour in the LayerList
+        that is already in the tree (see ``_insertion_point``), so the tree
+        order matches the (reversed) LayerList order whichever order the
+        layers are added in. In the common case that the queued layers are
+        adjacent in the LayerList, each insertion takes constant time
+        (besides the insertion into the GroupLayer itself).
+        """
+        hints: Dict[GroupLayerNode, int] = {}
+        n_inserted = 0
+        while self._to_insert and (
+            max_insertions is None or n_inserted < max_insertions
+        ):
+            layer, hint = next(iter(self._to_insert.items()))
+            del self._to_insert[layer]
+            if layer in self._nodes:
+                continue
+            try:
+                position = _position_in(self.layers, layer, hint)
+            except ValueError:
+                # No longer in the LayerList
+                continue
+
+            group, index = self._insertion_point(position, hints)
+            node = GroupLayerNode(layer_ptr=layer)
+            group.insert(index, node)
+            hints[node] = index
+            n_inserted += 1
+        return n_inserted
+
+    def _impose_tree_order(self) -> None:
+        """
+        Reorder the LayerList to match the order of the Layers in the tree.
+        Layers that are not (yet) in the tree are kept at the bottom.
+        """
+        listed = set(self.layers)
+        in_tree: Dict[Layer, None] = {}
+        for node, _, _ in self.group_layers.iter_layers():
+            if node.layer in listed:
+                in_tree[node.layer] = None
+        desired = [layer for layer in self.layers if layer not in in_tree]
+        desired.extend(reversed(list(in_tree)))
+
+        current = list(self.layers)
+        if desired == current:
+            return
+        # Move each Layer into place in turn from the front, rather than
+        # passing the whole permutation to move_multiple, which does not
+        # handle arbitrary permutations correctly
+        for index, layer in enumerate(desired):
+            source = current.index(layer, index)
+            if source != index:
+                current.insert(index, current.pop(source))
+                self.layers.move(source, index)
+
+    def graft(
+        self,
+        subtree: GroupLayer,
+        location: Optional[NestedIndex | int] = None,
+    ) -> None:
+        """
+        Insert a detached tree into the tree (see ``GroupLayer.graft``),
+        and add the Layers it contains to the LayerList (see ``adopt``).
+        """
+        self.group_layers.graft(subtree, location=location)
+        self.adopt(subtree)
+
+    def adopt(self, item: GroupLayerNode) -> None:
+        """
+        Add the Layers tracked by an item that has been inserted into the
+        tree (for example, a Node that replaced a placeholder, see
+        ``GroupLayerLoader``) to the LayerList, if they are not in it.
+
+        The Layers are added to the top of the LayerList, and moved to the
+        positions matching the tree at the next ``reconcile``.
+        """
+        listed = set(self.layers)
+        new_layers = {
+            node.layer: None
+            for node in item.traverse()
+            if not node.is_group()
+            and node.is_tracking
+            and node.layer not in listed
+        }
+        if not new_layers:
+            return
+        self._applying = True
+        try:
+            self.layers.extend(new_layers)
+        finally:
+            self._applying = False
+        self._tree_moved = True
+        self._changed()
+
+    def queue_insertions(self, layers: Iterable[Layer]) -> None:
+        """
+        Queue layers (which should already be in the LayerList) to be
+        added to the tree at the next ``reconcile``, in the order given.
+        """
+        for layer in layers:
+            self._to_insert[layer] = None
+        self._changed()
+
+    def reconcile(self, max_insertions: Optional[int] = None) -> int:
+        """
+        Apply the queued changes to the tree and the LayerList, and return
+        the number of layers added to the tree.
+
+        Parameters
+        ----------
+        max_insertions : int, optional
+            Only add this many of the queued layers to the tree, leaving the
+            remainder queued (and scheduling another ``reconcile``). This
+            limit is ignored if items have been moved in the tree, since
+            the LayerList can only be reordered once all of its layers are
+            in the tree.
+        """
+        if self._tree_moved:
+            max_insertions = None
+
+        removed_from_layers = self._removed_from_layers
+        removed_from_tree = self._removed_from_tree
+        tree_moved = self._tree_moved
+        self._removed_from_layers = set()
+        self._removed_from_tree = set()
+        self._tree_moved = False
+
+        self._applying = True
+        try:
+            if removed_from_layers:
+                listed = set(self.layers)
+                unlisted = {
+                    layer
+                    for layer in removed_from_layers
+                    if layer not in listed
+                }
+                if unlisted:
+                    self._remove_from_tree(unlisted)
+            if removed_from_tree:
+                self._remove_from_layers(removed_from_tree)
+            n_inserted = (
+                self._insert_into_tree(max_insertions)
+                if self._to_insert
+                else 0
+            )
+            if tree_moved:
+                self._impose_tree_order()
+        finally:
+            self._applying = False
+
+        if self._to_insert:
+            self._changed()
+        return n_inserted
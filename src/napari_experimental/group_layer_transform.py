@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+from functools import partial
+from typing import TYPE_CHECKING, Any, Iterable, Optional, Set, Tuple
+from weakref import WeakKeyDictionary
+
+import numpy as np
+
+from napari_experimental.group_layer_freeze import freeze_layer, thaw_layer
+
+if TYPE_CHECKING:
+    from napari.layers import Layer
+
+
+class _GroupTransformState:
+    """
+    The affine of a Layer excluding the transforms of the GroupLayers it
+    is in (its ``base``), and the composed affine of those GroupLayers that
+    is currently applied on top of it.
+    """
+
+    def __init__(self, base: np.ndarray) -> None:
+        self.base = base
+        self.applied: Optional[np.ndarray] = None
+        self.callback: Any = None
+
+
+_TRANSFORMED_LAYERS: WeakKeyDictionary[Layer, _GroupTransformState] = (
+    WeakKeyDictionary()
+)
+# Layers whose affine is being set by apply_group_transforms, so that the
+# change is not mistaken for an edit of the Layer's own affine
+_APPLYING: Set[int] = set()
+
+
+def as_affine_matrix(value: Any) -> Optional[np.ndarray]:
+    """
+    Convert ``value`` (None, a napari ``Affine``, or an ``(n + 1, n + 1)``
+    homogeneous matrix) to a matrix, or None.
+    """
+    if value is None:
+        return None
+    matrix = np.asarray(getattr(value, "affine_matrix", value), dtype=float)
+    if (
+        matrix.ndim != 2
+        or matrix.shape[0] != matrix.shape[1]
+        or matrix.shape[0] < 2
+    ):
+        raise ValueError(
+            "An affine must be an (n + 1, n + 1) matrix, "
+            f"not of shape {matrix.shape}"
+        )
+    return matrix
+
+
+def embed_affine(matrix: np.ndarray, ndim: int) -> np.ndarray:
+    """
+    The ``(ndim + 1, ndim + 1)`` affine acting on the last dimensions as
+    ``matrix`` does. Extra leading dimensions are left unchanged, and
+    missing ones are dropped.
+    """
+    size = matrix.shape[0] - 1
+    if size == ndim:
+        return matrix
+    if size > ndim:
+        return matrix[size - ndim :, size - ndim :]
+    embedded = np.eye(ndim + 1)
+    embedded[ndim - size :, ndim - size :] = matrix
+    return embedded
+
+
+def compose_affines(
+    outer: Optional[np.ndarray], inner: Optional[np.ndarray]
+) -> Optional[np.ndarray]:
+    """
+    The affine applying ``inner`` then ``outer`` (either of which may be
+    None, for the identity), aligned to their last dimensions.
+    """
+    if outer is None:
+        return inner
+    if inner is None:
+        return outer
+    ndim = max(outer.shape[0], inner.shape[0]) - 1
+    return embed_affine(outer, ndim) @ embed_affine(inner, ndim)
+
+
+def base_affine(layer: Layer) -> np.ndarray:
+    """
+    The affine of ``layer`` excluding the transforms of the GroupLayers it
+    is in, i.e. the affine it would have outside of any GroupLayer.
+    """
+    state = _TRANSFORMED_LAYERS.get(layer)
+    if state is None:
+        return np.asarray(layer.affine.affine_matrix)
+    return state.base
+
+
+def _on_layer_affine(layer: Layer, event: Any = None) -> None:
+    """
+    Keep the base affine of ``layer`` when its affine is edited directly,
+    so that the edit survives the transforms of its GroupLayers changing.
+    """
+    state = _TRANSFORMED_LAYERS.get(layer)
+    if state is None or id(layer) in _APPLYING:
+        return
+    affine = np.asarray(layer.affine.affine_matrix)
+    if state.applied is None:
+        state.base = affine
+    else:
+        applied = embed_affine(state.applied, layer.ndim)
+        state.base = np.linalg.solve(applied, affine)
+
+
+def _set_affine(layer: Layer, composed: Optional[np.ndarray]) -> None:
+    state = _TRANSFORMED_LAYERS.get(layer)
+    if state is None:
+        if composed is None:
+            return
+        state = _TRANSFORMED_LAYERS[layer] = _GroupTransformState(
+            np.asarray(layer.affine.affine_matrix)
+        )
+        state.callback = partial(_on_layer_affine, layer)
+        layer.events.affine.connect(state.callback)
+
+    if composed is None:
+        affine = state.base
+        layer.events.affine.disconnect(state.callback)
+        del _TRANSFORMED_LAYERS[layer]
+    else:
+        affine = embed_affine(composed, layer.ndim) @ state.base
+        state.applied = composed
+
+    _APPLYING.add(id(layer))
+    try:
+        layer.affine = affine
+    finally:
+        _APPLYING.discard(id(layer))
+
+
+def apply_group_transforms(
+    updates: Iterable[Tuple[Layer, Optional[np.ndarray]]],
+) -> None:
+    """
+    Set the affine of each Layer to its base affine (see ``base_affine``)
+    composed with the given affine of the GroupLayers it is in, or return
+    it to its base affine if that is None.
+
+    The Layers are frozen (see ``freeze_layer``) whilst their affines are
+    set, so each Layer is refreshed once, at the end, however many Layers
+    are updated.
+    """
+    updates = [
+        (layer, composed)
+        for layer, composed in updates
+        # Layers outside of any transformed GroupLayers stay as they are
+        if composed is not None or layer in _TRANSFORMED_LAYERS
+    ]
+    for layer, _ in updates:
+        freeze_layer(layer)
+    try:
+        for layer, composed in updates:
+            _set_affine(layer, composed)
+    finally:
+        for layer, _ in updates:
+            thaw_layer(layer)
@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Dict, Iterable, List, Tuple
 
 import pytest
@@ -326,3 +327,168 @@ def test_move_plan(
 
     # Run the move just to see if errors are then thrown up
     nested_layer_group.move_multiple(sources, destination)
+
+
+@pytest.mark.parametrize(
+    ["kwargs", "expected_names"],
+    [
+        pytest.param(
+            {},
+            ["0", "A0", "AA0", "AA1", "A1", "1", "B0"],
+            id="No filters",
+        ),
+        pytest.param({"max_depth": 1}, ["0", "1"], id="Top level only"),
+        pytest.param(
+            {"under": (1, 1)}, ["AA0", "AA1"], id="Under a sub-Group"
+        ),
+        pytest.param(
+            {"under": (1,), "max_depth": 2},
+            ["A0", "A1"],
+            id="Under a Group, limited depth",
+        ),
+        pytest.param({"layer_type": "image"}, [], id="Type string"),
+        pytest.param(
+            {"layer_type": Points, "under": 3}, ["B0"], id="Type class"
+        ),
+    ],
+)
+def test_iter_layers(
+    nested_layer_group: GroupLayer, kwargs: dict, expected_names: List[str]
+) -> None:
+    yielded = list(nested_layer_group.iter_layers(**kwargs))
+    assert [node.name for node, _, _ in yielded] == [
+        f"Points_{name}" for name in expected_names
+    ]
+    for node, nested_index, depth in yielded:
+        assert nested_layer_group[nested_index] is node
+        assert depth == len(nested_index)
+
+
+def test_iter_layers_visibility(nested_layer_group: GroupLayer) -> None:
+    nested_layer_group[1].visible = False
+    nested_layer_group[0].layer.visible = False
+    visible = [
+        node.name
+        for node, _, _ in nested_layer_group.iter_layers(visible=True)
+    ]
+    assert visible == ["Points_1", "Points_B0"]
+    hidden = [
+        node.name
+        for node, _, _ in nested_layer_group.iter_layers(visible=False)
+    ]
+    assert hidden == [
+        "Points_0",
+        "Points_A0",
+        "Points_AA0",
+        "Points_AA1",
+        "Points_A1",
+    ]
+
+    # Hidden groups are skipped entirely
+    assert [
+        index for _, index, _ in nested_layer_group.iter_groups(visible=True)
+    ] == [(3,)]
+
+
+def test_iter_groups(nested_layer_group: GroupLayer) -> None:
+    groups = list(nested_layer_group.iter_groups())
+    assert [(index, depth) for _, index, depth in groups] == [
+        ((1,), 1),
+        ((1, 1), 2),
+        ((3,), 1),
+    ]
+    group_a = nested_layer_group[1]
+    assert [
+        index for _, index, _ in nested_layer_group.iter_groups(under=group_a)
+    ] == [(1, 1)]
+
+    with pytest.raises(ValueError, match="is not a Group"):
+        next(nested_layer_group.iter_groups(under=(0,)))
+
+
+def test_find(nested_layer_group: GroupLayer) -> None:
+    group_a = nested_layer_group[1]
+    group_aa = nested_layer_group[1, 1]
+    group_a.name = "GroupA"
+    group_aa.name = "GroupAA"
+
+    assert nested_layer_group.find("GroupA/GroupAA/Points_AA1") is (
+        nested_layer_group[1, 1, 1]
+    )
+    assert nested_layer_group.find("/GroupA/") is group_a
+    assert group_a.find("GroupAA") is group_aa
+
+    # Renames and moves are reflected in the lookup
+    nested_layer_group[1, 1, 1].name = "cells"
+    assert nested_layer_group.find("GroupA/GroupAA/cells") is (
+        nested_layer_group[1, 1, 1]
+    )
+    nested_layer_group.move((1, 1, 1), (0,))
+    assert nested_layer_group.find("cells") is nested_layer_group[0]
+    with pytest.raises(KeyError, match="No item found"):
+        nested_layer_group.find("GroupA/GroupAA/cells")
+
+    # Paths that are ambiguous are rejected
+    nested_layer_group[3].name = "GroupA"
+    with pytest.raises(ValueError, match="2 items match"):
+        nested_layer_group.find("GroupA")
+
+
+def test_nodes_named(
+    nested_layer_group: GroupLayer, points_layer: Points
+) -> None:
+    assert nested_layer_group.nodes_named("Points_A1") == [
+        nested_layer_group[1, 2]
+    ]
+    assert nested_layer_group.nodes_named("points_a1") == []
+
+    duplicate = return_copy_with_new_name(points_layer, "Points_A1")
+    nested_layer_group.add_new_layer(duplicate, location=(0,))
+    assert nested_layer_group.nodes_named("Points_A1") == [
+        nested_layer_group[0],
+        nested_layer_group[2, 2],
+    ]
+    nested_layer_group.remove_layer_item(duplicate)
+    assert len(nested_layer_group.nodes_named("Points_A1")) == 1
+
+
+def test_uids_unique_across_threads() -> None:
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        groups = list(pool.map(lambda _: GroupLayer(), range(1000)))
+    assert len({group.uid for group in groups}) == len(groups)
+
+
+def test_from_hierarchy_and_graft(nested_layer_group: GroupLayer) -> None:
+    hierarchy = {
+        "A1": {
+            "field_0": [Points(name="dapi"), Points(name="gfp")],
+            "field_1": [Points(name="dapi")],
+        },
+        "A2": [Points(name="dapi")],
+    }
+    # Build the tree off the main thread
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        plate = pool.submit(
+            GroupLayer.from_hierarchy, hierarchy, "plate"
+        ).result()
+    assert plate.name == "plate"
+    assert [item.name for item in plate] == ["A1", "A2"]
+    assert [item.name for item in plate[0]] == ["field_0", "field_1"]
+    assert [node.name for node, _, _ in plate.iter_layers()] == [
+        "dapi",
+        "gfp",
+        "dapi",
+        "dapi",
+    ]
+
+    # Grafting the whole tree emits a single event
+    inserted = []
+    nested_layer_group.events.inserted.connect(inserted.append)
+    nested_layer_group.graft(plate, location=(1, 0))
+    assert len(inserted) == 1
+    assert nested_layer_group[1, 0] is plate
+    group_a = nested_layer_group[1]
+    assert nested_layer_group.find(f"{group_a.name}/plate/A1/field_0/gfp")
+
+    with pytest.raises(ValueError, match="cannot be grafted"):
+        nested_layer_group.graft(plate)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from napari.layers import Image, Points
+from napari_experimental.group_layer import GroupLayer
+from napari_experimental.group_layer_edits import (
+    set_layer_property,
+    undo_layer_property,
+)
+
+
+def make_tree():
+    images = [Image(np.zeros((4, 4)), opacity=0.25 * i) for i in range(1, 4)]
+    points = Points(np.zeros((2, 2)))
+    tree = GroupLayer(images[0])
+    tree.add_new_group(images[1], points, images[2])
+    return tree, images, points
+
+
+def test_set_layer_property(mocker) -> None:
+    tree, images, points = make_tree()
+    refresh = mocker.spy(Image, "refresh")
+    events = []
+    tree.events.layer_properties.connect(events.append)
+
+    edit = set_layer_property(tree, "opacity", 0.5, layer_type=Image)
+    assert len(edit) == 3
+    assert [image.opacity for image in images] == [0.5] * 3
+    assert points.opacity == 1, "Only matching layers are changed"
+    assert refresh.call_count <= len(images), "At most one refresh each"
+    assert len(events) == 1
+
+    refresh.reset_mock()
+    set_layer_property(tree, "contrast_limits", (0, 10), layer_type="image")
+    assert all(image.contrast_limits == [0, 10] for image in images)
+    assert refresh.call_count <= len(images)
+
+    set_layer_property(tree, "colormap", "magma")
+    assert all(image.colormap.name == "magma" for image in images)
+    assert not hasattr(points, "colormap")
+
+    assert undo_layer_property(tree).name == "colormap"
+    assert all(image.colormap.name == "gray" for image in images)
+    undo_layer_property(tree)
+    undo_layer_property(tree)
+    assert [image.opacity for image in images] == [0.25, 0.5, 0.75]
+    assert undo_layer_property(tree) is None
+
+
+def test_failed_edit_is_rolled_back() -> None:
+    tree, images, _ = make_tree()
+    with pytest.raises(ValueError):
+        set_layer_property(tree, "blending", "not a blending mode")
+    assert all(image.blending == "translucent" for image in images)
+    assert undo_layer_property(tree) is None
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from napari.components import ViewerModel
+from napari.layers import Image, Points
+from napari_experimental.group_layer import GroupLayer
+from napari_experimental.group_layer_extent import (
+    canvas_size,
+    combine_extents,
+    fit_camera,
+)
+
+
+def test_combine_extents() -> None:
+    assert combine_extents([]) is None
+    combined = combine_extents(
+        [np.array([[0, 0], [3, 3]]), np.array([[-5, 2, 1], [5, 4, 8]])]
+    )
+    np.testing.assert_array_equal(combined, [[-5, 0, 0], [5, 4, 8]])
+
+
+def test_group_extent_is_cached_and_updated() -> None:
+    images = [Image(np.zeros((4, 4)), translate=(0, 10 * i)) for i in range(3)]
+    tree = GroupLayer(images[0])
+    tree.add_new_group(images[1], images[2])
+    group = tree[1]
+    assert GroupLayer().extent is None
+
+    np.testing.assert_array_equal(tree.extent, [[0, 0], [3, 23]])
+    assert all(item._extent_cached for item in (tree, tree[0], group))
+
+    # Only the path above the changed layer is discarded
+    images[2].translate = (0, 40)
+    assert not tree._extent_cached and not group._extent_cached
+    assert tree[0]._extent_cached and group[0]._extent_cached
+    np.testing.assert_array_equal(tree.extent, [[0, 0], [3, 43]])
+
+    images[1].data = np.zeros((8, 4))
+    np.testing.assert_array_equal(group.extent, [[0, 10], [7, 43]])
+
+    group.add_new_layer(Points([[-10, 0]]))
+    np.testing.assert_array_equal(tree.extent, [[-10, 0], [7, 43]])
+
+    tree.remove(group)
+    np.testing.assert_array_equal(tree.extent, [[0, 0], [3, 3]])
+
+
+def test_fit_camera() -> None:
+    viewer = ViewerModel()
+    viewer.add_image(np.zeros((5, 100, 200)))
+
+    fit_camera(viewer, np.array([[0, 0], [99, 49]]), size=(400, 400), margin=0)
+    assert viewer.camera.center[-2:] == pytest.approx((49.5, 24.5))
+    assert viewer.camera.zoom == pytest.approx(400 / 99)
+
+
+def test_fit_camera_to_viewer_canvas() -> None:
+    viewer = ViewerModel()
+    viewer.add_image(np.zeros((5, 100, 200)))
+    height, width = canvas_size(viewer)
+    assert height > 0 and width > 0
+
+    fit_camera(viewer, np.array([[0, 0], [99, 49]]), margin=0)
+    assert viewer.camera.zoom == pytest.approx(min(height / 99, width / 49))
@@ -0,0 +1,138 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from napari.layers import Image, Points
+from napari_experimental import group_layer_flatten
+from napari_experimental.group_layer import GroupLayer
+from napari_experimental.group_layer_flatten import (
+    FlattenedGroup,
+    composite_images,
+    flatten_group,
+)
+
+
+def make_image(value: float, shape=(4, 4), **kwargs) -> Image:
+    return Image(
+        np.full(shape, value, dtype="f4"),
+        colormap="gray",
+        contrast_limits=(0, 1),
+        **kwargs,
+    )
+
+
+def apply_when_ready(flattened: FlattenedGroup, timeout: float = 5.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while flattened.is_pending:
+        flattened.apply_completed()
+        assert time.perf_counter() < deadline, "Compositing timed out"
+        time.sleep(0.001)
+
+
+def test_composite_respects_scale_and_translate() -> None:
+    coarse = make_image(1, shape=(2, 2), scale=(2, 2))
+    fine = make_image(1, shape=(2, 2), translate=(4, 4))
+    composite = composite_images([coarse, fine])
+
+    np.testing.assert_array_equal(composite.scale, [1, 1])
+    np.testing.assert_array_equal(composite.translate, [-0.5, -0.5])
+    alpha = composite.data[..., 3]
+    assert alpha.shape == (7, 7)
+    np.testing.assert_array_equal(alpha[:4, :4], 1)
+    np.testing.assert_array_equal(alpha[4:6, 4:6], 1)
+    assert alpha.sum() == 16 + 4, "Gaps between layers are transparent"
+
+
+def test_composite_blending() -> None:
+    bottom = make_image(1)
+    top = make_image(0, opacity=0.5)
+    composite = composite_images([bottom, top])
+    np.testing.assert_allclose(composite.data[..., :3], 0.5)
+    np.testing.assert_allclose(composite.data[..., 3], 1)
+
+    top.visible = False
+    composite = composite_images([bottom, top])
+    np.testing.assert_allclose(composite.data[..., :3], 1)
+    assert composite.data.shape == (4, 4, 4)
+
+    bottom.data = np.full((4, 4), 0.25, dtype="f4")
+    top.data = np.full((4, 4), 0.25, dtype="f4")
+    top.visible = True
+    top.opacity = 1
+    top.blending = "additive"
+    composite = composite_images([bottom, top])
+    np.testing.assert_allclose(composite.data[..., :3], 0.5)
+
+
+def test_composite_is_lazy_beyond_two_dimensions(mocker) -> None:
+    bottom = make_image(1, shape=(3, 4, 4))
+    top = make_image(0, shape=(1, 4, 4), translate=(1, 0, 0), opacity=0.5)
+    spy = mocker.spy(group_layer_flatten, "_composite_region")
+    composite = composite_images([bottom, top])
+
+    assert composite.data.shape == (3, 4, 4, 4)
+    assert spy.call_count == 0, "Nothing is composited up front"
+    plane = np.asarray(composite.data[1])
+    assert spy.call_count == 1, "Only the plane that is read is composited"
+    np.testing.assert_allclose(plane[..., :3], 0.5)
+    np.testing.assert_allclose(np.asarray(composite.data[2])[..., :3], 1)
+
+
+def test_composite_requires_matching_dims() -> None:
+    with pytest.raises(ValueError, match="no image layers"):
+        composite_images([])
+    with pytest.raises(ValueError, match="numbers of dimensions"):
+        composite_images([make_image(1), make_image(1, shape=(2, 4, 4))])
+
+
+def test_flatten_replaces_group() -> None:
+    images = [make_image(1), make_image(0, translate=(0, 4))]
+    tree = GroupLayer(Points())
+    tree.add_new_group(*images, Points())
+    group = tree[1]
+    flattened = flatten_group(group)
+
+    assert tree[1] is flattened
+    assert flattened.group is group
+    assert group.parent is None
+    assert flattened.layer.rgb
+    assert flattened.layer.data.shape == (4, 8, 4)
+    assert not flattened.is_pending
+
+    images[1].translate = (0, 8)
+    assert flattened.is_pending
+    apply_when_ready(flattened)
+    assert flattened.layer.data.shape == (4, 12, 4)
+
+    assert flattened.unflatten() is group
+    assert tree[1] is group
+    images[0].opacity = 0.5
+    assert not flattened.is_pending, "Unflattened groups are not tracked"
+
+    with pytest.raises(ValueError, match="not inside a tree"):
+        flatten_group(tree)
+
+
+def test_changes_during_recompute_coalesce(mocker) -> None:
+    image = make_image(0)
+    tree = GroupLayer()
+    tree.add_new_group(image)
+    group = tree[0]
+    executor = ThreadPoolExecutor(max_workers=1)
+    spy = mocker.spy(group_layer_flatten, "composite_images")
+    flattened = flatten_group(group, executor=executor)
+    assert spy.call_count == 1
+
+    release = threading.Event()
+    executor.submit(release.wait)
+    for opacity in (0.9, 0.8, 0.7, 0.6):
+        image.opacity = opacity
+    release.set()
+    apply_when_ready(flattened)
+
+    assert spy.call_count == 3, "Queued changes share one recomputation"
+    np.testing.assert_allclose(flattened.layer.data[..., 3], 0.6)
+    flattened.close()
+    executor.shutdown()
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from napari.components import Dims
+from napari.layers import Image, Labels, Layer, Points, Shapes
+from napari_experimental.group_layer import GroupLayer
+from napari_experimental.group_layer_freeze import (
+    is_layer_frozen,
+    missing_frozen_methods,
+)
+
+
+@pytest.mark.parametrize(
+    "layer",
+    [
+        Image(np.zeros((2, 2))),
+        Labels(np.zeros((2, 2), dtype=int)),
+        Points(),
+        Shapes(),
+    ],
+    ids=lambda layer: type(layer).__name__,
+)
+def test_napari_has_frozen_methods(layer: Layer) -> None:
+    # Freezing replaces private methods of napari's Layers, so fails here
+    # (rather than silently doing nothing) if a version of napari lacks them
+    assert missing_frozen_methods(layer) == []
+
+
+def test_freeze_without_frozen_methods(monkeypatch) -> None:
+    layer = Points()
+    monkeypatch.delattr(Layer, "_slice_dims")
+    group = GroupLayer(layer)
+
+    with pytest.warns(UserWarning, match="_slice_dims"):
+        group.frozen = True
+    assert not is_layer_frozen(layer)
+    assert "refresh" not in vars(layer)
+
+    group.frozen = False
+    assert not is_layer_frozen(layer)
+
+
+def test_frozen_layers_refreshed_once(mocker) -> None:
+    layers = [Points(name=f"points_{i}") for i in range(2)]
+    group = GroupLayer(*layers)
+    refresh = mocker.spy(Points, "refresh")
+    slice_dims = mocker.spy(Points, "_slice_dims")
+
+    group.frozen = True
+    assert all(is_layer_frozen(layer) for layer in layers)
+    for _ in range(3):
+        layers[0].refresh()
+        layers[1]._slice_dims(Dims(ndim=2))
+    assert refresh.call_count == 0
+    assert slice_dims.call_count == 0
+
+    group.frozen = False
+    assert not any(is_layer_frozen(layer) for layer in layers)
+    # One refresh for the first layer, and one re-slice for the second
+    assert [call.args[0] for call in refresh.call_args_list] == [layers[0]]
+    assert [call.args[0] for call in slice_dims.call_args_list] == [layers[1]]
+
+
+def test_frozen_subtree_membership() -> None:
+    inner_layer, outer_layer, new_layer = (
+        Points(name=name) for name in ("inner", "outer", "new")
+    )
+    tree = GroupLayer(outer_layer)
+    tree.add_new_group(inner_layer)
+    inner = tree[1]
+    # Only frozen GroupLayers listen for items being inserted into them
+    n_callbacks = len(tree.events.inserted.callbacks)
+
+    with tree.freeze():
+        assert tree.frozen
+        assert is_layer_frozen(inner_layer)
+
+        # Layers added inside the frozen tree are frozen, and those removed
+        # from it are unfrozen
+        inner.add_new_layer(new_layer)
+        assert is_layer_frozen(new_layer)
+        del tree[0]
+        assert not is_layer_frozen(outer_layer)
+
+        # Layers stay frozen whilst any GroupLayer containing them is
+        inner.frozen = True
+        inner.frozen = False
+        assert is_layer_frozen(inner_layer)
+    assert not tree.frozen
+    assert not is_layer_frozen(inner_layer)
+    assert not is_layer_frozen(new_layer)
+    assert len(tree.events.inserted.callbacks) == n_callbacks
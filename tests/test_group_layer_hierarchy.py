@@ -0,0 +1,114 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from napari_experimental.group_layer import GroupLayer
+from napari_experimental.group_layer_hierarchy import (
+    UNREALISED_NAME,
+    HierarchyMirror,
+    open_hierarchy,
+)
+
+
+@pytest.fixture()
+def plate(tmp_path: Path) -> Path:
+    """
+    A directory tree laid out like a plate:
+
+    * plate
+        * A1
+            * field_0
+                * dapi.npy
+                * gfp.npy
+            * field_1
+                * ...
+        * A2
+            * ...
+    """
+    root = tmp_path / "plate"
+    for well in ("A1", "A2"):
+        for field in ("field_0", "field_1"):
+            directory = root / well / field
+            directory.mkdir(parents=True)
+            for channel in ("dapi", "gfp"):
+                np.save(directory / f"{channel}.npy", np.ones((8, 8), "u2"))
+    (root / "notes.txt").write_text("Not mirrored")
+    return root
+
+
+def test_mirror_is_lazy(plate: Path) -> None:
+    tree = GroupLayer()
+    realised = []
+    mirror = HierarchyMirror(tree, on_realised=realised.append)
+
+    group = mirror.mirror(plate)
+    assert tree[0] is group
+    assert group.name == "plate"
+    assert not group.visible
+    assert [item.name for item in group] == [UNREALISED_NAME]
+    assert not mirror.is_realised(group)
+
+    mirror.realise(group)
+    assert realised == [group]
+    assert [item.name for item in group] == ["A1", "A2"]
+    assert all(
+        not mirror.is_realised(well)
+        and [item.name for item in well] == [UNREALISED_NAME]
+        for well in group
+    )
+
+    mirror.realise(group[0])
+    mirror.realise(group[0, 0])
+    field = group[0, 0]
+    assert [item.name for item in field] == ["dapi", "gfp"]
+    assert all(isinstance(item.layer.data, np.memmap) for item in field)
+    assert not any(item.layer.visible for item in field)
+
+
+def test_mirror_realised_when_visible(plate: Path) -> None:
+    tree = GroupLayer()
+    mirror = HierarchyMirror(tree)
+    group = mirror.mirror(plate, name="my plate")
+    assert group.name == "my plate"
+
+    group.visible = True
+    n_layers = sum(1 for _ in group.iter_layers())
+    assert n_layers == 8
+    assert all(node.layer.visible for node, _, _ in group.iter_layers())
+    assert not any(item.name == UNREALISED_NAME for item in group.traverse())
+
+
+def test_open_hierarchy_errors(plate: Path) -> None:
+    with pytest.raises(ValueError, match="is not a directory"):
+        open_hierarchy(plate / "notes.txt")
+
+
+def test_mirror_zarr(tmp_path: Path) -> None:
+    zarr = pytest.importorskip("zarr")
+    store = zarr.open_group(str(tmp_path / "plate.zarr"), mode="w")
+    store.create_group("A1").zeros(name="image", shape=(4, 4), dtype="u1")
+
+    tree = GroupLayer()
+    mirror = HierarchyMirror(tree)
+    group = mirror.mirror(tmp_path / "plate.zarr")
+    assert group.name == "plate"
+    group.visible = True
+    assert [node.name for node, _, _ in group.iter_layers()] == ["image"]
+
+
+def test_mirror_hdf5_closed_on_removal(tmp_path: Path) -> None:
+    h5py = pytest.importorskip("h5py")
+    path = tmp_path / "plate.h5"
+    with h5py.File(path, mode="w") as file:
+        file.create_group("A1").create_dataset("image", data=np.zeros((4, 4)))
+
+    tree = GroupLayer()
+    mirror = HierarchyMirror(tree)
+    group = mirror.mirror(path)
+    group.visible = True
+    [(node, _, _)] = group.iter_layers()
+    dataset = node.layer.data
+    assert dataset.id.valid
+
+    tree.remove(group)
+    assert not dataset.id.valid, "The file should be closed"
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from napari.layers import Image, Points
+from napari_experimental.group_layer import GroupLayer
+from napari_experimental.group_layer_edits import undo_layer_property
+from napari_experimental.group_layer_histogram import (
+    Histogram,
+    joint_histogram,
+    share_contrast_limits,
+)
+
+
+def test_joint_histogram_streams_chunks(tmp_path) -> None:
+    mapped = np.lib.format.open_memmap(
+        tmp_path / "volume.npy", mode="w+", dtype="u2", shape=(8, 16, 16)
+    )
+    mapped[:] = np.arange(8, dtype="u2")[:, np.newaxis, np.newaxis]
+    in_memory = np.full((16, 16), 100.0)
+    in_memory[0, 0] = np.nan
+    layers = [Image(mapped), Image(in_memory)]
+
+    # A single plane of the volume at a time
+    histogram = joint_histogram(layers, bins=100, chunk_bytes=512)
+    assert histogram.edges[0] == 0
+    assert histogram.edges[-1] == 100
+    assert histogram.counts.sum() == mapped.size + in_memory.size - 1
+    assert histogram.counts[-1] == in_memory.size - 1
+
+
+def test_percentiles() -> None:
+    histogram = Histogram(np.array([50, 0, 50]), np.array([0, 1, 2, 3]))
+    assert histogram.percentile(0) == 0
+    assert histogram.percentile(100) == 3
+    assert histogram.percentile(25) == pytest.approx(0.5)
+    assert histogram.contrast_limits((0, 100)) == (0, 3)
+
+    empty = Histogram(np.zeros(3, dtype=int), np.array([5, 6, 7, 8]))
+    assert empty.contrast_limits() == (5, 6)
+
+
+def test_share_contrast_limits() -> None:
+    images = [
+        Image(np.arange(16, dtype="f4").reshape(4, 4) + offset)
+        for offset in (0, 10, 50)
+    ]
+    original = [list(image.contrast_limits) for image in images]
+    tree = GroupLayer(Points())
+    tree.add_new_group(images[0], images[1])
+    tree[1].add_new_layer(images[2])
+
+    share_contrast_limits(tree)
+    assert all(image.contrast_limits == [0, 65] for image in images)
+
+    undo_layer_property(tree)
+    assert [list(image.contrast_limits) for image in images] == original
+    assert original[2] != [0, 65]
@@ -0,0 +1,117 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from napari_experimental.group_layer import GroupLayer
+from napari_experimental.group_layer_loading import GroupLayerLoader
+
+
+def swap_until_loaded(loader: GroupLayerLoader, timeout: float = 5.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while loader.n_pending:
+        loader.swap_completed()
+        assert time.perf_counter() < deadline, "Loading timed out"
+        time.sleep(0.001)
+
+
+def test_placeholders_added_immediately() -> None:
+    tree = GroupLayer()
+    release = threading.Event()
+
+    def read(source: str) -> tuple:
+        release.wait()
+        return (np.zeros((1, 2)), {"name": source}, "points")
+
+    loader = GroupLayerLoader(tree)
+    sources = [f"file_{i}.csv" for i in range(10)]
+    group = loader.load_group(sources, read, name="files")
+
+    assert tree[0] is group
+    assert group.name == "files"
+    assert [node.name for node in group] == sources
+    assert all(node.is_loading and not node.is_tracking for node in group)
+    assert loader.n_pending == len(sources)
+
+    release.set()
+    swap_until_loaded(loader)
+
+    assert [node.name for node in group] == sources
+    assert all(node.is_tracking and not node.is_loading for node in group)
+    loader.shutdown()
+
+
+def test_max_concurrent_reads() -> None:
+    tree = GroupLayer()
+    lock = threading.Lock()
+    in_flight, max_in_flight = 0, 0
+
+    def read(source: int) -> tuple:
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.005)
+        with lock:
+            in_flight -= 1
+        return (np.zeros((1, 2)), {"name": str(source)}, "points")
+
+    loader = GroupLayerLoader(
+        tree, max_concurrent_reads=2, executor=ThreadPoolExecutor(8)
+    )
+    loader.load_group(range(20), read)
+    swap_until_loaded(loader)
+
+    assert max_in_flight <= 2
+    assert [node.name for node in tree[0]] == [str(i) for i in range(20)]
+
+
+def test_failed_and_multiple_layer_reads() -> None:
+    tree = GroupLayer()
+    loaded = []
+
+    def read(source: str):
+        if source == "broken":
+            raise OSError("Cannot read file")
+        if source == "pair":
+            return [
+                (np.zeros((1, 2)), {"name": "pair_0"}, "points"),
+                (np.zeros((1, 2)), {"name": "pair_1"}, "points"),
+            ]
+        return (np.zeros((1, 2)), {"name": source}, "points")
+
+    loader = GroupLayerLoader(tree, on_loaded=loaded.append)
+    group = loader.load_group(["first", "broken", "pair", "last"], read)
+    with pytest.warns(UserWarning, match="Could not load broken"):
+        swap_until_loaded(loader)
+
+    assert [node.name for node in group] == [
+        "first",
+        "pair_0",
+        "pair_1",
+        "last",
+    ]
+    assert loaded == list(group)
+    loader.shutdown()
+
+
+def test_group_removed_whilst_loading() -> None:
+    tree = GroupLayer()
+    release = threading.Event()
+    loaded = []
+
+    def read(source: str) -> tuple:
+        release.wait()
+        return (np.zeros((1, 2)), {"name": source}, "points")
+
+    loader = GroupLayerLoader(tree, on_loaded=loaded.append)
+    group = loader.load_group(["first", "second"], read)
+    tree.remove(group)
+
+    release.set()
+    swap_until_loaded(loader)
+
+    assert loaded == []
+    assert all(node.is_loading for node in group)
+    loader.shutdown()
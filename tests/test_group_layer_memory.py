@@ -0,0 +1,83 @@
+from pathlib import Path
+
+import numpy as np
+from napari.layers import Image
+from napari_experimental.group_layer import GroupLayer
+from napari_experimental.group_layer_memory import (
+    MemoryFootprint,
+    format_nbytes,
+    layer_footprint,
+)
+
+
+class LazyArray:
+    """Array-like that only describes its data, like dask or Zarr arrays."""
+
+    def __init__(self, shape, dtype) -> None:
+        self.shape = shape
+        self.dtype = np.dtype(dtype)
+        self.ndim = len(shape)
+
+    def __getitem__(self, key):
+        return np.zeros(self.shape, self.dtype)[key]
+
+    def __array__(self, dtype=None):
+        return np.zeros(self.shape, dtype or self.dtype)
+
+
+def test_layer_footprint(tmp_path: Path) -> None:
+    data = np.zeros((10, 10), dtype="u2")
+    mapped = np.memmap(
+        tmp_path / "mapped.dat", dtype="u1", mode="w+", shape=(10, 10)
+    )
+    assert layer_footprint(Image(data)) == MemoryFootprint(in_memory=200)
+    assert layer_footprint(Image(mapped)) == MemoryFootprint(mapped=100)
+    assert layer_footprint(
+        Image(LazyArray((100, 100), "f4"), contrast_limits=(0, 1))
+    ) == MemoryFootprint(lazy=40_000)
+    assert layer_footprint(
+        Image([data, data[::2, ::2]], multiscale=True)
+    ) == MemoryFootprint(in_memory=250)
+
+
+def test_group_nbytes_maintained(tmp_path: Path) -> None:
+    images = [Image(np.zeros((10, 10), dtype="u1")) for _ in range(3)]
+    tree = GroupLayer(images[0])
+    tree.add_new_group(images[1])
+    inner = tree[1]
+    assert tree.nbytes == 200
+    assert inner.nbytes == 100
+
+    # Insertions and removals deep inside the tree are accounted for
+    inner.add_new_layer(images[2])
+    assert (tree.nbytes, inner.nbytes) == (300, 200)
+    del inner[0]
+    assert (tree.nbytes, inner.nbytes) == (200, 100)
+
+    # As is replacing the data of a layer
+    mapped = np.memmap(
+        tmp_path / "mapped.dat", dtype="u1", mode="w+", shape=(10, 10)
+    )
+    images[2].data = mapped
+    assert inner.footprint == MemoryFootprint(mapped=100)
+    assert tree.footprint == MemoryFootprint(in_memory=100, mapped=100)
+
+    # Moving items between groups leaves the totals consistent
+    tree.move((0,), (1, 0))
+    assert inner.footprint == MemoryFootprint(in_memory=100, mapped=100)
+    assert tree.footprint == inner.footprint
+
+    def walked(group: GroupLayer) -> MemoryFootprint:
+        footprint = MemoryFootprint()
+        for node, _, _ in group.iter_layers():
+            footprint += layer_footprint(node.layer)
+        return footprint
+
+    assert tree.footprint == walked(tree)
+    assert inner.footprint == walked(inner)
+
+
+def test_format_nbytes() -> None:
+    assert format_nbytes(512) == "512 B"
+    assert format_nbytes(1536) == "1.5 KiB"
+    assert format_nbytes(3 * 2**30) == "3.0 GiB"
@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+import pytest
+from napari.layers import Image, Labels, Points
+from napari_experimental import group_layer_merge
+from napari_experimental.group_layer import GroupLayer
+from napari_experimental.group_layer_merge import (
+    SOURCE_LAYER_FEATURE,
+    label_sources,
+    merge_group_labels,
+    merge_group_points,
+    merge_labels,
+    merge_points,
+    set_source_visible,
+    sources_of,
+    split_group_points,
+    split_points,
+)
+
+
+def make_points(n_layers: int = 3) -> list:
+    rng = np.random.default_rng(0)
+    return [
+        Points(
+            rng.random((i + 2, 2)) * 100,
+            features=pd.DataFrame({"score": np.arange(i + 2) * 0.5}),
+            face_color=["red", "blue"][i % 2],
+            size=i + 1,
+            symbol=["disc", "square"][i % 2],
+            opacity=0.5 + 0.1 * i,
+            name=f"class_{i}",
+        )
+        for i in range(n_layers)
+    ]
+
+
+def assert_points_equal(a: Points, b: Points) -> None:
+    assert a.name == b.name
+    assert a.visible == b.visible
+    assert a.opacity == b.opacity
+    np.testing.assert_array_equal(a.data, b.data)
+    np.testing.assert_array_equal(a.face_color, b.face_color)
+    np.testing.assert_array_equal(a.border_color, b.border_color)
+    np.testing.assert_array_equal(a.size, b.size)
+    np.testing.assert_array_equal(a.symbol, b.symbol)
+    np.testing.assert_array_equal(a.shown, b.shown)
+    pd.testing.assert_frame_equal(a.features, b.features)
+
+
+def test_merge_points() -> None:
+    layers = make_points()
+    merged = merge_points(layers, name="cells")
+
+    assert merged.name == "cells"
+    assert len(merged.data) == sum(len(layer.data) for layer in layers)
+    np.testing.assert_array_equal(
+        merged.features[SOURCE_LAYER_FEATURE], [0, 0, 1, 1, 1, 2, 2, 2, 2]
+    )
+    np.testing.assert_array_equal(
+        merged.face_color[2], layers[1].face_color[0]
+    )
+    np.testing.assert_array_equal(merged.size[-1], 3)
+    assert [source.state["name"] for source in sources_of(merged)] == [
+        "class_0",
+        "class_1",
+        "class_2",
+    ]
+
+
+def test_split_points_round_trip() -> None:
+    layers = make_points()
+    layers[1].visible = False
+    layers[2].shown = [True, False, True, True]
+    merged = merge_points(layers)
+    assert not merged.shown[2:5].any(), "Points of hidden layers are hidden"
+
+    for original, split in zip(layers, split_points(merged)):  # noqa: B905
+        assert_points_equal(original, split)
+
+
+def test_source_visibility_is_a_shown_mask() -> None:
+    layers = make_points()
+    layers[2].shown = [True, False, True, True]
+    merged = merge_points(layers)
+
+    set_source_visible(merged, 2, False)
+    assert not merged.shown[5:].any()
+    assert merged.shown[:5].all()
+    set_source_visible(merged, 2, True)
+    np.testing.assert_array_equal(merged.shown[5:], layers[2].shown)
+
+    set_source_visible(merged, 0, False)
+    assert not split_points(merged)[0].visible
+
+
+def test_merge_requires_matching_transforms() -> None:
+    layers = make_points(2)
+    layers[1].scale = (2, 2)
+    with pytest.raises(ValueError, match="same dimensions and transforms"):
+        merge_points(layers)
+    with pytest.raises(ValueError, match="not a merged points layer"):
+        split_points(layers[0])
+
+
+def test_group_merge_and_split_points() -> None:
+    layers = make_points()
+    image = Image(np.zeros((4, 4)))
+    tree = GroupLayer()
+    tree.add_new_group(layers[0], image, *layers[1:])
+    group = tree[0]
+
+    node = merge_group_points(group)
+    assert len(group) == 2
+    assert group[0] is node
+    assert group[1].layer is image
+    assert node.layer.name == "class_0"
+
+    nodes = split_group_points(group, node)
+    assert [item.layer.name for item in group] == [
+        "class_0",
+        "class_1",
+        "class_2",
+        image.name,
+    ]
+    for original, item in zip(layers, nodes):  # noqa: B905
+        assert_points_equal(original, item.layer)
+
+
+def make_labels() -> list:
+    first = np.zeros((6, 4), dtype="u1")
+    first[0:3, :2] = 1
+    first[0:3, 2:] = 2
+    second = np.zeros((6, 4), dtype="u2")
+    second[2:6, :] = 3
+    return [Labels(first, name="nuclei"), Labels(second, name="cells")]
+
+
+def test_merge_labels(monkeypatch) -> None:
+    # A few rows at a time, so that the layers are merged in chunks
+    monkeypatch.setattr(group_layer_merge, "LABELS_CHUNK_BYTES", 8)
+    layers = make_labels()
+    merged = merge_labels(layers)
+
+    assert merged.name == "nuclei"
+    assert merged.data.dtype == np.uint8
+    expected = np.zeros((6, 4), dtype="u1")
+    expected[2:6] = 3 + 2
+    expected[0:3, :2] = 1
+    expected[0:3, 2:] = 2
+    np.testing.assert_array_equal(merged.data, expected)
+
+    source, original = label_sources(merged, [0, 1, 2, 5, 9])
+    np.testing.assert_array_equal(source, [-1, 0, 0, 1, -1])
+    np.testing.assert_array_equal(original, [0, 1, 2, 3, 0])
+    assert sources_of(merged)[1].state["name"] == "cells"
+
+
+def test_merge_labels_into_out(tmp_path) -> None:
+    layers = make_labels()
+    out = np.lib.format.open_memmap(
+        tmp_path / "merged.npy", mode="w+", dtype="u4", shape=(6, 4)
+    )
+    merged = merge_labels(layers, out=out)
+    assert out.max() == 5
+    np.testing.assert_array_equal(merged.data, out)
+
+    with pytest.raises(ValueError, match="unsigned integers"):
+        merge_labels(layers, out=np.zeros((6, 4), dtype="i4"))
+    layers[1].data = np.zeros((3, 4), dtype="u1")
+    with pytest.raises(ValueError, match="same shape"):
+        merge_labels(layers)
+
+
+def test_group_merge_labels() -> None:
+    layers = make_labels()
+    tree = GroupLayer()
+    tree.add_new_group(Points(), *layers)
+    group = tree[0]
+
+    node = merge_group_labels(group, name="objects")
+    assert len(group) == 2
+    assert group[1] is node
+    assert node.layer.name == "objects"
+    with pytest.raises(ValueError, match="no labels layers"):
+        merge_group_labels(group)
@@ -0,0 +1,79 @@
+import time
+
+import numpy as np
+from napari.components import ViewerModel
+from napari.layers import Image
+from napari_experimental.group_layer import GroupLayer
+from napari_experimental.group_layer_prefetch import DimsPrefetcher
+from napari_experimental.group_layer_slice_cache import enable_slice_cache
+
+
+def wait_for(prefetcher: DimsPrefetcher, timeout: float = 5.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while prefetcher.n_pending:
+        assert time.perf_counter() < deadline, "Prefetching timed out"
+        time.sleep(0.001)
+
+
+def make_viewer(n_channels: int = 3, n_frames: int = 20):
+    channels = [
+        Image(np.random.random((n_frames, 8, 8)), name=f"channel_{i}")
+        for i in range(n_channels)
+    ]
+    tree = GroupLayer()
+    tree.add_new_group(*channels)
+    viewer = ViewerModel()
+    for channel in channels:
+        viewer.add_layer(channel)
+    return viewer, tree, tree[0]
+
+
+def test_upcoming_frames_prefetched() -> None:
+    viewer, tree, group = make_viewer()
+    cache = enable_slice_cache(group, max_slices=64)
+    prefetcher = DimsPrefetcher(tree, viewer.dims, n_frames=3)
+
+    viewer.dims.set_current_step(0, 1)
+    wait_for(prefetcher)
+    misses = cache.misses
+    for step in (2, 3, 4):
+        viewer.dims.set_current_step(0, step)
+    assert cache.misses == misses, "Upcoming frames should be cached"
+    prefetcher.shutdown()
+
+
+def test_prefetch_follows_direction() -> None:
+    viewer, tree, group = make_viewer()
+    cache = enable_slice_cache(group, max_slices=64)
+    prefetcher = DimsPrefetcher(tree, viewer.dims, n_frames=2)
+
+    viewer.dims.set_current_step(0, 10)
+    viewer.dims.set_current_step(0, 9)
+    wait_for(prefetcher)
+    misses = cache.misses
+    viewer.dims.set_current_step(0, 8)
+    viewer.dims.set_current_step(0, 7)
+    assert cache.misses == misses
+    prefetcher.shutdown()
+
+
+def test_prefetch_budget_and_cancellation() -> None:
+    viewer, tree, group = make_viewer(n_channels=3)
+    # Room for the current frame, and one more
+    cache = enable_slice_cache(group, max_slices=6)
+    prefetcher = DimsPrefetcher(tree, viewer.dims, n_frames=5)
+    assert prefetcher._frame_budget(cache, 3) == 1
+
+    viewer.dims.set_current_step(0, 1)
+    wait_for(prefetcher)
+    assert len(cache) <= 6
+
+    # Nothing is prefetched for hidden, or inactive, groups
+    group.visible = False
+    viewer.dims.set_current_step(0, 2)
+    assert prefetcher.n_pending == 0
+    group.visible = True
+    prefetcher._is_active = lambda group: False
+    viewer.dims.set_current_step(0, 3)
+    assert prefetcher.n_pending == 0
+    prefetcher.shutdown()
@@ -0,0 +1,97 @@
+from typing import Dict
+
+import pytest
+from napari.layers import Points
+from napari_experimental.group_layer import GroupLayer
+from napari_experimental.group_layer_qt import (
+    QtGroupLayerFilterProxyModel,
+    QtGroupLayerModel,
+)
+
+from .fixtures.conftest_layers import return_copy_with_new_name
+
+
+@pytest.mark.parametrize(
+    ["query", "expected_names"],
+    [
+        pytest.param("AA", {"Points_AA0", "Points_AA1"}, id="Short query"),
+        pytest.param(
+            "points_a",
+            {"Points_A0", "Points_A1", "Points_AA0", "Points_AA1"},
+            id="Long query",
+        ),
+        pytest.param("ts_aa1", {"Points_AA1"}, id="Mid-name query"),
+        pytest.param("type:image", set(), id="Type only, no matches"),
+        pytest.param("B0 type:points", {"Points_B0"}, id="Name and type"),
+        pytest.param("not-a-name", set(), id="No matches"),
+    ],
+)
+def test_search_index_query(
+    nested_layer_group: GroupLayer, query: str, expected_names: set
+) -> None:
+    matches = nested_layer_group.search_index.query(query)
+    assert {item.name for item in matches} == expected_names
+
+
+def test_search_index_groups(nested_layer_group: GroupLayer) -> None:
+    index = nested_layer_group.search_index
+    groups = index.nodes_of_type("group")
+    assert groups == {
+        nested_layer_group[1],
+        nested_layer_group[1, 1],
+        nested_layer_group[3],
+    }, "Not all (non-root) GroupLayers were indexed as groups."
+
+    nested_layer_group[1, 1].name = "Renamed group"
+    assert index.query("renamed") == {nested_layer_group[1, 1]}
+
+
+def test_search_index_tracks_changes(
+    nested_layer_group: GroupLayer,
+    collection_of_layers: Dict[str, Points],
+    points_layer: Points,
+) -> None:
+    index = nested_layer_group.search_index
+    n_items = len(index)
+
+    # Renaming a layer is reflected in the index
+    collection_of_layers["A0"].name = "Nuclei"
+    assert index.query("nuclei") == {nested_layer_group[1, 0]}
+    assert not index.query("points_a0")
+
+    # Insertion of a group indexes its contents
+    new_layer = return_copy_with_new_name(points_layer, "Membrane")
+    nested_layer_group.add_new_group(new_layer, location=(3, 0))
+    assert len(index) == n_items + 2
+    assert index.query("membrane") == {nested_layer_group[3, 0, 0]}
+
+    # Removal of a group un-indexes its contents
+    nested_layer_group.remove(nested_layer_group[1])
+    assert len(index) == n_items + 2 - 6
+    assert not index.query("nuclei")
+    assert not index.query("points_aa")
+
+    # Removed layers are no longer tracked
+    collection_of_layers["A0"].name = "Cytoplasm"
+    assert not index.query("cytoplasm")
+
+
+def test_filter_proxy_model(nested_layer_group: GroupLayer) -> None:
+    source = QtGroupLayerModel(nested_layer_group)
+    proxy = QtGroupLayerFilterProxyModel(source)
+    assert proxy.rowCount() == len(nested_layer_group)
+
+    # Matches are displayed along with their ancestor groups
+    proxy.set_search_text("AA1")
+    assert proxy.rowCount() == 1
+    group_a = proxy.index(0, 0)
+    assert source.getItem(proxy.mapToSource(group_a)) is nested_layer_group[1]
+    assert proxy.rowCount(group_a) == 1
+    group_aa = proxy.index(0, 0, group_a)
+    assert proxy.rowCount(group_aa) == 1
+    match = proxy.mapToSource(proxy.index(0, 0, group_aa))
+    assert source.getItem(match).name == "Points_AA1"
+
+    # Clearing the search shows everything again
+    proxy.set_search_text("")
+    assert proxy.rowCount() == len(nested_layer_group)
@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+from napari.components import ViewerModel
+from napari.layers import Image, Labels, Layer, Points
+from napari_experimental.group_layer import GroupLayer
+from napari_experimental.group_layer_slice_cache import (
+    SLICE_REQUEST_METHOD,
+    attached_cache,
+    can_cache_slices,
+    disable_slice_cache,
+    enable_slice_cache,
+    group_slice_cache,
+)
+
+
+@pytest.mark.parametrize(
+    "layer",
+    [Image(np.zeros((2, 2))), Labels(np.zeros((2, 2), dtype=int))],
+    ids=lambda layer: type(layer).__name__,
+)
+def test_napari_has_slice_request_method(layer: Layer) -> None:
+    # Caching replaces a private method of napari's Layers, so fails here
+    # (rather than silently doing nothing) if a version of napari lacks it
+    assert can_cache_slices(layer)
+
+
+def test_slice_cache_without_slice_request_method(monkeypatch) -> None:
+    image = Image(np.zeros((4, 4)))
+    slicing_state = getattr(image, "_slicing_state", image)
+    for cls in type(slicing_state).__mro__:
+        if SLICE_REQUEST_METHOD in vars(cls):
+            monkeypatch.delattr(cls, SLICE_REQUEST_METHOD)
+    group = GroupLayer(image)
+
+    with pytest.warns(UserWarning, match=SLICE_REQUEST_METHOD):
+        enable_slice_cache(group)
+    assert attached_cache(image) is None
+    assert SLICE_REQUEST_METHOD not in vars(slicing_state)
+
+    disable_slice_cache(group)
+    assert group_slice_cache(group) is None
+
+
+def test_slices_served_from_cache() -> None:
+    image = Image(np.random.random((4, 16, 16)))
+    group = GroupLayer(image, Points())
+    cache = enable_slice_cache(group, max_slices=8)
+    assert attached_cache(image) is cache
+    assert attached_cache(group[1].layer) is None, "Only arrays are cached"
+
+    viewer = ViewerModel()
+    viewer.add_layer(image)
+    viewer.dims.set_point(0, 0)
+    viewer.dims.set_point(0, 1)
+    misses = cache.misses
+    assert len(cache) > 0
+
+    # Stepping back, and re-showing the group, are served from the cache
+    viewer.dims.set_point(0, 0)
+    group.visible = False
+    group.visible = True
+    assert cache.misses == misses
+    assert cache.hits >= 2
+    np.testing.assert_array_equal(image._slice.image.raw, image.data[0])
+
+    # Replacing the data invalidates the cached slices
+    image.data = image.data * 2
+    viewer.dims.set_point(0, 1)
+    assert cache.misses > misses
+    np.testing.assert_array_equal(image._slice.image.raw, image.data[1])
+
+
+def test_slice_cache_bounded() -> None:
+    image = Image(np.zeros((10, 8, 8)))
+    group = GroupLayer(image)
+    cache = enable_slice_cache(group, max_slices=100)
+
+    viewer = ViewerModel()
+    viewer.add_layer(image)
+    # Slices hold more than the data (e.g. the thumbnail), so measure them
+    slice_nbytes = cache.nbytes / len(cache)
+    cache.max_bytes = 3 * slice_nbytes
+    for step in range(10):
+        viewer.dims.set_point(0, step)
+    assert cache.nbytes <= 3 * slice_nbytes
+    assert 0 < len(cache) <= 3
+
+
+def test_slice_cache_membership() -> None:
+    image, new_image = Image(np.zeros((4, 4))), Image(np.zeros((4, 4)))
+    tree = GroupLayer(image)
+    # The cache only listens to the tree whilst it is enabled
+    n_callbacks = len(tree.events.inserted.callbacks)
+    cache = enable_slice_cache(tree)
+    assert group_slice_cache(tree) is cache
+
+    tree.add_new_layer(new_image)
+    assert attached_cache(new_image) is cache
+    del tree[0]
+    assert attached_cache(image) is None
+
+    disable_slice_cache(tree)
+    assert group_slice_cache(tree) is None
+    assert len(tree.events.inserted.callbacks) == n_callbacks
+    assert attached_cache(new_image) is None
+
+
+def test_slice_cache_key() -> None:
+    image = Image(np.random.random((4, 16, 16)))
+    group = GroupLayer(image)
+    cache = enable_slice_cache(group)
+    viewer = ViewerModel()
+    viewer.add_layer(image)
+    viewer.dims.margin_left = (1, 0, 0)
+    viewer.dims.margin_right = (1, 0, 0)
+    viewer.dims.set_point(0, 1)
+
+    # A different projection of the same thick slice is not served from the
+    # cache
+    image.projection_mode = "max"
+    image.projection_mode = "mean"
+    misses = cache.misses
+    image.projection_mode = "sum"
+    assert cache.misses == misses + 1
+    np.testing.assert_allclose(
+        image._slice.image.raw, image.data[0:3].sum(axis=0)
+    )
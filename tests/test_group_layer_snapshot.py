@@ -0,0 +1,73 @@
+import numpy as np
+from napari.layers import Image
+from napari_experimental.group_layer import GroupLayer
+
+
+def test_snapshot_structure(nested_layer_group: GroupLayer) -> None:
+    snapshot = nested_layer_group.tree_snapshot()
+
+    # Euler-tour order matches the flat index order (with groups), with
+    # the root in front
+    assert [item.index_from_root() for item in snapshot.nodes] == [
+        ()
+    ] + nested_layer_group.flat_index_order(include_groups=True)
+
+    np.testing.assert_array_equal(
+        snapshot.parent, [-1, 0, 0, 2, 2, 4, 4, 2, 0, 0, 9]
+    )
+    np.testing.assert_array_equal(
+        snapshot.depth, [0, 1, 1, 2, 2, 3, 3, 2, 1, 1, 2]
+    )
+    np.testing.assert_array_equal(
+        snapshot.subtree_end, [11, 2, 8, 4, 7, 6, 7, 8, 9, 11, 11]
+    )
+    np.testing.assert_array_equal(
+        np.flatnonzero(snapshot.is_group), [0, 2, 4, 9]
+    )
+    np.testing.assert_array_equal(snapshot.count_per_depth(), [1, 4, 4, 2])
+    np.testing.assert_array_equal(
+        snapshot.count_per_depth(layers_only=True), [0, 2, 3, 2]
+    )
+
+
+def test_snapshot_queries(nested_layer_group: GroupLayer) -> None:
+    snapshot = nested_layer_group.tree_snapshot()
+    group_a = nested_layer_group[1]
+
+    assert snapshot.is_ancestor(group_a, nested_layer_group[1, 1, 0])
+    assert not snapshot.is_ancestor(group_a, nested_layer_group[3, 0])
+    assert not snapshot.is_ancestor(group_a, group_a)
+
+    assert [item.name for item in snapshot.layers_under(group_a)] == [
+        "Points_A0",
+        "Points_AA0",
+        "Points_AA1",
+        "Points_A1",
+    ]
+    ancestors = snapshot.ancestor_mask(
+        snapshot.position_of(nested_layer_group[1, 1, 1])
+    )
+    assert [snapshot.nodes[i] for i in np.flatnonzero(ancestors)] == [
+        nested_layer_group,
+        group_a,
+        nested_layer_group[1, 1],
+    ]
+    assert snapshot.type_mask("points").sum() == 7
+    assert not snapshot.type_mask("image").any()
+
+
+def test_snapshot_cache(nested_layer_group: GroupLayer, blobs) -> None:
+    snapshot = nested_layer_group.tree_snapshot()
+    assert nested_layer_group.tree_snapshot() is snapshot
+
+    # Changes inside a sub-group invalidate the snapshot of the root
+    nested_layer_group.add_new_layer(Image(blobs), location=(1, 1, 0))
+    updated = nested_layer_group.tree_snapshot()
+    assert updated is not snapshot
+    assert len(updated) == len(snapshot) + 1
+    assert updated.type_mask("image").sum() == 1
+
+    nested_layer_group.move((1, 1, 0), (0,))
+    moved = nested_layer_group.tree_snapshot()
+    assert moved is not updated
+    assert moved.type_code[1] == moved.type_names.index("image")
@@ -0,0 +1,80 @@
+import numpy as np
+from napari.layers import Image
+from napari_experimental.group_layer import GroupLayer
+from napari_experimental.group_layer_spatial import (
+    SPATIAL_INDEX_MAX_CELLS,
+    GroupLayerSpatialIndex,
+)
+
+
+def make_plate(n_wells: int = 10) -> GroupLayer:
+    """
+    Plate of wells in a row, 100 apart, each with two 10 x 10 tiles with a
+    gap of 10 between them.
+    """
+    plate = GroupLayer()
+    for well in range(n_wells):
+        plate.add_new_group(
+            *(
+                Image(np.zeros((10, 10)), translate=(0, 100 * well + 20 * i))
+                for i in range(2)
+            )
+        )
+    return plate
+
+
+def test_item_at_resolves_deepest_item() -> None:
+    plate = make_plate()
+    index = plate.spatial_index
+    assert len(index) == 30
+
+    assert plate.item_at((5, 325)) is plate[3][1]
+    # In the gap between the tiles, but inside the well
+    assert plate.item_at((5, 315)) is plate[3]
+    # Anywhere on the last pixel of a tile
+    assert plate.item_at((9.4, 309.4)) is plate[3][0]
+    assert plate.item_at((5, 350)) is None
+    assert plate.item_at((0, 5, 325)) is plate[3][1], "Aligned to last axes"
+    assert index.cell_size == 10
+
+
+def test_spatial_index_is_updated_incrementally() -> None:
+    plate = make_plate()
+    index = plate.spatial_index
+    index.items_at((0, 0))
+    assert not index._dirty
+
+    tile = plate[3][1]
+    tile.layer.translate = (0, 1000)
+    assert index._dirty == {tile, plate[3]}
+    assert plate.item_at((5, 1005)) is tile
+    assert plate.item_at((5, 325)) is plate[3], "The well now spans it"
+
+    tile.layer.visible = False
+    assert plate.item_at((5, 1005)) is plate[3]
+    assert plate.item_at((5, 1005), visible=False) is tile
+
+    removed = plate[3]
+    plate.remove(removed)
+    assert removed not in index
+    assert plate.item_at((5, 305)) is None
+    plate.insert(0, removed)
+    assert plate.item_at((5, 305)) is removed[0]
+
+
+def test_overlapping_items_resolve_to_top() -> None:
+    tree = GroupLayer(Image(np.zeros((10, 10))), Image(np.zeros((10, 10))))
+    assert tree.item_at((5, 5)) is tree[0]
+    tree.move(1, 0)
+    assert tree.item_at((5, 5)) is tree[0]
+
+
+def test_large_items_are_kept_aside() -> None:
+    plate = make_plate()
+    index = GroupLayerSpatialIndex(plate, cell_size=1)
+    index.items_at((0, 0))
+    # Each tile covers 11 x 11 cells
+    assert 11 * 11 > SPATIAL_INDEX_MAX_CELLS
+    assert index._large == set(plate.traverse()) - {plate}
+    assert not index._cells
+    assert index.item_at((5, 5)) is plate[0][0]
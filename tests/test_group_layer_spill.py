@@ -0,0 +1,73 @@
+from pathlib import Path
+
+import numpy as np
+from napari.layers import Image, Points
+from napari_experimental.group_layer import GroupLayer
+from napari_experimental.group_layer_spill import (
+    GroupLayerSpiller,
+    SpillPolicy,
+)
+
+
+def make_tree():
+    images = [Image(np.full((16, 16), i, dtype="u2")) for i in range(3)]
+    points = Points(np.zeros((4, 2)))
+    tree = GroupLayer(images[0])
+    tree.add_new_group(images[1], images[2], points)
+    return tree, tree[1], images
+
+
+def test_spill_after_hidden_for(tmp_path: Path) -> None:
+    tree, group, images = make_tree()
+    now = [0.0]
+    spiller = GroupLayerSpiller(tree, clock=lambda: now[0])
+    group.spill_policy = SpillPolicy(hidden_for=10.0, directory=tmp_path)
+
+    group.visible = False
+    now[0] = 5.0
+    assert spiller.check() == 0, "Group has not been hidden long enough"
+
+    now[0] = 10.0
+    nbytes = images[1].data.nbytes + images[2].data.nbytes
+    assert spiller.check() == nbytes
+    assert spiller.bytes_reclaimed == nbytes
+    assert spiller.spilled_layers == images[1:]
+    assert all(isinstance(image.data, np.memmap) for image in images[1:])
+    assert len(list(tmp_path.iterdir())) == 2
+    assert type(images[0].data) is np.ndarray, "Visible layers stay put"
+    np.testing.assert_array_equal(images[2].data, 2)
+
+    group.visible = True
+    assert spiller.bytes_reclaimed == 0
+    assert all(type(image.data) is np.ndarray for image in images[1:])
+    np.testing.assert_array_equal(images[2].data, 2)
+    assert not list(tmp_path.iterdir())
+
+
+def test_spill_on_memory_limit(tmp_path: Path) -> None:
+    tree, group, images = make_tree()
+    spiller = GroupLayerSpiller(tree)
+    group.spill_policy = SpillPolicy(
+        hidden_for=None, memory_limit=images[0].data.nbytes * 2
+    )
+    group.visible = False
+    assert spiller.in_memory_bytes() == images[0].data.nbytes * 3
+
+    assert spiller.check() == images[0].data.nbytes * 2
+    assert spiller.in_memory_bytes() == images[0].data.nbytes
+    assert spiller.check() == 0, "Already below the memory limit"
+
+    # Showing a single layer restores just that layer
+    images[1].visible = True
+    assert spiller.spilled_layers == [images[2]]
+
+    spiller.close()
+    assert not spiller.spilled_layers
+    assert type(images[2].data) is np.ndarray
+
+
+def test_no_spill_without_policy() -> None:
+    tree, group, _ = make_tree()
+    spiller = GroupLayerSpiller(tree, clock=lambda: 1e6)
+    group.visible = False
+    assert spiller.check() == 0
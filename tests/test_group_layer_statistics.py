@@ -0,0 +1,112 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from napari.layers import Image, Labels, Points
+from napari_experimental.group_layer import GroupLayer
+from napari_experimental.group_layer_statistics import (
+    GroupLayerStatistics,
+    LayerStatistics,
+    combine_statistics,
+    compute_statistics,
+)
+from napari_experimental.group_layer_statistics_qt import (
+    QtGroupStatisticsPanel,
+)
+
+
+def make_tree():
+    image = Image(np.arange(16, dtype="f4").reshape(4, 4))
+    labels = Labels(np.array([[0, 1], [2, 2]]), translate=(10, 10))
+    points = Points(np.zeros((3, 2)))
+    tree = GroupLayer(image)
+    tree.add_new_group(labels, points)
+    return tree, image, labels, points
+
+
+def wait_for(statistics: GroupLayerStatistics):
+    for future in list(statistics._pending.values()):
+        future.result()
+    return statistics.collect()
+
+
+def test_compute_statistics() -> None:
+    data = np.full((8, 4), 2.0)
+    data[0, 0] = np.nan
+    data[-1, -1] = 10.0
+    image = compute_statistics("image", data)
+    assert image.n_values == data.size - 1
+    assert image.min == 2 and image.max == 10
+    assert image.mean == pytest.approx((2 * 30 + 10) / 31)
+
+    labels = np.zeros((8, 4), dtype=int)
+    labels[:4] = 3
+    labels[4:, 0] = 7
+    assert compute_statistics("labels", labels).n_labels == 2
+    assert compute_statistics("points", np.zeros((5, 3))).n_points == 5
+    assert compute_statistics("shapes", []) == LayerStatistics()
+
+
+def test_combine_statistics() -> None:
+    combined = combine_statistics(
+        [
+            LayerStatistics(n_values=1, mean=1.0, min=1.0, max=1.0),
+            LayerStatistics(n_values=3, mean=5.0, min=2.0, max=9.0),
+            LayerStatistics(n_points=4),
+        ]
+    )
+    assert combined.n_points == 4
+    assert combined.n_labels is None
+    assert combined.mean == 4
+    assert (combined.min, combined.max) == (1, 9)
+
+
+def test_statistics_are_cached_per_data_version() -> None:
+    tree, image, labels, points = make_tree()
+    statistics = GroupLayerStatistics(tree)
+
+    assert statistics.request(tree) == 3
+    assert len(wait_for(statistics)) == 3
+    assert statistics.statistics(points).n_points == 3
+    assert statistics.aggregate(tree[1]).n_labels == 2
+    assert statistics.aggregate(tree).max == 15
+
+    assert statistics.request(tree) == 0, "Nothing is out of date"
+    points.data = np.zeros((5, 2))
+    assert statistics.statistics(points) is None
+    assert statistics.request(tree) == 1
+    wait_for(statistics)
+    assert statistics.aggregate(tree).n_points == 5
+
+    statistics.shutdown()
+
+
+def test_cancel_statistics() -> None:
+    tree, *_ = make_tree()
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # Occupy the only worker, so nothing else starts
+        executor.submit(release.wait)
+        statistics = GroupLayerStatistics(tree, executor=executor)
+        statistics.request(tree)
+        assert statistics.n_pending == 3
+
+        statistics.cancel()
+        release.set()
+    assert statistics.n_pending == 0
+    assert statistics.collect() == []
+
+
+def test_statistics_panel(qtbot) -> None:
+    tree, image, _, points = make_tree()
+    panel = QtGroupStatisticsPanel(tree)
+    qtbot.addWidget(panel)
+
+    panel.refresh()
+    qtbot.waitUntil(lambda: panel.statistics.n_pending == 0)
+    panel._show_completed()
+    root = panel.table.topLevelItem(0)
+    assert root.text(2) == "3"
+    assert root.text(4) == "7.5"
+    assert panel.node_row(tree[0]).text(6) == "15"
@@ -0,0 +1,136 @@
+import random
+
+from napari.components import LayerList
+from napari.layers import Points
+from napari_experimental.group_layer import GroupLayer
+from napari_experimental.group_layer_sync import GroupLayerReconciler
+
+
+def layers_in_tree_order(layer_list: LayerList) -> list:
+    return list(reversed(layer_list))
+
+
+def test_reconcile_insertions(collection_of_layers) -> None:
+    layers = LayerList()
+    tree = GroupLayer()
+    scheduled = []
+    reconciler = GroupLayerReconciler(
+        layers, tree, schedule=lambda: scheduled.append(True)
+    )
+
+    layers.extend(list(collection_of_layers.values()))
+    assert scheduled, "Changes should schedule a reconcile"
+    assert len(tree) == 0, "Changes should not be applied until reconcile"
+
+    assert reconciler.reconcile(max_insertions=3) == 3
+    assert reconciler.n_pending_insertions == len(layers) - 3
+    assert reconciler.reconcile() == len(layers) - 3
+    assert not reconciler.has_pending_changes
+    assert [node.layer for node in tree] == layers_in_tree_order(layers)
+
+
+def test_reconcile_insertion_position(nested_layer_group: GroupLayer) -> None:
+    layers = LayerList(
+        [node.layer for node, _, _ in nested_layer_group.iter_layers()][::-1]
+    )
+    reconciler = GroupLayerReconciler(layers, nested_layer_group)
+
+    # Insert directly below Points_AA0 in the LayerList, which is directly
+    # above Points_AA1 in the tree.
+    new_layers = [Points(name="new_0"), Points(name="new_1")]
+    below_aa0 = layers.index(nested_layer_group[1, 1, 0].layer)
+    layers.insert(below_aa0, new_layers[1])
+    layers.insert(below_aa0 + 1, new_layers[0])
+    reconciler.reconcile()
+
+    assert [node.name for node in nested_layer_group[1, 1]] == [
+        "Points_AA0",
+        "new_0",
+        "new_1",
+        "Points_AA1",
+    ]
+    assert [
+        node.layer for node, _, _ in nested_layer_group.iter_layers()
+    ] == layers_in_tree_order(layers)
+
+
+def test_reconcile_removals(nested_layer_group: GroupLayer) -> None:
+    layers = LayerList(
+        [node.layer for node, _, _ in nested_layer_group.iter_layers()][::-1]
+    )
+    reconciler = GroupLayerReconciler(layers, nested_layer_group)
+    group_aa = nested_layer_group[1, 1]
+    group_b = nested_layer_group[3]
+
+    # Removing every layer in Group_AA from the LayerList prunes the group
+    for node in list(group_aa):
+        layers.remove(node.layer)
+    reconciler.reconcile()
+    assert group_aa not in nested_layer_group[1]
+    assert len(nested_layer_group[1]) == 2
+
+    # Removing a group from the tree removes its layers from the LayerList
+    removed_layer = group_b[0].layer
+    nested_layer_group.remove(group_b)
+    reconciler.reconcile()
+    assert removed_layer not in layers
+    assert len(layers) == 4
+
+    layers.clear()
+    reconciler.reconcile()
+    assert len(nested_layer_group) == 0
+
+
+def test_reconcile_moves(nested_layer_group: GroupLayer) -> None:
+    layers = LayerList(
+        [node.layer for node, _, _ in nested_layer_group.iter_layers()][::-1]
+    )
+    reconciler = GroupLayerReconciler(layers, nested_layer_group)
+
+    nested_layer_group.move((3,), (0,))
+    nested_layer_group.move((2, 1), (0,))
+    reconciler.reconcile()
+
+    assert [
+        node.layer for node, _, _ in nested_layer_group.iter_layers()
+    ] == layers_in_tree_order(layers)
+
+
+def test_reconcile_permutation() -> None:
+    layers = LayerList()
+    tree = GroupLayer()
+    reconciler = GroupLayerReconciler(layers, tree)
+    layers.extend([Points(name=str(i)) for i in range(7)])
+    reconciler.reconcile()
+
+    # Reordering the LayerList to this permutation of its positions is not
+    # handled by LayerList.move_multiple
+    permutation = [1, 2, 5, 6, 0, 3, 4]
+    for position in reversed(permutation):
+        node = next(node for node in tree if node.layer is layers[position])
+        tree.move((tree.index(node),), (len(tree),))
+    reconciler.reconcile()
+
+    assert [layer.name for layer in layers] == [str(i) for i in permutation]
+    assert [node.layer for node in tree] == layers_in_tree_order(layers)
+
+
+def test_reconcile_scattered_insertions(
+    nested_layer_group: GroupLayer,
+) -> None:
+    layers = LayerList(
+        [node.layer for node, _, _ in nested_layer_group.iter_layers()][::-1]
+    )
+    reconciler = GroupLayerReconciler(layers, nested_layer_group)
+
+    # Insert layers at scattered positions, and add them to the tree a
+    # couple at a time so that some are placed next to each other.
+    rng = random.Random(0)
+    for i in range(20):
+        layers.insert(rng.randint(0, len(layers)), Points(name=f"new_{i}"))
+    while reconciler.n_pending_insertions:
+        reconciler.reconcile(max_insertions=2)
+
+    assert [
+        node.layer for node, _, _ in nested_layer_group.iter_layers()
+    ] == layers_in_tree_order(layers)
@@ -0,0 +1,107 @@
+import numpy as np
+from napari.layers import Image, Points
+from napari_experimental.group_layer import GroupLayer
+from napari_experimental.group_layer_merge import (
+    merge_group_points,
+    split_group_points,
+)
+from napari_experimental.group_layer_transform import (
+    base_affine,
+    compose_affines,
+)
+
+
+def translation(*offset):
+    matrix = np.eye(len(offset) + 1)
+    matrix[:-1, -1] = offset
+    return matrix
+
+
+def scaling(*factors):
+    return np.diag([*factors, 1.0])
+
+
+def world(layer, point):
+    return layer._data_to_world(point)
+
+
+def make_tree():
+    images = [Image(np.zeros((4, 4))) for _ in range(3)]
+    tree = GroupLayer(images[0])
+    tree.add_new_group(images[1])
+    tree[1].add_new_group(images[2])
+    return tree, images
+
+
+def test_compose_affines() -> None:
+    assert compose_affines(None, None) is None
+    composed = compose_affines(translation(5, 0, 0), scaling(2, 3))
+    np.testing.assert_array_equal(
+        composed, translation(5, 0, 0) @ np.diag([1, 2, 3, 1])
+    )
+
+
+def test_group_affines_compose_down_the_tree(mocker) -> None:
+    tree, images = make_tree()
+    outer, inner = tree[1], tree[1][1]
+    refresh = mocker.spy(Image, "refresh")
+
+    outer.affine = translation(0, 100)
+    assert refresh.call_count <= 2, "At most one refresh per layer"
+    inner.affine = scaling(2, 2)
+    np.testing.assert_allclose(world(images[0], (1, 1)), (1, 1))
+    np.testing.assert_allclose(world(images[1], (1, 1)), (1, 101))
+    np.testing.assert_allclose(world(images[2], (1, 1)), (2, 102))
+    np.testing.assert_array_equal(base_affine(images[2]), np.eye(3))
+
+    # Only the subtree of the changed group is recomposed
+    assert outer._composed_affine_cached
+    tree.affine = translation(10, 0)
+    np.testing.assert_allclose(world(images[2], (1, 1)), (12, 102))
+
+    outer.affine = None
+    np.testing.assert_allclose(world(images[1], (1, 1)), (11, 1))
+    np.testing.assert_allclose(world(images[2], (1, 1)), (12, 2))
+
+
+def test_structural_changes_update_transforms() -> None:
+    tree, images = make_tree()
+    outer, inner = tree[1], tree[1][1]
+    outer.affine = translation(0, 100)
+
+    points = Points([[1, 1]])
+    inner.add_new_layer(points)
+    np.testing.assert_allclose(world(points, (1, 1)), (1, 101))
+
+    tree.move(outer.index_from_root() + (0,), 0)
+    np.testing.assert_allclose(world(images[1], (1, 1)), (1, 1))
+
+    tree.remove(outer)
+    # The removed group keeps its own transform, but nothing else
+    np.testing.assert_allclose(world(images[2], (1, 1)), (1, 101))
+    outer.affine = None
+    np.testing.assert_array_equal(images[2].affine.affine_matrix, np.eye(3))
+
+
+def test_layer_affine_edits_are_kept() -> None:
+    tree, images = make_tree()
+    outer = tree[1]
+    outer.affine = translation(0, 100)
+
+    images[1].affine = translation(0, 100) @ translation(5, 0)
+    np.testing.assert_allclose(base_affine(images[1]), translation(5, 0))
+    outer.affine = translation(0, 200)
+    np.testing.assert_allclose(world(images[1], (1, 1)), (6, 201))
+
+
+def test_merge_in_transformed_group() -> None:
+    points = [Points([[i, i]]) for i in range(2)]
+    tree = GroupLayer()
+    tree.add_new_group(*points)
+    group = tree[0]
+    group.affine = translation(0, 100)
+
+    merged = merge_group_points(group)
+    np.testing.assert_allclose(world(merged.layer, (1, 1)), (1, 101))
+    split = split_group_points(group, merged)
+    np.testing.assert_allclose(world(split[1].layer, (1, 1)), (1, 101))
@@ -1,8 +1,17 @@
+from types import SimpleNamespace
+
+import numpy as np
 import pytest
-from napari_experimental._widget import GroupLayerWidget
+from napari.components import ViewerModel
+from napari.layers import Image, Points
+from napari_experimental._widget import (
+    POPULATION_CHUNK_SIZE,
+    GroupLayerWidget,
+)
 from napari_experimental.group_layer import GroupLayer, GroupLayerNode
 from napari_experimental.group_layer_actions import GroupLayerActions
 from napari_experimental.group_layer_delegate import GroupLayerDelegate
+from napari_experimental.group_layer_spill import SpillPolicy
 from qtpy.QtCore import QPoint, Qt
 from qtpy.QtWidgets import QWidget
 
@@ -245,6 +254,9 @@ def test_layer_sync(make_napari_viewer, image_layer, points_layer):
     Test the synchronisation between the widget and the main LayerList.
     This test will be redundant when the plugin functionality replaces the
     main viewer functionality.
+
+    Changes are only applied once control returns to the event loop, so
+    apply_pending_changes is used to apply them immediately.
     """
     viewer = make_napari_viewer()
     viewer.add_layer(image_layer)
@@ -256,6 +268,7 @@ def test_layer_sync(make_napari_viewer, image_layer, points_layer):
     # the group layers view.
 
     viewer.add_layer(points_layer)
+    widget.apply_pending_changes()
     assert len(widget.group_layers) == 2
 
     # Check that reordering the layer order in the group layers view
@@ -269,6 +282,7 @@ def test_layer_sync(make_napari_viewer, image_layer, points_layer):
         assert in_viewer is in_widget
     # Move layer at position 1 to position 0
     widget.group_layers.move((1,), (0,))
+    widget.apply_pending_changes()
     # Viewer should have auto-synced these changes
     for in_viewer, in_widget in zip(  # noqa: B905
         reversed(viewer.layers),
@@ -278,8 +292,267 @@ def test_layer_sync(make_napari_viewer, image_layer, points_layer):
 
     # Deletion in main viewer results in deletion in group layers viewer
     viewer.layers.remove(points_layer)
+    widget.apply_pending_changes()
     assert len(widget.group_layers) == 1
     assert image_layer is widget.group_layers[0].layer
     # Deletion in group layers viewer results in deletion in main viewer
     widget.group_layers.remove_layer_item(image_layer)
+    widget.apply_pending_changes()
+    assert len(viewer.layers) == 0
+
+
+def test_layer_sync_on_event_loop(qtbot, make_napari_viewer, image_layer):
+    viewer = make_napari_viewer()
+    widget = GroupLayerWidget(viewer)
+
+    viewer.add_layer(image_layer)
+    assert len(widget.group_layers) == 0, "Changes should be deferred"
+    qtbot.waitUntil(lambda: len(widget.group_layers) == 1)
+
+
+def test_build_in_background(qtbot, make_napari_viewer, image_layer):
+    viewer = make_napari_viewer()
+    viewer.add_layer(image_layer)
+    widget = GroupLayerWidget(viewer)
+
+    channels = [Points(name=f"channel_{i}") for i in range(3)]
+    widget.build_in_background(
+        lambda: GroupLayer.from_hierarchy({"well": channels}, name="plate"),
+        location=0,
+    )
+    qtbot.waitUntil(lambda: len(viewer.layers) == 4)
+    widget.apply_pending_changes()
+
+    assert widget.group_layers[0].name == "plate"
+    assert [
+        node.layer for node, _, _ in widget.group_layers.iter_layers()
+    ] == list(reversed(viewer.layers))
+
+
+def test_search_filters_view(group_layer_widget_with_nested_groups):
+    widget = group_layer_widget_with_nested_groups
+    view = widget.group_layers_view
+    source_model = view.model()
+
+    # Searching swaps the view to display the filtered model
+    widget.search_box.setText("points")
+    assert view.model() is view.filter_model
+    assert view.model().rowCount() == 1, "Only the group should be shown"
+    assert view.model().rowCount(view.model().index(0, 0)) == 1
+
+    # Clearing the search restores the full tree
+    widget.search_box.clear()
+    assert view.model() is source_model
+    assert view.model().rowCount() == len(widget.group_layers)
+
+
+def test_staged_population(qtbot, make_napari_viewer, collection_of_layers):
+    viewer = make_napari_viewer()
+    layers = list(collection_of_layers.values())
+    viewer.layers.extend(layers)
+
+    widget = GroupLayerWidget(viewer, chunk_size=2)
+    qtbot.addWidget(widget)
+    # Only the first chunk is added before the widget is shown
+    assert not widget.is_populated
+    assert len(widget.group_layers) == 2
+    assert widget.population_progress.value() == 2
+    assert widget.population_progress.maximum() == len(layers)
+
+    # Changes to the viewer whilst populating are reflected in the tree
+    viewer.layers.remove(layers[0])
+    new_layer = Points(name="new")
+    viewer.layers.insert(3, new_layer)
+
+    with qtbot.waitSignal(widget.populated):
+        pass
+    assert widget.is_populated
+    assert widget.population_progress.isHidden()
+    assert [node.layer for node in widget.group_layers] == list(
+        reversed(viewer.layers)
+    )
+
+
+def test_apply_pending_changes(make_napari_viewer, collection_of_layers):
+    viewer = make_napari_viewer()
+    viewer.layers.extend(list(collection_of_layers.values()))
+
+    widget = GroupLayerWidget(viewer, chunk_size=1)
+    assert len(widget.group_layers) == 1
+    widget.apply_pending_changes()
+    assert widget.is_populated
+    assert len(widget.group_layers) == len(viewer.layers)
+
+
+def test_population_is_chunked(qtbot) -> None:
+    viewer = ViewerModel()
+    n_layers = 3 * POPULATION_CHUNK_SIZE + 1
+    viewer.layers.extend(Points(name=f"{i}") for i in range(n_layers))
+
+    widget = GroupLayerWidget(viewer)
+    qtbot.addWidget(widget)
+    # However many layers the viewer has, no more than one chunk of them is
+    # added before the event loop runs
+    assert 0 < len(widget.group_layers) <= POPULATION_CHUNK_SIZE
+    assert not widget.is_populated
+
+    # The rest are added at most a chunk at a time
+    sizes = [len(widget.group_layers)]
+    widget.population_progress.valueChanged.connect(
+        lambda _: sizes.append(len(widget.group_layers))
+    )
+    with qtbot.waitSignal(widget.populated):
+        pass
+    sizes.append(len(widget.group_layers))
+    assert sizes[-1] == n_layers
+    assert max(np.diff(sizes)) <= POPULATION_CHUNK_SIZE
+
+
+def test_load_group(qtbot, make_napari_viewer):
+    viewer = make_napari_viewer()
+    widget = GroupLayerWidget(viewer)
+
+    def read(source: str) -> tuple:
+        return np.zeros((1, 2)), {"name": source}, "points"
+
+    sources = [f"file_{i}.csv" for i in range(20)]
+    group = widget.load_group(sources, read, name="files")
+    assert widget.group_layers[0] is group
+    assert len(group) == len(sources), "Placeholders should appear at once"
+
+    qtbot.waitUntil(lambda: len(viewer.layers) == len(sources))
+    widget.apply_pending_changes()
+    assert [node.name for node in group] == sources
+    assert [
+        node.layer for node, _, _ in widget.group_layers.iter_layers()
+    ] == list(reversed(viewer.layers))
+
+
+def test_open_hierarchy_realised_on_expand(make_napari_viewer, tmp_path):
+    for field in ("field_0", "field_1"):
+        (tmp_path / "plate" / field).mkdir(parents=True)
+        np.save(tmp_path / "plate" / field / "dapi.npy", np.zeros((4, 4)))
+
+    viewer = make_napari_viewer()
+    widget = GroupLayerWidget(viewer)
+    group = widget.open_hierarchy(tmp_path / "plate")
     assert len(viewer.layers) == 0
+
+    view = widget.group_layers_view
+    view.expand(view.model().index(0, 0))
+    assert [item.name for item in group] == ["field_0", "field_1"]
+    view.expand(view.model().index(0, 0, view.model().index(0, 0)))
+    widget.apply_pending_changes()
+    assert [layer.name for layer in viewer.layers] == ["dapi"]
+
+
+def test_flatten_group(make_napari_viewer):
+    viewer = make_napari_viewer()
+    widget = GroupLayerWidget(viewer)
+    images = [Image(np.zeros((4, 4)), translate=(0, 4 * i)) for i in range(3)]
+    widget.reconciler.graft(GroupLayer(*images))
+    widget.apply_pending_changes()
+    assert set(viewer.layers) == set(images)
+
+    flattened = widget.flatten_group(widget.group_layers[0])
+    widget.apply_pending_changes()
+    assert list(viewer.layers) == [flattened.layer]
+    assert flattened.layer.data.shape == (4, 12, 4)
+
+    widget.unflatten_group(flattened)
+    widget.apply_pending_changes()
+    assert set(viewer.layers) == set(images)
+
+
+def test_zoom_to_selection_via_context_menu(
+    group_layer_widget_with_nested_groups,
+):
+    widget = group_layer_widget_with_nested_groups
+    group_layers = widget.group_layers
+    group_layer_actions = GroupLayerActions(group_layers, viewer=widget.viewer)
+    assert "zoom_to_selection" in [
+        action.title for action in group_layer_actions.actions
+    ]
+
+    new_group = group_layers[1]
+    group_layers.propagate_selection(new_selection=[new_group])
+    group_layer_actions._zoom_to_selection()
+    center = new_group.extent.mean(axis=0)
+    assert widget.viewer.camera.center[-2:] == pytest.approx(center[-2:])
+
+
+def test_canvas_click_selects_item(make_napari_viewer):
+    viewer = make_napari_viewer()
+    widget = GroupLayerWidget(viewer)
+    images = [Image(np.zeros((4, 4)), translate=(0, 10 * i)) for i in range(2)]
+    widget.reconciler.graft(GroupLayer(*images))
+    widget.apply_pending_changes()
+    group = widget.group_layers[0]
+
+    def click(position, dragged=False):
+        event = SimpleNamespace(position=position, type="mouse_press")
+        callback = widget._on_canvas_click(viewer, event)
+        next(callback)
+        event.type = "mouse_move" if dragged else "mouse_release"
+        next(callback, None)
+
+    click((1, 11), dragged=True)
+    assert group[1] not in widget.group_layers.selection
+    click((1, 11))
+    assert set(widget.group_layers.selection) == {group[1]}
+    click((1, 7))
+    assert set(widget.group_layers.selection) == {group}
+
+
+def test_canvas_hover_is_coalesced(qtbot, make_napari_viewer):
+    viewer = make_napari_viewer()
+    widget = GroupLayerWidget(viewer)
+    images = [Image(np.zeros((4, 4)), translate=(0, 10 * i)) for i in range(2)]
+    widget.reconciler.graft(GroupLayer(*images))
+    widget.apply_pending_changes()
+    group = widget.group_layers[0]
+
+    hovered = []
+    widget.item_hovered.connect(hovered.append)
+    for position in ((1, 1), (1, 7), (1, 11)):
+        widget._on_canvas_hover(viewer, SimpleNamespace(position=position))
+    assert hovered == [], "Moves are looked up once they have settled"
+    qtbot.waitUntil(lambda: hovered == [group[1]])
+
+
+def test_close_removes_canvas_callbacks(qtbot, make_napari_viewer):
+    viewer = make_napari_viewer()
+    widget = GroupLayerWidget(viewer)
+    assert (
+        widget._on_canvas_click not in viewer.mouse_drag_callbacks
+    ), "Picking should be set up once the event loop is idle"
+    qtbot.waitUntil(
+        lambda: widget._on_canvas_click in viewer.mouse_drag_callbacks
+    )
+    assert widget._on_canvas_hover in viewer.mouse_move_callbacks
+
+    widget.close()
+    assert widget._on_canvas_click not in viewer.mouse_drag_callbacks
+    assert widget._on_canvas_hover not in viewer.mouse_move_callbacks
+
+
+def test_spill_timer_runs_whilst_groups_have_policies(
+    make_napari_viewer, tmp_path
+):
+    viewer = make_napari_viewer()
+    widget = GroupLayerWidget(viewer)
+    widget.apply_pending_changes()
+    assert not widget._spill_timer.isActive()
+
+    widget.group_layers.add_new_group(Image(np.zeros((4, 4))))
+    group = widget.group_layers[0]
+    assert not widget._spill_timer.isActive()
+    group.spill_policy = SpillPolicy(hidden_for=0, directory=tmp_path)
+    assert widget._spill_timer.isActive()
+
+    group.visible = False
+    widget.spiller.check()
+    assert widget.spiller.spilled_layers
+    widget.close()
+    assert not widget._spill_timer.isActive()
+    assert not widget.spiller.spilled_layers
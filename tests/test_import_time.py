@@ -0,0 +1,88 @@
+import subprocess
+import sys
+from typing import Dict
+
+import pytest
+
+# Modules that should not be imported when only the tree model is used, since
+# they are (or import) a Qt binding and napari's Qt widgets. napari.layers is
+# included as it imports qtpy (and so a Qt binding) itself.
+QT_MODULE_PREFIXES = (
+    "qtpy",
+    "PyQt5",
+    "PyQt6",
+    "PySide2",
+    "PySide6",
+    "napari._qt",
+    "napari.layers",
+    "napari_experimental._widget",
+    "napari_experimental.group_layer_controls",
+    "napari_experimental.group_layer_delegate",
+    "napari_experimental.group_layer_qt",
+    "napari_experimental.group_layer_statistics_qt",
+)
+# Generous upper bound (in seconds) on the time spent importing the plugin's
+# own modules, excluding their dependencies.
+PLUGIN_SELF_TIME_BUDGET = 0.25
+
+
+def import_times(statement: str) -> Dict[str, float]:
+    """
+    Run ``statement`` in a fresh interpreter with ``-X importtime``, and
+    return the time (in seconds) spent importing each module that was
+    imported, excluding the time spent importing its own dependencies.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _, module = line[len("import time:") :].split("|")
+        times[module.strip()] = int(self_us) / 1e6
+    return times
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        pytest.param("napari_experimental", id="Package"),
+        pytest.param("napari_experimental.group_layer", id="GroupLayer"),
+        pytest.param(
+            "napari_experimental.group_layer_hierarchy", id="Hierarchy"
+        ),
+        pytest.param("napari_experimental.group_layer_loading", id="Loading"),
+        pytest.param(
+            "napari_experimental.group_layer_prefetch", id="Prefetch"
+        ),
+    ],
+)
+def test_headless_import(module: str) -> None:
+    times = import_times(f"import {module}")
+    assert module in times, f"Did not record the import of {module}"
+
+    qt_modules = [
+        name for name in times if name.startswith(QT_MODULE_PREFIXES)
+    ]
+    assert not qt_modules, f"Importing {module} imported {qt_modules}"
+
+    plugin_self_time = sum(
+        time
+        for name, time in times.items()
+        if name.startswith("napari_experimental")
+    )
+    assert plugin_self_time < PLUGIN_SELF_TIME_BUDGET, (
+        f"Importing {module} spent {plugin_self_time:.3f}s in the plugin's "
+        f"own modules (budget {PLUGIN_SELF_TIME_BUDGET}s)"
+    )
+
+
+def test_widget_import_is_deferred() -> None:
+    times = import_times(
+        "import napari_experimental; napari_experimental.GroupLayerWidget"
+    )
+    assert "napari_experimental._widget" in times